@@ -0,0 +1,77 @@
+import base64
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+
+from components.AssetSync import AssetSync
+from repositories.StorageRepository import StorageRepository
+
+
+class AssetService:
+    """
+    Process-wide in-memory cache of the logo, badge, avatar and sound effect
+    assets, ready to embed. Bytes and data URIs are kept per asset name and
+    synced generation, so views stop reading and base64-encoding the same
+    files on every rerun. The least recently used entries are dropped once
+    the cache grows past its byte limit.
+    """
+    MAX_BYTES = int(os.environ.get('ASSET_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, asset_sync: AssetSync, max_bytes=MAX_BYTES):
+        self.asset_sync = asset_sync
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+
+    @classmethod
+    def get_instance(cls, storage_repo: StorageRepository):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(AssetSync.get_instance(storage_repo))
+        return cls._instance
+
+    def get_bytes(self, blob_name):
+        return self._get(('bytes', blob_name), lambda: self._read(blob_name))
+
+    def get_data_uri(self, blob_name):
+        def encode():
+            data = self.get_bytes(blob_name)
+            if data is None:
+                return None
+            mime_type = mimetypes.guess_type(blob_name)[0] or 'application/octet-stream'
+            return f"data:{mime_type};base64,{base64.b64encode(data).decode()}"
+
+        return self._get(('data_uri', blob_name), encode)
+
+    def _get(self, kind_and_name, load):
+        key = kind_and_name + (self.asset_sync.get_version(kind_and_name[1]),)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+
+        value = load()
+        if value is None:
+            # Not cached, so an asset that failed to download is retried on the next render
+            return None
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = value
+                self.total_bytes += len(value)
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+        return value
+
+    def _read(self, blob_name):
+        path = self.asset_sync.get_path(blob_name)
+        if path is None or not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
@@ -0,0 +1,134 @@
+import fcntl
+import json
+import os
+import threading
+
+from repositories.StorageRepository import StorageRepository
+
+
+class AssetSync:
+    """
+    Keeps local copies of the shared logo, badge, avatar and sound effect assets.
+    Once per process, the asset prefixes are listed and only the blobs whose
+    generation differs from the local manifest are downloaded, in parallel.
+    A file lock keeps the app processes on a host from syncing at the same
+    time. After that, finding an asset's local path is a dict lookup.
+    """
+    PREFIXES = ['logo/', 'badges/', 'avatars/', 'sound effects/']
+    # Bump when the manifest format changes, older manifests are then synced from scratch
+    MANIFEST_VERSION = 1
+    MANIFEST_FILE = '.asset_manifest.json'
+    LOCK_FILE = '.asset_manifest.lock'
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, storage_repo: StorageRepository, local_root='.'):
+        self.storage_repo = storage_repo
+        self.local_root = local_root
+        self.lock = threading.Lock()
+        self.synced = False
+        # Blob name to local path of every asset on disk
+        self.index = {}
+        # Blob name to generation of every synced asset
+        self.versions = {}
+
+    @classmethod
+    def get_instance(cls, storage_repo: StorageRepository, local_root='.'):
+        with cls._instances_lock:
+            if local_root not in cls._instances:
+                cls._instances[local_root] = cls(storage_repo, local_root)
+            return cls._instances[local_root]
+
+    def sync(self):
+        if self.synced:
+            return
+        with self.lock:
+            if self.synced:
+                return
+            try:
+                os.makedirs(self.local_root, exist_ok=True)
+                with open(os.path.join(self.local_root, self.LOCK_FILE), 'w') as lock_file:
+                    # Another process syncing on this host finishes first, this one then finds nothing changed
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    try:
+                        self._sync()
+                    finally:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+            except Exception as e:
+                # Assets that could not be synced are downloaded on first use
+                print(f"Error while syncing assets: {e}")
+            self.synced = True
+
+    def _sync(self):
+        manifest = self.load_manifest()
+        blobs = [blob for prefix in self.PREFIXES for blob in self.storage_repo.list_blobs(prefix)
+                 if not blob.name.endswith('/')]
+        changed = [blob for blob in blobs
+                   if manifest.get(blob.name, {}).get('generation') != blob.generation
+                   or not os.path.exists(self.get_local_path(blob.name))]
+
+        executor = StorageRepository.get_prefetch_executor()
+        futures = {}
+        for blob in changed:
+            os.makedirs(os.path.dirname(self.get_local_path(blob.name)), exist_ok=True)
+            futures[blob.name] = executor.submit(self.storage_repo.download_blob_to_file, blob.name,
+                                                 self.get_local_path(blob.name), blob.generation)
+        downloaded = set()
+        for name, future in futures.items():
+            try:
+                future.result()
+                downloaded.add(name)
+            except Exception as e:
+                print(f"Error while downloading asset {name}: {e}")
+
+        # Assets removed from the bucket drop out of the manifest, failed downloads are retried next sync
+        changed_names = {blob.name for blob in changed}
+        manifest = {blob.name: {'generation': blob.generation, 'md5': blob.md5_hash} for blob in blobs
+                    if blob.name in downloaded or blob.name not in changed_names}
+        self.save_manifest(manifest)
+        self.index = {name: self.get_local_path(name) for name in manifest}
+        self.versions = {name: asset['generation'] for name, asset in manifest.items()}
+        if changed:
+            print(f"Synced {len(downloaded)} of {len(changed)} changed assets")
+
+    def get_path(self, blob_name):
+        """Returns the local path of an asset, downloading it if it was not synced."""
+        path = self.index.get(blob_name)
+        if path is not None:
+            return path
+
+        path = self.get_local_path(blob_name)
+        if not os.path.exists(path):
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self.storage_repo.download_blob_to_file(blob_name, path)
+            except Exception as e:
+                print(f"Failed to download asset '{blob_name}' from remote location: {e}")
+                return None
+        self.index[blob_name] = path
+        return path
+
+    def get_version(self, blob_name):
+        """Returns the synced generation of an asset, None when it was downloaded on first use."""
+        return self.versions.get(blob_name)
+
+    def get_local_path(self, blob_name):
+        return os.path.join(self.local_root, blob_name)
+
+    def load_manifest(self):
+        path = os.path.join(self.local_root, self.MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get('version') != self.MANIFEST_VERSION:
+            return {}
+        return manifest['assets']
+
+    def save_manifest(self, assets):
+        path = os.path.join(self.local_root, self.MANIFEST_FILE)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({'version': self.MANIFEST_VERSION, 'assets': assets}, f, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
@@ -0,0 +1,95 @@
+import os
+import tempfile
+
+import librosa
+
+from components.AudioDurationProbe import AudioDurationProbe
+from components.AudioProcessor import AudioProcessor
+from enums.AnalysisProfile import AnalysisProfile
+from repositories.Tracer import Tracer
+
+
+class AudioAnalysis:
+    """
+    Decodes a recording once and lazily computes its duration, features and
+    notes from the shared buffer, so the upload-and-score path never decodes
+    the same file twice. The duration of an in-memory recording is read from
+    its container header, so it is only decoded when features are needed.
+    Decoding and features follow the sample rate and hop of the analysis profile.
+    """
+    # Uncompressed or losslessly packed formats, decoded straight from memory
+    PCM_SUFFIXES = ('.wav', '.flac')
+
+    def __init__(self, audio_path=None, audio_data=None, suffix='.m4a',
+                 profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        self.audio_path = audio_path
+        self.audio_data = audio_data
+        self.suffix = suffix
+        self.profile = profile
+        self._audio = None
+        self._duration = None
+        self._features = None
+        self._notes = None
+
+    @classmethod
+    def from_path(cls, audio_path, profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        return cls(audio_path=audio_path, profile=profile)
+
+    @classmethod
+    def from_bytes(cls, audio_data, suffix='.m4a', profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        return cls(audio_data=audio_data, suffix=suffix, profile=profile)
+
+    @property
+    def audio(self):
+        if self._audio is None:
+            if self.audio_path is not None:
+                self._audio = AudioProcessor.load_and_normalize_audio(
+                    self.audio_path, self.profile.sample_rate)
+            else:
+                self._audio = self._decode_bytes()
+        return self._audio
+
+    @property
+    def duration(self):
+        if self._duration is None:
+            if self._audio is None and self.audio_data is not None:
+                with Tracer.span('audio.duration_probe'):
+                    self._duration = AudioDurationProbe.probe(self.audio_data)
+            if self._duration is None:
+                # No readable header, fall back to decoding the recording
+                y, sr = self.audio
+                self._duration = librosa.get_duration(y=y, sr=sr)
+        return self._duration
+
+    @property
+    def features(self):
+        if self._features is None:
+            self._features = AudioProcessor.extract_features_from_audio(*self.audio, self.profile)
+        return self._features
+
+    @property
+    def chroma(self):
+        return self.features[0]
+
+    @property
+    def mfcc(self):
+        return self.features[1]
+
+    @property
+    def notes(self):
+        if self._notes is None:
+            self._notes = AudioProcessor.get_notes_from_audio(*self.audio)
+        return self._notes
+
+    def _decode_bytes(self):
+        if self.suffix in self.PCM_SUFFIXES:
+            return AudioProcessor.load_and_normalize_pcm(self.audio_data, self.profile.sample_rate)
+        # The decoders need a file for compressed formats, so the buffer is spilled
+        # to a local temporary file that is removed as soon as it has been decoded
+        with tempfile.NamedTemporaryFile(mode="wb", suffix=self.suffix, delete=False) as temp_file:
+            temp_file.write(self.audio_data)
+            temp_path = temp_file.name
+        try:
+            return AudioProcessor.load_and_normalize_audio(temp_path, self.profile.sample_rate)
+        finally:
+            os.remove(temp_path)
@@ -0,0 +1,175 @@
+import struct
+
+
+class AudioDurationProbe:
+    """
+    Reads the duration of an m4a or mp3 recording from its container metadata
+    (the MP4 mvhd/mdhd atoms, or the MP3 Xing/VBRI header and frame headers)
+    without decoding any audio. Returns None when the header cannot be read so
+    the caller can fall back to decoding.
+    """
+
+    MP3_BITRATES = {
+        # (MPEG 1, layer): kbps by bitrate index
+        (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+        (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+        (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+        (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+        (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+        (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    }
+    MP3_SAMPLE_RATES = {
+        3: [44100, 48000, 32000],  # MPEG 1
+        2: [22050, 24000, 16000],  # MPEG 2
+        0: [11025, 12000, 8000],  # MPEG 2.5
+    }
+
+    @classmethod
+    def probe(cls, data):
+        """Returns the duration in seconds of the audio in data, or None."""
+        data = memoryview(data).cast('B')
+        try:
+            if len(data) >= 8 and bytes(data[4:8]) in (b'ftyp', b'moov', b'mdat', b'free', b'wide'):
+                return cls.probe_mp4(data)
+            return cls.probe_mp3(data)
+        except (struct.error, IndexError, ValueError, ZeroDivisionError) as e:
+            print(f"Could not read the audio duration from the header: {e}")
+            return None
+
+    @classmethod
+    def probe_mp4(cls, data):
+        moov = cls._find_box(data, 0, len(data), b'moov')
+        if moov is None:
+            return None
+        start, end = moov
+        mvhd = cls._find_box(data, start, end, b'mvhd')
+        if mvhd is not None:
+            duration = cls._read_header_duration(data, mvhd[0])
+            if duration:
+                return duration
+
+        # Some muxers leave the movie duration empty, the media header of the track has it
+        trak = cls._find_box(data, start, end, b'trak')
+        mdia = cls._find_box(data, *trak, b'mdia') if trak else None
+        mdhd = cls._find_box(data, *mdia, b'mdhd') if mdia else None
+        if mdhd is not None:
+            return cls._read_header_duration(data, mdhd[0])
+        return None
+
+    @staticmethod
+    def _find_box(data, start, end, box_type):
+        """Returns the payload range of the first box of box_type between start and end."""
+        position = start
+        while position + 8 <= end:
+            size, current_type = struct.unpack_from('>I4s', data, position)
+            header_size = 8
+            if size == 1:
+                size = struct.unpack_from('>Q', data, position + 8)[0]
+                header_size = 16
+            elif size == 0:
+                size = end - position
+            if size < header_size:
+                return None
+            if current_type == box_type:
+                return position + header_size, min(position + size, end)
+            position += size
+        return None
+
+    @staticmethod
+    def _read_header_duration(data, payload_start):
+        # mvhd and mdhd share the layout: version/flags, creation and modification
+        # times, time scale and duration, with 64 bit times and duration in version 1
+        version = data[payload_start]
+        if version == 1:
+            time_scale, duration = struct.unpack_from('>IQ', data, payload_start + 20)
+            unknown_duration = 0xFFFFFFFFFFFFFFFF
+        else:
+            time_scale, duration = struct.unpack_from('>II', data, payload_start + 12)
+            unknown_duration = 0xFFFFFFFF
+        if time_scale == 0 or duration in (0, unknown_duration):
+            return None
+        return duration / time_scale
+
+    @classmethod
+    def probe_mp3(cls, data):
+        audio_start = 0
+        # Skip the ID3v2 tag, its size is stored as a 28 bit syncsafe integer
+        if bytes(data[:3]) == b'ID3' and len(data) >= 10:
+            tag_size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+            audio_start = 10 + tag_size + (10 if data[5] & 0x10 else 0)
+        audio_end = len(data)
+        if audio_end >= 128 and bytes(data[audio_end - 128:audio_end - 125]) == b'TAG':
+            audio_end -= 128
+
+        frame = cls._find_mp3_frame(data, audio_start, audio_end)
+        if frame is None:
+            return None
+        position, header = frame
+
+        # A Xing/Info or VBRI header in the first frame holds the frame count of VBR files
+        frame_count = cls._read_vbr_frame_count(data, position, header)
+        if frame_count:
+            return frame_count * header['samples_per_frame'] / header['sample_rate']
+        # Constant bitrate, the duration follows from the size of the audio data
+        return (audio_end - position) * 8 / (header['bitrate'] * 1000)
+
+    @classmethod
+    def _find_mp3_frame(cls, data, start, end, max_search=64 * 1024):
+        # The first frame follows the tags closely, a file without one is not scanned to the end
+        position = start
+        while position + 4 <= min(end, start + max_search):
+            if data[position] == 0xFF and (data[position + 1] & 0xE0) == 0xE0:
+                header = cls._parse_mp3_header(data, position)
+                # Confirm the sync with the following frame, sync bits also occur in tags
+                if header is not None:
+                    next_position = position + header['frame_length']
+                    if next_position + 4 > end or cls._parse_mp3_header(data, next_position) is not None:
+                        return position, header
+            position += 1
+        return None
+
+    @classmethod
+    def _parse_mp3_header(cls, data, position):
+        if data[position] != 0xFF or (data[position + 1] & 0xE0) != 0xE0:
+            return None
+        version_bits = (data[position + 1] >> 3) & 0x03
+        layer_bits = (data[position + 1] >> 1) & 0x03
+        bitrate_index = data[position + 2] >> 4
+        sample_rate_index = (data[position + 2] >> 2) & 0x03
+        if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+            return None
+        mpeg1 = version_bits == 3
+        layer = 4 - layer_bits
+        padding = (data[position + 2] >> 1) & 0x01
+        bitrate = cls.MP3_BITRATES[(mpeg1, layer)][bitrate_index]
+        sample_rate = cls.MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+        if layer == 1:
+            samples_per_frame = 384
+            frame_length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+        else:
+            samples_per_frame = 1152 if (mpeg1 or layer == 2) else 576
+            frame_length = samples_per_frame // 8 * bitrate * 1000 // sample_rate + padding
+        return {
+            'mpeg1': mpeg1,
+            'mono': (data[position + 3] >> 6) == 3,
+            'bitrate': bitrate,
+            'sample_rate': sample_rate,
+            'samples_per_frame': samples_per_frame,
+            'frame_length': frame_length,
+        }
+
+    @staticmethod
+    def _read_vbr_frame_count(data, position, header):
+        if header['mpeg1']:
+            side_info_size = 17 if header['mono'] else 32
+        else:
+            side_info_size = 9 if header['mono'] else 17
+        xing = position + 4 + side_info_size
+        if bytes(data[xing:xing + 4]) in (b'Xing', b'Info'):
+            flags = struct.unpack_from('>I', data, xing + 4)[0]
+            if flags & 0x01:
+                return struct.unpack_from('>I', data, xing + 8)[0]
+        vbri = position + 36
+        if bytes(data[vbri:vbri + 4]) == b'VBRI':
+            return struct.unpack_from('>I', data, vbri + 14)[0]
+        return None
@@ -1,25 +1,56 @@
+import io
+import os
+
 import librosa
 import numpy as np
+import soundfile
 from fastdtw import fastdtw
 from scipy.spatial.distance import cosine, euclidean
 from scipy.stats import zscore
 
+from components.AudioDurationProbe import AudioDurationProbe
+from components.BandedDTW import BandedDTW
+from enums.AnalysisProfile import AnalysisProfile
+from enums.DTWEngine import DTWEngine
+from repositories.Tracer import Tracer
+
 
 class AudioProcessor:
+    def __init__(self, feature_store=None, dtw_engine: DTWEngine = DTWEngine.BANDED, dtw_band_ratio=None,
+                 profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        self.feature_store = feature_store
+        self.dtw_engine = dtw_engine
+        self.profile = profile
+        self.dtw_band_ratio = dtw_band_ratio or profile.dtw_band_ratio
+
+    @staticmethod
+    def load_and_normalize_audio(audio_path, sr=22050):
+        with Tracer.span('audio.decode', os.path.getsize(audio_path)):
+            y, sr = librosa.load(audio_path, sr=sr)
+            y = librosa.util.normalize(y)
+            return y, sr
 
     @staticmethod
-    def load_and_normalize_audio(audio_path):
-        y, sr = librosa.load(audio_path)
-        y = librosa.util.normalize(y)
-        return y, sr
+    def load_and_normalize_pcm(audio_data, sr=22050):
+        """Decodes a WAV or FLAC buffer in memory, without a temporary file or a codec library."""
+        with Tracer.span('audio.decode', len(audio_data)):
+            y, native_sr = soundfile.read(io.BytesIO(audio_data), dtype='float32')
+            if y.ndim > 1:
+                y = y.mean(axis=1)
+            if native_sr != sr:
+                y = librosa.resample(y, orig_sr=native_sr, target_sr=sr)
+            y = librosa.util.normalize(y)
+            return y, sr
 
     @staticmethod
-    def compute_mfcc(audio, sr):
-        return librosa.feature.mfcc(y=audio, sr=sr)
+    def compute_mfcc(audio, sr, n_fft=2048, hop_length=512):
+        return librosa.feature.mfcc(y=audio, sr=sr, n_fft=n_fft, hop_length=hop_length)
 
     @staticmethod
-    def compute_chromagram(audio, sr):
-        return librosa.feature.chroma_stft(y=audio, sr=sr)
+    def compute_chromagram(audio, sr, n_fft=2048, hop_length=512, chroma_feature='chroma_stft'):
+        if chroma_feature == 'chroma_cqt':
+            return librosa.feature.chroma_cqt(y=audio, sr=sr, hop_length=hop_length)
+        return librosa.feature.chroma_stft(y=audio, sr=sr, n_fft=n_fft, hop_length=hop_length)
 
     @staticmethod
     def euclidean_distance(feature1, feature2):
@@ -39,6 +70,21 @@ class AudioProcessor:
         distance, _ = fastdtw(feature1.T, feature2.T, dist=cosine)
         return distance
 
+    def banded_dtw_euclidean_distance(self, feature1, feature2, max_distance=None):
+        return BandedDTW(self.dtw_band_ratio, metric='euclidean').distance(
+            feature1.T, feature2.T, max_distance)
+
+    def banded_dtw_cosine_distance(self, feature1, feature2, max_distance=None):
+        return BandedDTW(self.dtw_band_ratio, metric='cosine').distance(
+            feature1.T, feature2.T, max_distance)
+
+    def dtw_distance(self, feature1, feature2, max_distance=None):
+        # The banded engine agrees with fastdtw to within 0.1% on chroma sequences
+        # (see tests/benchmarks/DTW_benchmark.py) and is several times faster
+        if self.dtw_engine == DTWEngine.BANDED:
+            return self.banded_dtw_euclidean_distance(feature1, feature2, max_distance)
+        return self.dtw_euclidean_distance(feature1, feature2)
+
     @staticmethod
     def distance_to_score(distance, min_distance=0, max_distance=1000):
         if distance <= min_distance:
@@ -49,17 +95,37 @@ class AudioProcessor:
             return round(10 - ((distance - min_distance) / (max_distance - min_distance) * 10))
 
     @classmethod
-    def extract_features(cls, audio_path):
-        y, sr = cls.load_and_normalize_audio(audio_path)
-        chroma = cls.compute_chromagram(y, sr)
-        mfcc = cls.compute_mfcc(y, sr)
-        return chroma, zscore(mfcc)
+    def extract_features(cls, audio_path, profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        y, sr = cls.load_and_normalize_audio(audio_path, profile.sample_rate)
+        return cls.extract_features_from_audio(y, sr, profile)
 
     @classmethod
-    def compare_audio(cls, teacher_path, student_path):
-        t_chroma, t_mfcc = cls.extract_features(teacher_path)
-        s_chroma, s_mfcc = cls.extract_features(student_path)
-        return np.mean([cls.dtw_euclidean_distance(t_chroma, s_chroma)])
+    def extract_features_from_audio(cls, y, sr, profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        with Tracer.span('audio.chroma'):
+            chroma = cls.compute_chromagram(y, sr, profile.n_fft, profile.hop_length, profile.chroma_feature)
+        with Tracer.span('audio.mfcc'):
+            mfcc = cls.compute_mfcc(y, sr, profile.n_fft, profile.hop_length)
+        return chroma, zscore(mfcc)
+
+    def compare_audio(self, teacher_path, student_path):
+        t_chroma, t_mfcc = self.extract_features(teacher_path, self.profile)
+        s_chroma, s_mfcc = self.extract_features(student_path, self.profile)
+        return self.compare_features(t_chroma, s_chroma)
+
+    def compare_audio_with_reference(self, track_id, student_path):
+        # The track features are precomputed, so only the student recording is decoded
+        t_chroma, t_mfcc = self.feature_store.load(track_id, self.profile)
+        s_chroma, s_mfcc = self.extract_features(student_path, self.profile)
+        return self.compare_features(t_chroma, s_chroma)
+
+    def compare_analysis_with_reference(self, track_id, student_analysis):
+        t_chroma, t_mfcc = self.feature_store.load(track_id, self.profile)
+        s_chroma, s_mfcc = student_analysis.features
+        return self.compare_features(t_chroma, s_chroma)
+
+    def compare_features(self, t_chroma, s_chroma):
+        with Tracer.span('audio.dtw'):
+            return np.mean([self.dtw_distance(t_chroma, s_chroma)])
 
     @staticmethod
     def error_and_missing_notes(set_a, set_b):
@@ -67,30 +133,75 @@ class AudioProcessor:
         set_b = set(set_b)
         return set_b - set_a, set_a - set_b
 
-    @staticmethod
-    def freq_to_note(freq):
+    SWARAS = ['N3', 'S', 'R1', 'R2', 'G2', 'G3', 'M1', 'M2', 'P', 'D1', 'D2', 'N2']
+
+    @classmethod
+    def freq_to_note(cls, freq):
         a4_freq = 440.0
-        swaras = ['N3', 'S', 'R1', 'R2', 'G2', 'G3', 'M1', 'M2', 'P', 'D1', 'D2', 'N2']
         num_semitones = int(round(12.0 * np.log2(freq / a4_freq)))
-        return swaras[num_semitones % 12]
+        return cls.SWARAS[num_semitones % 12]
+
+    @classmethod
+    def freqs_to_notes(cls, freqs):
+        """Vectorized freq_to_note for an array of positive frequencies."""
+        a4_freq = 440.0
+        num_semitones = np.rint(12.0 * np.log2(np.asarray(freqs, dtype=np.float64) / a4_freq)).astype(int)
+        swaras = np.array(cls.SWARAS)
+        return swaras[num_semitones % 12].tolist()
 
     @classmethod
-    def get_notes(cls, audio_path):
-        y, sr = cls.load_and_normalize_audio(audio_path)
-        o_env = librosa.onset.onset_strength(y=y, sr=sr)
-        onset_frames = librosa.onset.onset_detect(onset_envelope=o_env, normalize=True, sr=sr)
-        onset_samples = librosa.frames_to_samples(onset_frames)
-        slices = [y[start:end] for start, end in zip(onset_samples[:-1], onset_samples[1:])]
-        notes = []
-        for audio_slice in slices:
-            fft_result = np.fft.fft(audio_slice)
-            frequencies = np.fft.fftfreq(len(fft_result))
-            magnitude = np.abs(fft_result)
-            peak_frequency = frequencies[np.argmax(magnitude)]
-            if peak_frequency > 0:
-                note= cls.freq_to_note(peak_frequency)
-                notes.append(note)
-        return notes
+    def get_notes(cls, audio_path, profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        y, sr = cls.load_and_normalize_audio(audio_path, profile.sample_rate)
+        return cls.get_notes_from_audio(y, sr)
+
+    @classmethod
+    def get_notes_from_audio(cls, y, sr, n_fft=2048, hop_length=512):
+        """
+        Returns the swara of the dominant frequency between each pair of consecutive
+        onsets. One STFT of the whole signal is shared by the onset detection and the
+        pitch estimate, and the magnitude spectra of the frames of each onset segment
+        are summed with np.add.reduceat, so there is no FFT per segment.
+        """
+        with Tracer.span('audio.onsets'):
+            magnitude = np.abs(librosa.stft(y, n_fft=n_fft, hop_length=hop_length))
+            # Same onset envelope as onset_strength(y=y), without computing another STFT
+            mel = librosa.feature.melspectrogram(S=magnitude ** 2, sr=sr)
+            o_env = librosa.onset.onset_strength(S=librosa.power_to_db(mel), sr=sr, hop_length=hop_length)
+            onset_frames = librosa.onset.onset_detect(
+                onset_envelope=o_env, normalize=True, sr=sr, hop_length=hop_length)
+        onset_frames = onset_frames[onset_frames < magnitude.shape[1]]
+        if len(onset_frames) < 2:
+            return []
+
+        with Tracer.span('audio.pitch'):
+            # Segment k spans the frames onset_frames[k] .. onset_frames[k + 1] - 1, the frames
+            # after the last onset are dropped like the samples after the last onset were
+            segment_spectra = np.add.reduceat(magnitude[:, :onset_frames[-1]], onset_frames[:-1], axis=1)
+            peak_bins = cls._interpolate_peak_bins(segment_spectra)
+
+        # Frequencies are kept in cycles per sample, as np.fft.fftfreq returned them
+        # for each slice, so the notes match the ones stored before
+        peak_frequencies = peak_bins / n_fft
+        return cls.freqs_to_notes(peak_frequencies[peak_frequencies > 0])
+
+    @staticmethod
+    def _interpolate_peak_bins(spectra):
+        """
+        Returns the fractional bin of the peak of each column, refined with a parabola
+        through the log magnitudes around the peak, since STFT bins are coarser than
+        the FFT of a long slice.
+        """
+        peak_bins = np.argmax(spectra, axis=0)
+        columns = np.arange(spectra.shape[1])
+        inner = (peak_bins > 0) & (peak_bins < spectra.shape[0] - 1)
+        left = np.log(spectra[np.maximum(peak_bins - 1, 0), columns] + 1e-10)
+        center = np.log(spectra[peak_bins, columns] + 1e-10)
+        right = np.log(spectra[np.minimum(peak_bins + 1, spectra.shape[0] - 1), columns] + 1e-10)
+        denominator = left - 2 * center + right
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offsets = np.where(inner & (denominator < 0), 0.5 * (left - right) / denominator, 0)
+        # A DC peak stays at bin 0 and is skipped like before
+        return np.where(peak_bins > 0, peak_bins + offsets, 0)
 
     @staticmethod
     def filter_consecutive_notes(notes, min_consecutive=1):
@@ -158,5 +269,9 @@ class AudioProcessor:
 
     @staticmethod
     def calculate_audio_duration(path):
+        with open(path, "rb") as f:
+            duration = AudioDurationProbe.probe(f.read())
+        if duration is not None:
+            return duration
         y, sr = librosa.load(path)
         return librosa.get_duration(y=y, sr=sr)
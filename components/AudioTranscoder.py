@@ -0,0 +1,65 @@
+import io
+import os
+
+import librosa
+import soundfile
+
+from enums.AnalysisProfile import AnalysisProfile
+from repositories.Tracer import Tracer
+
+
+class AudioTranscoder:
+    """
+    Produces the compact derivatives stored next to every uploaded recording:
+    a low-bitrate mono Opus file for playback and a 16-bit mono FLAC proxy for
+    analysis. The proxy is kept at the highest analysis sample rate, so any
+    profile can decode it without a codec and only has to resample down.
+    """
+    # Opus only encodes at 8, 12, 16, 24 or 48 kHz, 24 kHz covers the voice and instrument range
+    PLAYBACK_SAMPLE_RATE = 24000
+    PLAYBACK_SUFFIX = '.opus'
+    PLAYBACK_MIME_TYPE = 'audio/ogg; codecs=opus'
+    # The profile with the highest sample rate, the proxy is decoded with it when needed
+    ANALYSIS_PROFILE = max(AnalysisProfile, key=lambda profile: profile.sample_rate)
+    ANALYSIS_SAMPLE_RATE = ANALYSIS_PROFILE.sample_rate
+    ANALYSIS_SUFFIX = '.flac'
+    # Uploads are m4a from the browser recorder, the rest come from older uploads and imports
+    MIME_TYPES = {'.opus': 'audio/ogg', '.ogg': 'audio/ogg', '.m4a': 'audio/mp4', '.mp4': 'audio/mp4',
+                  '.mp3': 'audio/mpeg', '.wav': 'audio/wav', '.flac': 'audio/flac'}
+
+    @classmethod
+    def transcode(cls, y, sr):
+        """Returns the playback and analysis derivatives of normalized mono audio."""
+        if sr < cls.ANALYSIS_SAMPLE_RATE:
+            raise ValueError(f"Audio at {sr} Hz is below the analysis sample rate of {cls.ANALYSIS_SAMPLE_RATE} Hz")
+        return cls.to_playback(y, sr), cls.to_analysis_proxy(y, sr)
+
+    @classmethod
+    def to_playback(cls, y, sr):
+        with Tracer.span('audio.encode_playback'):
+            y = librosa.resample(y, orig_sr=sr, target_sr=cls.PLAYBACK_SAMPLE_RATE)
+            return cls.encode(y, cls.PLAYBACK_SAMPLE_RATE, 'OGG', 'OPUS')
+
+    @classmethod
+    def to_analysis_proxy(cls, y, sr):
+        with Tracer.span('audio.encode_analysis'):
+            if sr != cls.ANALYSIS_SAMPLE_RATE:
+                y = librosa.resample(y, orig_sr=sr, target_sr=cls.ANALYSIS_SAMPLE_RATE)
+            return cls.encode(y, cls.ANALYSIS_SAMPLE_RATE, 'FLAC', 'PCM_16')
+
+    @staticmethod
+    def encode(y, sr, file_format, subtype):
+        buffer = io.BytesIO()
+        soundfile.write(buffer, y, sr, format=file_format, subtype=subtype)
+        return buffer.getvalue()
+
+    @classmethod
+    def get_derivative_names(cls, blob_name):
+        """Returns the playback and analysis blob names stored next to an original recording."""
+        base_name = os.path.splitext(blob_name)[0]
+        return f"{base_name}.playback{cls.PLAYBACK_SUFFIX}", f"{base_name}.analysis{cls.ANALYSIS_SUFFIX}"
+
+    @classmethod
+    def get_mime_type(cls, blob_name):
+        """Returns the type a player is given for a stored recording, m4a when the name has no known suffix."""
+        return cls.MIME_TYPES.get(os.path.splitext(blob_name)[1].lower(), 'audio/mp4')
@@ -1,6 +1,6 @@
-import os
 import datetime
 
+from components.AssetSync import AssetSync
 from enums.Badges import UserBadges, TrackBadges
 from enums.TimeFrame import TimeFrame
 from repositories.PortalRepository import PortalRepository
@@ -35,22 +35,26 @@ class BadgeAwarder:
 
         return badge_awarded
 
-    def auto_award_badges(self, group_id, timeframe=TimeFrame.PREVIOUS_WEEK):
-        # Retrieve weekly stats for all users in the group within the date range
-        stats = self.portal_repo.get_group_stats(group_id, timeframe)
-        # No data for the previous week
-        if len(stats) == 0:
-            return False
-
-        # Iterate through each stat and check if the threshold is met
-        for stat in stats:
-            # Check if the category from stat is a valid badge and has a threshold
-            badge_category = stat['category']
-            if badge_category and stat['value'] >= badge_category.threshold:
-                # Award the weekly badges to the students if they meet the threshold
-                self.user_achievement_repo.award_user_badge_by_time_frame(
-                    stat['student_id'], badge_category, timeframe, stat['value'])
-        return True
+    def auto_award_badges(self, group_ids, timeframe=TimeFrame.PREVIOUS_WEEK):
+        # Retrieve the stats for all users of the groups within the date range, in one query
+        stats_by_group = self.portal_repo.get_groups_stats(group_ids, timeframe)
+        badges_awarded = False
+
+        for stats in stats_by_group.values():
+            # No data for the time frame
+            if len(stats) == 0:
+                continue
+
+            # Iterate through each stat and check if the threshold is met
+            for stat in stats:
+                # Check if the category from stat is a valid badge and has a threshold
+                badge_category = stat['category']
+                if badge_category and stat['value'] >= badge_category.threshold:
+                    # Award the weekly badges to the students if they meet the threshold
+                    self.user_achievement_repo.award_user_badge_by_time_frame(
+                        stat['student_id'], badge_category, timeframe, stat['value'])
+            badges_awarded = True
+        return badges_awarded
 
     def award_track_badge(self, org_id, user_id, recording_id, badge: TrackBadges,
                           timestamp=datetime.datetime.now()):
@@ -65,25 +69,7 @@ class BadgeAwarder:
         return badge_awarded
 
     def get_badge(self, badge_name):
-        # Directory where badges are stored locally
-        local_badges_directory = 'badges'
-
-        # Construct the local file path for the badge
-        local_file_path = os.path.join(local_badges_directory, f"{badge_name}.png")
-
-        # Check if the badge exists locally
-        if os.path.exists(local_file_path):
-            return local_file_path
-
-        # If badge not found locally, attempt to download from remote
-        remote_path = f"{self.get_badges_bucket()}/{badge_name}.png"
-        success = self.storage_repo.download_blob_and_save(remote_path, local_file_path)
-
-        if success:
-            return local_file_path
-        else:
-            print(f"Failed to download badge named '{badge_name}' from remote location.")
-            return None
+        return AssetSync.get_instance(self.storage_repo).get_path(f"{self.get_badges_bucket()}/{badge_name}.png")
 
     @staticmethod
     def get_badges_bucket():
@@ -0,0 +1,101 @@
+import math
+
+import numpy as np
+
+
+class BandedDTW:
+    """
+    Dynamic time warping restricted to a Sakoe-Chiba band around the diagonal.
+
+    The local costs are computed block by block as pairwise cost matrices and
+    each row of the accumulated cost is resolved with vectorized NumPy operations,
+    so there is no per-frame Python callback. Only one row of accumulated costs
+    (stored as float32) is kept in memory, and the computation can be abandoned
+    early once every path is known to exceed a distance threshold.
+    """
+
+    def __init__(self, band_ratio=0.1, min_band=32, max_band=1024, metric='euclidean', block_size=256):
+        self.band_ratio = band_ratio
+        self.min_band = min_band
+        self.max_band = max_band
+        self.metric = metric
+        self.block_size = block_size
+
+    def distance(self, x, y, max_distance=None):
+        """
+        Returns the DTW distance between the sequences x (n frames) and y (m frames),
+        or infinity if max_distance is given and every warping path exceeds it.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if x.ndim == 1:
+            x = x[:, np.newaxis]
+        if y.ndim == 1:
+            y = y[:, np.newaxis]
+        n, m = len(x), len(y)
+        if n == 0 or m == 0:
+            return float('inf')
+
+        lows, highs = self.get_band(n, m)
+        prev_row = None
+        prev_low = 0
+        for block_start in range(0, n, self.block_size):
+            block_end = min(block_start + self.block_size, n)
+            column_low = lows[block_start]
+            column_high = highs[block_end - 1]
+            costs = self.pairwise_costs(x[block_start:block_end], y[column_low:column_high])
+
+            for i in range(block_start, block_end):
+                low, high = lows[i], highs[i]
+                row_costs = costs[i - block_start, low - column_low:high - column_low]
+                prev_row = self._accumulate_row(row_costs, prev_row, prev_low, low, high)
+                prev_low = low
+
+                # Costs are non-negative, so every path through this row exceeds the threshold
+                if max_distance is not None and prev_row.min() > max_distance:
+                    return float('inf')
+
+        return float(prev_row[m - 1 - prev_low])
+
+    def get_band(self, n, m):
+        """Returns the first and one-past-last column of the band for each row."""
+        # The band grows with the recording length, up to max_band frames either side
+        radius = min(max(self.min_band, int(math.ceil(self.band_ratio * max(n, m)))), self.max_band)
+        radius = max(radius, int(math.ceil(m / n)))
+        centers = np.arange(n) * ((m - 1) / (n - 1)) if n > 1 else np.zeros(1)
+        lows = np.maximum(np.floor(centers).astype(int) - radius, 0)
+        highs = np.minimum(np.ceil(centers).astype(int) + radius + 1, m)
+        return lows, highs
+
+    def pairwise_costs(self, x, y):
+        if self.metric == 'euclidean':
+            squared = (np.sum(x ** 2, axis=1)[:, np.newaxis] + np.sum(y ** 2, axis=1)[np.newaxis, :]
+                       - 2 * (x @ y.T))
+            return np.sqrt(np.maximum(squared, 0))
+        if self.metric == 'cosine':
+            norms = np.linalg.norm(x, axis=1)[:, np.newaxis] * np.linalg.norm(y, axis=1)[np.newaxis, :]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                similarity = np.where(norms > 0, (x @ y.T) / norms, 0)
+            return 1 - similarity
+        raise ValueError(f"Unsupported DTW metric: {self.metric}")
+
+    @staticmethod
+    def _accumulate_row(row_costs, prev_row, prev_low, low, high):
+        width = high - low
+        if prev_row is None:
+            # The first row can only be reached by horizontal steps
+            return np.cumsum(row_costs).astype(np.float32)
+
+        # Accumulated costs of the previous row for columns low-1 .. high-1
+        previous = np.full(width + 1, np.inf)
+        start = max(prev_low, low - 1)
+        end = min(prev_low + len(prev_row), high)
+        if start < end:
+            previous[start - (low - 1):end - (low - 1)] = prev_row[start - prev_low:end - prev_low]
+        best_vertical = np.minimum(previous[1:], previous[:-1]) + row_costs
+
+        # Horizontal steps make D[j] = min(best_vertical[j], D[j-1] + cost[j]), which is a
+        # running minimum once the prefix sum of the row costs is taken out
+        prefix = np.cumsum(row_costs)
+        row = prefix + np.minimum.accumulate(best_vertical - prefix)
+        return row.astype(np.float32)
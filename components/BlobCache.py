@@ -0,0 +1,152 @@
+import fcntl
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class BlobCache:
+    """
+    Process-wide on-disk cache of downloaded blobs. Entries are keyed by the blob
+    name and its generation, so an overwritten blob is never served stale, and
+    the least recently used entries are evicted once the cache grows past its
+    byte limit. The app processes share the directory: any file in it is a hit,
+    whichever process wrote it, and the byte limit is enforced over the whole
+    directory under a file lock.
+    """
+    LOCK_FILE = '.lock'
+    # Temporary files left behind by a process that died mid-write
+    STALE_TEMP_SECONDS = 3600
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if os.path.exists(self.directory):
+            self._enforce_limit()
+
+    @classmethod
+    def get_instance(cls, directory=None, max_bytes=None):
+        directory = directory or os.environ.get('BLOB_CACHE_DIR', 'blob_cache')
+        max_bytes = max_bytes or int(os.environ.get('BLOB_CACHE_MAX_BYTES', 1024 ** 3))
+        with cls._instances_lock:
+            if directory not in cls._instances:
+                cls._instances[directory] = cls(directory, max_bytes)
+            return cls._instances[directory]
+
+    @staticmethod
+    def get_key(blob_name, generation):
+        return hashlib.sha256(f"{blob_name}#{generation}".encode()).hexdigest()
+
+    def get(self, key):
+        try:
+            path = self.get_path(key)
+            with open(path, "rb") as f:
+                data = f.read()
+            self._touch(path)
+        except FileNotFoundError:
+            # Never cached, or evicted by another process sharing the directory
+            with self.lock:
+                self._remove_entry(key)
+                self.misses += 1
+            return None
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+
+        # Write to a temporary file first so concurrent readers never see a partial file
+        path = self.get_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        self._touch(path)
+
+        self._enforce_limit()
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+            }
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key)
+
+    @staticmethod
+    def _touch(path):
+        # The modification time orders the entries for eviction across processes. It is set
+        # from the clock rather than left to the file system, whose timestamps are coarser
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def _enforce_limit(self):
+        # The other processes write to the same directory, so its size is only known
+        # from a scan, and the scan and the evictions run under a lock shared with them
+        with self.lock, open(os.path.join(self.directory, self.LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._load_index()
+                self._evict()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            key, _ = next(iter(self.entries.items()))
+            self._remove_entry(key)
+            self.evictions += 1
+            try:
+                os.remove(self.get_path(key))
+            except FileNotFoundError:
+                pass
+
+    def _remove_entry(self, key):
+        size = self.entries.pop(key, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def _load_index(self):
+        files = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if name == self.LOCK_FILE:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+                if name.endswith('.tmp'):
+                    if now - stat.st_mtime > self.STALE_TEMP_SECONDS:
+                        os.remove(path)
+                    continue
+            except FileNotFoundError:
+                # Replaced or evicted by another process since the listing
+                continue
+            files.append((stat.st_mtime_ns, name, stat.st_size))
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        for _, name, size in sorted(files):
+            self.entries[name] = size
+            self.total_bytes += size
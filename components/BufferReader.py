@@ -0,0 +1,46 @@
+import io
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Read-only file object over a bytes-like buffer, such as the memoryview
+    returned by an uploaded file's getbuffer(). Unlike BytesIO it does not copy
+    the buffer up front, each read only copies the chunk it returns.
+    """
+
+    def __init__(self, data):
+        super().__init__()
+        self.view = memoryview(data).cast('B')
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self.view[self.position:self.position + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self.position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = len(self.view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position: {position}")
+        self.position = position
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def __len__(self):
+        return len(self.view)
@@ -0,0 +1,188 @@
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from components.ScoringWorker import analyze_recording_data, init_scoring_process
+from enums.AnalysisProfile import AnalysisProfile
+from enums.Settings import Settings
+from repositories.RecordingRepository import RecordingRepository
+from repositories.SettingsRepository import SettingsRepository
+from repositories.StorageRepository import StorageRepository
+
+
+class RecordingRescorer:
+    """
+    Rescores existing recordings after a track offset or the scoring algorithm
+    changed. A prefetch thread pages through the matching recordings and
+    downloads their blobs into a bounded queue, a process pool scores them, and
+    the results are written back in batches. Progress is checkpointed to a JSON
+    file after every batch so an interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, connection, reader_connection, filters, checkpoint_path='rescore_checkpoint.json',
+                 max_workers=None, prefetch_size=32, batch_size=50, page_size=500,
+                 profile: AnalysisProfile = None, bucket_name='melodymaster', report_interval=30):
+        self.recording_repo = RecordingRepository(connection)
+        # The prefetch thread pages with its own connection, pymysql connections are not thread safe
+        self.reader_recording_repo = RecordingRepository(reader_connection)
+        self.settings_repo = SettingsRepository(reader_connection)
+        self.storage_repo = StorageRepository(bucket_name)
+        self.filters = filters
+        self.checkpoint_path = checkpoint_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.prefetch_size = prefetch_size
+        self.batch_size = batch_size
+        self.page_size = page_size
+        self.profile = profile
+        self.bucket_name = bucket_name
+        self.report_interval = report_interval
+        self.org_profiles = {}
+        self.stop_event = threading.Event()
+
+    def run(self):
+        checkpoint = self.load_checkpoint()
+        prefetch_queue = queue.Queue(maxsize=self.prefetch_size)
+        prefetcher = threading.Thread(
+            target=self.prefetch, args=(checkpoint['last_id'], prefetch_queue), name='rescore-prefetch', daemon=True)
+        prefetcher.start()
+
+        start_time = time.monotonic()
+        last_report_time = start_time
+        scored_at_start = checkpoint['scored']
+        # Recording ids in the order they were handed out, the checkpoint only moves past
+        # an id once it and every id before it have finished
+        in_order = deque()
+        finished = {}
+        batch = []
+        running = {}
+        exhausted = False
+
+        mp_context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp_context,
+                                 initializer=init_scoring_process, initargs=(self.bucket_name,)) as executor:
+            try:
+                while not exhausted or running:
+                    # Keep every process busy, with at most two recordings waiting per process
+                    while not exhausted and len(running) < 2 * self.max_workers:
+                        item = prefetch_queue.get()
+                        if item is None:
+                            exhausted = True
+                            break
+                        recording, recording_data, profile = item
+                        in_order.append(recording['id'])
+                        if recording_data is None:
+                            checkpoint['failed'].append(recording['id'])
+                            finished[recording['id']] = False
+                            continue
+                        future = executor.submit(analyze_recording_data, recording['track_id'],
+                                                 self.get_source_blob_name(recording), recording_data,
+                                                 profile.profile_name)
+                        running[future] = recording
+
+                    if not running:
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        recording = running.pop(future)
+                        try:
+                            distance, score, analysis = future.result()
+                            batch.append((recording['id'], distance, score, analysis))
+                            finished[recording['id']] = True
+                        except Exception as e:
+                            print(f"Error while rescoring recording {recording['id']}: {e}")
+                            checkpoint['failed'].append(recording['id'])
+                            finished[recording['id']] = False
+
+                    if len(batch) >= self.batch_size:
+                        self.flush(batch, checkpoint, in_order, finished)
+                    if time.monotonic() - last_report_time >= self.report_interval:
+                        self.report(checkpoint['scored'] + len(batch) - scored_at_start, start_time)
+                        last_report_time = time.monotonic()
+            finally:
+                self.stop_event.set()
+                self.flush(batch, checkpoint, in_order, finished)
+
+        self.report(checkpoint['scored'] - scored_at_start, start_time)
+        print(f"Rescored {checkpoint['scored']} recordings, {len(checkpoint['failed'])} failed. "
+              f"Checkpoint: {self.checkpoint_path}")
+        return checkpoint
+
+    def prefetch(self, after_id, prefetch_queue):
+        """Streams the matching recordings with their blobs into the queue, ending with None."""
+        try:
+            while not self.stop_event.is_set():
+                recordings = self.reader_recording_repo.get_recordings_for_rescoring(
+                    after_id, self.page_size, **self.filters)
+                if not recordings:
+                    break
+                for recording in recordings:
+                    try:
+                        recording_data = self.storage_repo.download_blob_by_name(
+                            self.get_source_blob_name(recording))
+                    except Exception as e:
+                        # Passed on without data so the recording is counted as failed
+                        print(f"Error while downloading recording {recording['id']}: {e}")
+                        recording_data = None
+                    profile = self.get_profile(recording['org_id'])
+                    # Blocks while the queue is full, so downloads never run far ahead of scoring
+                    while not self.stop_event.is_set():
+                        try:
+                            prefetch_queue.put((recording, recording_data, profile), timeout=1)
+                            break
+                        except queue.Full:
+                            continue
+                after_id = recordings[-1]['id']
+        except Exception as e:
+            print(f"Error while prefetching recordings: {e}")
+        finally:
+            prefetch_queue.put(None)
+
+    @staticmethod
+    def get_source_blob_name(recording):
+        # The analysis proxy decodes without a codec, older recordings only have the original
+        return recording.get('analysis_blob_name') or recording['blob_name']
+
+    def get_profile(self, org_id):
+        if self.profile is not None:
+            return self.profile
+        if org_id not in self.org_profiles:
+            self.org_profiles[org_id] = AnalysisProfile.get_by_name(
+                self.settings_repo.get_setting(org_id, Settings.ANALYSIS_PROFILE))
+        return self.org_profiles[org_id]
+
+    def flush(self, batch, checkpoint, in_order, finished):
+        if batch:
+            self.recording_repo.update_scores_and_analyses(batch)
+            checkpoint['scored'] += len(batch)
+            batch.clear()
+        while in_order and in_order[0] in finished:
+            checkpoint['last_id'] = in_order.popleft()
+            finished.pop(checkpoint['last_id'])
+        self.save_checkpoint(checkpoint)
+
+    def load_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint.get('filters') == self.filters:
+                print(f"Resuming after recording {checkpoint['last_id']}")
+                return checkpoint
+            print(f"Ignoring {self.checkpoint_path}, it was written for other filters.")
+        return {'filters': self.filters, 'last_id': 0, 'scored': 0, 'failed': []}
+
+    def save_checkpoint(self, checkpoint):
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(checkpoint, f, default=str)
+        os.replace(temp_path, self.checkpoint_path)
+
+    @staticmethod
+    def report(scored, start_time):
+        minutes = (time.monotonic() - start_time) / 60
+        rate = scored / minutes if minutes > 0 else 0
+        print(f"Rescored {scored} recordings in {minutes:.1f} min ({rate:.1f} recordings/min)")
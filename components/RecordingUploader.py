@@ -1,17 +1,25 @@
 import datetime
 import hashlib
+import time
 import uuid
 
 import streamlit as st
 
+from components.AudioAnalysis import AudioAnalysis
 from components.AudioProcessor import AudioProcessor
+from components.AudioTranscoder import AudioTranscoder
 from components.BadgeAwarder import BadgeAwarder
 from components.TimeConverter import TimeConverter
+from components.WaveformPeaks import WaveformPeaks
 from enums.ActivityType import ActivityType
 from enums.Badges import UserBadges
+from enums.ScoringStatus import ScoringStatus
+from repositories.ConnectionPool import ConnectionPool
 from repositories.RagaRepository import RagaRepository
 from repositories.RecordingRepository import RecordingRepository
+from repositories.ScoringJobRepository import ScoringJobRepository
 from repositories.StorageRepository import StorageRepository
+from repositories.Tracer import Tracer
 from repositories.UserActivityRepository import UserActivityRepository
 from repositories.UserSessionRepository import UserSessionRepository
 
@@ -23,7 +31,8 @@ class RecordingUploader:
                  user_session_repo: UserSessionRepository,
                  storage_repo: StorageRepository,
                  badge_awarder: BadgeAwarder,
-                 audio_processor: AudioProcessor):
+                 audio_processor: AudioProcessor,
+                 scoring_job_repo: ScoringJobRepository):
         self.recording_repo = recording_repo
         self.raga_repo = raga_repo
         self.user_activity_repo = user_activity_repo
@@ -31,6 +40,7 @@ class RecordingUploader:
         self.storage_repo = storage_repo
         self.badge_awarder = badge_awarder
         self.audio_processor = audio_processor
+        self.scoring_job_repo = scoring_job_repo
 
     def upload(self, session_id, org_id, user_id,
                track, bucket, assignment_id=None, timezone='America/Los_Angeles'):
@@ -47,7 +57,7 @@ class RecordingUploader:
             upload_successful = False
             badge_awarded = False
             recording_id = -1
-            recording_name = None
+            recording_analysis = None
             if uploaded:
                 if uploaded_student_file is None:
                     st.error("Please upload a recording..")
@@ -61,21 +71,27 @@ class RecordingUploader:
                 else:
                     original_timestamp = datetime.datetime.now()
 
-                with st.spinner("Please wait.."):
+                with st.spinner("Please wait.."), Tracer.span('recording.upload') as upload_span:
                     recording_data = uploaded_student_file.getbuffer()
+                    upload_span.add_bytes(recording_data.nbytes)
                     file_hash = self.calculate_file_hash(recording_data)
 
                     # Check for duplicates
-                    if self.recording_repo.is_duplicate_recording(user_id, track_id, file_hash):
+                    with Tracer.span('db.duplicate_check'):
+                        is_duplicate = self.recording_repo.is_duplicate_recording(user_id, track_id, file_hash)
+                    if is_duplicate:
                         st.error("You have already uploaded this recording.")
                         return "", -1, False, original_timestamp
 
                     # Upload the recording to storage repo and recording repo
-                    recording_name, url, recording_id = self.add_recording(
+                    recording_name, url, recording_id, recording_analysis = self.add_recording(
                         user_id, track_id, recording_data, original_timestamp,
                         file_hash, bucket, assignment_id)
+                    # Scoring runs on the background worker, see show_score
+                    with Tracer.span('db.enqueue_scoring'):
+                        self.scoring_job_repo.enqueue(recording_id, track_id, self.audio_processor.profile)
 
-                    st.audio(recording_name, format='audio/mp4')
+                    st.audio(recording_data.tobytes(), format='audio/mp4')
                     # Success
                     additional_params = {
                         "track_name": track['track_name'],
@@ -88,25 +104,54 @@ class RecordingUploader:
                         org_id, user_id, UserBadges.FIRST_NOTE, original_timestamp)
                     upload_successful = True
 
-        return upload_successful, badge_awarded, recording_id, recording_name
+        return upload_successful, badge_awarded, recording_id, recording_analysis
 
     def add_recording(self, user_id, track_id, recording_data,
                       timestamp, file_hash, bucket, assignment_id):
         recording_name = f"{user_id}-{track_id}-{timestamp.strftime('%Y%m%d%H%M%S')}.m4a"
         blob_name = f'{bucket}/{recording_name}'
         blob_url = self.storage_repo.upload_blob(recording_data, blob_name)
-        self.storage_repo.download_blob(blob_url, recording_name)
-        duration = self.audio_processor.calculate_audio_duration(recording_name)
-        recording_id = self.recording_repo.add_recording(
-            user_id, track_id, blob_name, blob_url, timestamp,
-            duration, file_hash, "", "", assignment_id)
-        return recording_name, blob_url, recording_id
-
-    def analyze_recording(self, track, track_audio_path, recording_name):
+        # The duration is read from the header of the uploaded buffer, nothing is
+        # downloaded back or decoded here
+        recording_analysis = AudioAnalysis.from_bytes(recording_data, '.m4a', self.audio_processor.profile)
+        duration = recording_analysis.duration
+        with Tracer.span('db.add_recording'):
+            recording_id = self.recording_repo.add_recording(
+                user_id, track_id, blob_name, blob_url, timestamp,
+                duration, file_hash, "", "", assignment_id)
+        return recording_name, blob_url, recording_id, recording_analysis
+
+    def store_derivatives(self, recording_id, blob_name, recording_analysis):
+        """
+        Stores the compact playback and analysis derivatives of a recording next to
+        the original, which is kept as uploaded, and its waveform peaks. Runs on the
+        scoring worker, which has decoded the recording already, so uploads do not
+        wait for the encoders.
+        """
+        try:
+            with Tracer.span('recording.transcode'):
+                y, sr = recording_analysis.audio
+                if sr < AudioTranscoder.ANALYSIS_SAMPLE_RATE:
+                    # Decoded for a lower rate profile, the proxy has to serve every profile
+                    y, sr = AudioAnalysis.from_bytes(recording_analysis.audio_data, recording_analysis.suffix,
+                                                     AudioTranscoder.ANALYSIS_PROFILE).audio
+                playback_data, analysis_data = AudioTranscoder.transcode(y, sr)
+                peaks = WaveformPeaks.from_audio(y, sr).to_bytes()
+                playback_blob_name, analysis_blob_name = AudioTranscoder.get_derivative_names(blob_name)
+                self.storage_repo.upload_blob(playback_data, playback_blob_name)
+                self.storage_repo.upload_blob(analysis_data, analysis_blob_name)
+            with Tracer.span('db.update_derivatives'):
+                self.recording_repo.update_derivatives(recording_id, playback_blob_name, analysis_blob_name, peaks)
+        except Exception as e:
+            # Playback and analysis fall back to the original recording
+            print(f"Error while storing the derivatives of recording {recording_id}: {e}")
+
+    def analyze_recording(self, track, recording_analysis):
+        with Tracer.span('recording.analyze'):
             offset = self.get_offset(track)
-            distance = self.get_audio_distance(track_audio_path, recording_name)
+            distance = self.get_audio_distance(track['id'], recording_analysis)
             offset_corrected_distance = distance - offset
-            student_notes = self.get_filtered_student_notes(recording_name)
+            student_notes = self.get_filtered_student_notes(recording_analysis)
             track_notes = self.raga_repo.get_notes(track['ragam_id'])
             error_notes, missing_notes = self.audio_processor.error_and_missing_notes(
                 track_notes, student_notes)
@@ -116,21 +161,82 @@ class RecordingUploader:
                 error_notes, missing_notes)
             return distance, score, analysis
 
+    def show_score(self, key, recording_id, display_score, poll_interval=2, timeout=120):
+        """
+        Shows the scoring state of the recording last uploaded from the form of
+        key, without holding up the script. Called on every run, with the id of a
+        new upload or None. While the score is pending, a fragment reruns on its own
+        every poll_interval seconds and reads the status on a connection borrowed
+        from the pool for the one query. Once the score is in or the timeout has
+        passed, it reruns the app, which shows the outcome without polling and
+        forgets the upload.
+        """
+        state_key = f"scoring_{key}"
+        if recording_id is not None:
+            st.session_state[state_key] = {'recording_id': recording_id, 'deadline': time.time() + timeout,
+                                           'result': None}
+        state = st.session_state.get(state_key)
+        if state is None:
+            return
+        if self.is_scoring_settled(state):
+            # Shown once, the next run of the page no longer mentions the upload
+            del st.session_state[state_key]
+            self.display_scoring_state(state, display_score)
+            return
+
+        @st.fragment(run_every=poll_interval)
+        def poll_score():
+            # The connection of the script run was checked in when the run ended
+            with ConnectionPool.get_instance().connection() as connection:
+                state['result'] = self.get_finished_score(RecordingRepository(connection), state['recording_id'])
+            if self.is_scoring_settled(state):
+                # A fragment keeps its timer until the app reruns without it
+                st.rerun()
+            self.display_scoring_state(state, display_score)
+
+        poll_score()
+
+    @staticmethod
+    def is_scoring_settled(state):
+        return state['result'] is not None or time.time() >= state['deadline']
+
+    @staticmethod
+    def get_finished_score(recording_repo: RecordingRepository, recording_id):
+        """Returns the score and status of a scored or failed recording, or None while it is pending."""
+        result = recording_repo.get_score_and_status(recording_id)
+        if result and result['scoring_status'] in (ScoringStatus.COMPLETED.value, ScoringStatus.FAILED.value):
+            return result
+        return None
+
+    @staticmethod
+    def display_scoring_state(state, display_score):
+        result = state['result']
+        if result is None:
+            if time.time() < state['deadline']:
+                st.info("Scoring your recording..")
+            else:
+                st.info("Your recording is still being scored. "
+                        "The score will appear in your recordings shortly.")
+        elif result['scoring_status'] == ScoringStatus.COMPLETED.value:
+            display_score(result['score'])
+        else:
+            st.error("We could not score this recording. Your teacher will review it.")
+
     @staticmethod
     def calculate_file_hash(recording_data):
         return hashlib.md5(recording_data).hexdigest()
 
-    @staticmethod
-    def get_offset(track):
+    def get_offset(self, track):
+        # The offset is calibrated per analysis profile, so scores stay comparable across profiles
+        offset = self.audio_processor.feature_store.get_offset(track, self.audio_processor.profile)
         # TODO: control it via settings
         base = 1.1
         multiplier = base ** (track['level']-1)
-        return int(round(multiplier * track['offset']))
+        return int(round(multiplier * offset))
 
-    def get_audio_distance(self, track_file, student_path):
-        return self.audio_processor.compare_audio(track_file, student_path)
+    def get_audio_distance(self, track_id, recording_analysis):
+        return self.audio_processor.compare_analysis_with_reference(track_id, recording_analysis)
 
-    def get_filtered_student_notes(self, student_path):
-        student_notes = self.audio_processor.get_notes(student_path)
-        return self.audio_processor.filter_consecutive_notes(student_notes)
+    def get_filtered_student_notes(self, recording_analysis):
+        return self.audio_processor.filter_consecutive_notes(recording_analysis.notes)
 
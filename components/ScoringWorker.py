@@ -0,0 +1,208 @@
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from components.AudioAnalysis import AudioAnalysis
+from components.AudioProcessor import AudioProcessor
+from components.RecordingUploader import RecordingUploader
+from components.TrackFeatureStore import TrackFeatureStore
+from enums.AnalysisProfile import AnalysisProfile
+from repositories.DatabaseManager import DatabaseManager
+from repositories.RagaRepository import RagaRepository
+from repositories.RecordingRepository import RecordingRepository
+from repositories.ScoringJobRepository import ScoringJobRepository
+from repositories.StorageRepository import StorageRepository
+from repositories.Tracer import Tracer
+from repositories.TrackRepository import TrackRepository
+
+# Repositories of a pool process, created once by the pool initializer
+_process_context = {}
+
+
+def init_scoring_process(bucket_name):
+    _process_context['bucket_name'] = bucket_name
+    _process_context['storage_repo'] = StorageRepository(bucket_name)
+    _connect_process_repositories()
+
+
+def _connect_process_repositories():
+    connection = DatabaseManager.connect()
+    track_repo = TrackRepository(connection)
+    _process_context['connection'] = connection
+    _process_context['track_repo'] = track_repo
+    _process_context['recording_repo'] = RecordingRepository(connection)
+    _process_context['raga_repo'] = RagaRepository(connection)
+    _process_context['track_feature_store'] = TrackFeatureStore(track_repo, _process_context['storage_repo'])
+    _process_context['recording_uploaders'] = {}
+
+
+def _get_recording_uploader(profile):
+    # One uploader per analysis profile, as the orgs sharing the queue can use different profiles
+    recording_uploaders = _process_context['recording_uploaders']
+    if profile not in recording_uploaders:
+        recording_uploaders[profile] = RecordingUploader(
+            _process_context['recording_repo'], _process_context['raga_repo'], None, None,
+            _process_context['storage_repo'], None,
+            AudioProcessor(_process_context['track_feature_store'], profile=profile), None)
+    return recording_uploaders[profile]
+
+
+def _ensure_process_connection():
+    try:
+        _process_context['connection'].ping(reconnect=False)
+    except Exception as e:
+        print(f"Scoring process lost its database connection ({e}), reconnecting.")
+        _connect_process_repositories()
+
+
+def score_recording(job):
+    """Scores the recording of a job inside a pool process and stores the result."""
+    with Tracer.span('recording.score'):
+        _ensure_process_connection()
+        recording_repo = _process_context['recording_repo']
+        recording = recording_repo.get_recording_by_id(job['recording_id'])
+        # The analysis proxy decodes without a codec, recordings scored before it existed only have the original
+        source_blob_name = recording['analysis_blob_name'] or recording['blob_name']
+        recording_data = _process_context['storage_repo'].download_blob_by_name(source_blob_name)
+        profile = AnalysisProfile.get_by_name(job.get('analysis_profile'))
+        recording_analysis = AudioAnalysis.from_bytes(recording_data, os.path.splitext(source_blob_name)[1], profile)
+        recording_uploader = _get_recording_uploader(profile)
+        track = _process_context['track_repo'].get_track_by_id(job['track_id'])
+        distance, score, analysis = recording_uploader.analyze_recording(track, recording_analysis)
+        with Tracer.span('db.update_score'):
+            recording_repo.update_score_and_analysis(recording['id'], distance, score, analysis)
+        if not recording['analysis_blob_name']:
+            # After the score is stored, the student is not kept waiting for the encoders
+            recording_uploader.store_derivatives(recording['id'], recording['blob_name'], recording_analysis)
+        return score
+
+
+def analyze_recording_data(track_id, blob_name, recording_data, profile_name=None):
+    """Returns the distance, score and analysis of a downloaded recording, inside a pool process."""
+    _ensure_process_connection()
+    track = _process_context['track_repo'].get_track_by_id(track_id)
+    profile = AnalysisProfile.get_by_name(profile_name)
+    recording_analysis = AudioAnalysis.from_bytes(recording_data, os.path.splitext(blob_name)[1], profile)
+    return _get_recording_uploader(profile).analyze_recording(track, recording_analysis)
+
+
+class ScoringWorker:
+    """
+    Pulls queued scoring jobs from the database and scores them on a pool of
+    processes, so uploads return immediately and scoring can use every core.
+    Several workers (in app processes or dedicated boxes) can share the queue.
+    When a pool process dies, the pool is broken for good, so its jobs are
+    failed (and retried while attempts remain) and a new pool is started.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_workers=None, poll_interval=2, max_attempts=3,
+                 stale_job_minutes=15, bucket_name='melodymaster'):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.stale_job_minutes = stale_job_minutes
+        self.bucket_name = bucket_name
+        self.stop_event = threading.Event()
+        self.database_manager = None
+        self.scoring_job_repo = None
+        self.last_requeue_time = 0
+
+    @classmethod
+    def ensure_started(cls):
+        """
+        Starts one background worker in the app process, so uploads are scored with
+        no other process deployed. Deployments that run scoring_worker.py set
+        SCORING_WORKER_IN_PROCESS to 0, so the app processes do not each start a pool.
+        """
+        if os.environ.get('SCORING_WORKER_IN_PROCESS', '1') != '1':
+            return None
+        with cls._instance_lock:
+            if cls._instance is None:
+                max_workers = int(os.environ.get('SCORING_WORKER_PROCESSES', '0')) or None
+                cls._instance = cls(max_workers=max_workers)
+                threading.Thread(target=cls._instance.run, name='scoring-worker', daemon=True).start()
+        return cls._instance
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        self._connect()
+        while not self.stop_event.is_set():
+            self._run_pool()
+
+    def _run_pool(self):
+        """Scores jobs on a new process pool until the worker is stopped or the pool breaks."""
+        # Spawned processes are safe to start from the multi-threaded app server
+        mp_context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp_context,
+                                 initializer=init_scoring_process,
+                                 initargs=(self.bucket_name,)) as executor:
+            running = {}
+            claimed = []
+            while not self.stop_event.is_set():
+                try:
+                    self._ensure_connection()
+                    if time.monotonic() - self.last_requeue_time > 60:
+                        self.scoring_job_repo.requeue_stale_jobs(self.stale_job_minutes, self.max_attempts)
+                        self.last_requeue_time = time.monotonic()
+
+                    free_slots = self.max_workers - len(running)
+                    if free_slots > 0:
+                        claimed = self.scoring_job_repo.claim_jobs(free_slots)
+                        # Jobs stay claimed until submitted, so a pool that breaks meanwhile fails them too
+                        while claimed:
+                            job = claimed[0]
+                            running[executor.submit(score_recording, job)] = job
+                            claimed.pop(0)
+
+                    if not running:
+                        self.stop_event.wait(self.poll_interval)
+                        continue
+
+                    done, _ = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._finish_job(running.pop(future), future)
+                        if isinstance(future.exception(), BrokenProcessPool):
+                            raise future.exception()
+                except BrokenProcessPool as e:
+                    print(f"Scoring process pool broke ({e}), starting a new one.")
+                    for job in list(running.values()) + claimed:
+                        self._fail_job(job, e)
+                    return
+                except Exception as e:
+                    print(f"Error in scoring worker: {e}")
+                    self.stop_event.wait(self.poll_interval)
+
+    def _finish_job(self, job, future):
+        try:
+            future.result()
+            self.scoring_job_repo.complete_job(job['id'])
+        except Exception as e:
+            self._fail_job(job, e)
+
+    def _fail_job(self, job, e):
+        print(f"Error while scoring recording {job['recording_id']}: {e}")
+        error = ''.join(traceback.format_exception(type(e), e, e.__traceback__))
+        try:
+            self.scoring_job_repo.fail_job(job, error, self.max_attempts)
+        except Exception as db_error:
+            # Left processing, the job is picked up again by the stale job requeue
+            print(f"Error while failing scoring job {job['id']}: {db_error}")
+
+    def _connect(self):
+        self.database_manager = DatabaseManager()
+        self.scoring_job_repo = ScoringJobRepository(self.database_manager.connection)
+
+    def _ensure_connection(self):
+        try:
+            self.database_manager.connection.ping(reconnect=False)
+        except Exception as e:
+            print(f"Scoring worker lost its database connection ({e}), reconnecting.")
+            self._connect()
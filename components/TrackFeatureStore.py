@@ -0,0 +1,134 @@
+import io
+import os
+import tempfile
+
+import numpy as np
+
+from components.AudioProcessor import AudioProcessor
+from enums.AnalysisProfile import AnalysisProfile
+from repositories.StorageRepository import StorageRepository
+from repositories.Tracer import Tracer
+from repositories.TrackRepository import TrackRepository
+
+
+class TrackFeatureStore:
+    """
+    Persists the chromagram and MFCC of each track so that scoring a recording
+    does not decode the teacher track again. Features are keyed by the track hash
+    and stored as a compressed .npz blob next to the track audio, with a copy in
+    a local directory. Each analysis profile has its own features, and the
+    profiles other than STANDARD also store the offset calibrated against the
+    reference track, since tracks.offset holds the STANDARD calibration.
+    """
+
+    def __init__(self, track_repo: TrackRepository,
+                 storage_repo: StorageRepository,
+                 local_directory='features'):
+        self.track_repo = track_repo
+        self.storage_repo = storage_repo
+        self.local_directory = local_directory
+
+    def save(self, track_hash, track_url, chroma, mfcc, offset=None,
+             profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        data = self.serialize(chroma, mfcc, offset)
+        self.storage_repo.upload_blob(data, self.get_features_blob_name(track_url, track_hash, profile))
+        self._save_locally(track_hash, data, profile)
+
+    def load(self, track_id, profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        with Tracer.span('features.load'):
+            chroma, mfcc, _ = self._load(self.track_repo.get_track_by_id(track_id), profile)
+            return chroma, mfcc
+
+    def get_offset(self, track, profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        """Returns the distance between the track and its reference track under the profile."""
+        if profile == AnalysisProfile.STANDARD:
+            return track['offset']
+        _, _, offset = self._load(track, profile)
+        return offset
+
+    def _load(self, track, profile):
+        track_hash = track['track_hash']
+
+        # Check if the features exist locally
+        local_path = self.get_local_path(track_hash, profile)
+        if os.path.exists(local_path):
+            with open(local_path, "rb") as f:
+                return self.deserialize(f.read())
+
+        # If not found locally, attempt to download them from remote
+        blob_name = self.get_features_blob_name(track['track_path'], track_hash, profile)
+        try:
+            data = self.storage_repo.download_blob_by_name(blob_name)
+            self._save_locally(track_hash, data, profile)
+            return self.deserialize(data)
+        except Exception as e:
+            print(f"{profile.profile_name} features for track {track['id']} not found in storage ({e}), "
+                  f"computing them.")
+
+        # Tracks created before the feature store (or the profile) existed are computed once and persisted
+        chroma, mfcc = self.compute(track['track_path'], profile)
+        offset = None
+        if profile != AnalysisProfile.STANDARD:
+            ref_chroma, _ = self.compute(track['track_ref_path'], profile)
+            offset = AudioProcessor(profile=profile).compare_features(chroma, ref_chroma)
+        self.save(track_hash, track['track_path'], chroma, mfcc, offset, profile)
+        return chroma, mfcc, offset
+
+    def delete(self, track):
+        for profile in AnalysisProfile:
+            blob_name = self.get_features_blob_name(track['track_path'], track['track_hash'], profile)
+            self.storage_repo.delete_file(self.storage_repo.get_public_url(blob_name))
+            local_path = self.get_local_path(track['track_hash'], profile)
+            if os.path.exists(local_path):
+                os.remove(local_path)
+
+    def compute(self, track_url, profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        audio_data = self.storage_repo.download_blob_by_url(track_url)
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as temp_file:
+            temp_file.write(audio_data)
+            track_path = temp_file.name
+        try:
+            return AudioProcessor.extract_features(track_path, profile)
+        finally:
+            os.remove(track_path)
+
+    def get_features_blob_name(self, track_url, track_hash, profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        track_blob_name = self.storage_repo.get_blob_name(track_url)
+        return f"{os.path.dirname(track_blob_name)}/features/{self.get_file_name(track_hash, profile)}"
+
+    def get_local_path(self, track_hash, profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        return os.path.join(self.local_directory, self.get_file_name(track_hash, profile))
+
+    @staticmethod
+    def get_file_name(track_hash, profile):
+        # STANDARD features keep the name they had before there were profiles
+        if profile == AnalysisProfile.STANDARD:
+            return f"{track_hash}.npz"
+        return f"{track_hash}-{profile.name.lower()}.npz"
+
+    def _save_locally(self, track_hash, data, profile):
+        # Ensure the directory exists
+        if not os.path.exists(self.local_directory):
+            os.makedirs(self.local_directory)
+
+        # Write to a temporary file first so concurrent readers never see a partial file
+        local_path = self.get_local_path(track_hash, profile)
+        temp_path = f"{local_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, local_path)
+
+    @staticmethod
+    def serialize(chroma, mfcc, offset=None):
+        buffer = io.BytesIO()
+        if offset is None:
+            np.savez_compressed(buffer, chroma=chroma, mfcc=mfcc)
+        else:
+            np.savez_compressed(buffer, chroma=chroma, mfcc=mfcc, offset=offset)
+        return buffer.getvalue()
+
+    @staticmethod
+    def deserialize(data):
+        with np.load(io.BytesIO(data)) as features:
+            offset = float(features['offset']) if 'offset' in features else None
+            return features['chroma'], features['mfcc'], offset
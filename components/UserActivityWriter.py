@@ -0,0 +1,205 @@
+import atexit
+import fcntl
+import json
+import os
+import threading
+
+import pymysql
+
+from repositories.ConnectionPool import ConnectionPool
+from repositories.UserActivityRepository import UserActivityRepository
+
+
+class UserActivityWriter:
+    """
+    Process-wide write-behind buffer for user activities. Sessions only append
+    to an in-memory queue, and a background thread writes the queue with one
+    multi-row INSERT once it holds batch_size activities or flush_interval
+    seconds have passed. When the database cannot be reached, the batch is
+    appended to a spool file, which is written out ahead of the next batch that
+    gets through. Reads that must see their own writes call flush first.
+
+    The writer keeps a connection of its own, opened through the pool's Cloud
+    SQL connector but outside its slots. A forced flush from a session that
+    holds a pooled connection would otherwise wait on the pool for a second one.
+    """
+    BATCH_SIZE = int(os.environ.get('ACTIVITY_BATCH_SIZE', 100))
+    FLUSH_INTERVAL_SECONDS = float(os.environ.get('ACTIVITY_FLUSH_INTERVAL_SECONDS', 2))
+    SPOOL_PATH = os.environ.get('ACTIVITY_SPOOL_PATH', 'user_activities.spool.jsonl')
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, connect, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL_SECONDS,
+                 spool_path=SPOOL_PATH):
+        self.connect = connect
+        self.connection = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+        # Spooled activities the database rejects are set aside here, so they do not hold back the rest
+        self.dead_letter_path = f"{os.path.splitext(spool_path)[0]}.dead.jsonl"
+        self.condition = threading.Condition()
+        self.pending = []
+        # Serializes writers, so a forced flush returns only once every earlier activity is written
+        self.flush_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.written = 0
+        self.spooled = 0
+        self.dead_lettered = 0
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(ConnectionPool.get_instance().connect)
+                    cls._instance.start()
+                    atexit.register(cls._instance.stop)
+        return cls._instance
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='user-activity-writer', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+        self.close_connection()
+
+    def enqueue(self, activity):
+        with self.condition:
+            self.pending.append(activity)
+            if len(self.pending) >= self.batch_size:
+                self.condition.notify()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            with self.condition:
+                if len(self.pending) < self.batch_size:
+                    self.condition.wait(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Writes every activity enqueued so far, or spools them when the database is unavailable."""
+        with self.flush_lock:
+            with self.condition:
+                activities, self.pending = self.pending, []
+            if not activities and not self.has_spooled_activities():
+                return
+            try:
+                user_activity_repo = UserActivityRepository(self.get_connection())
+                self.replay_spool(user_activity_repo)
+                if activities:
+                    user_activity_repo.add_activities(activities)
+                    self.written += len(activities)
+            except Exception as e:
+                print(f"Error while writing {len(activities)} user activities, spooling them: {e}")
+                self.close_connection()
+                self.spool(activities)
+
+    def get_connection(self):
+        if self.connection is not None:
+            try:
+                self.connection.ping(reconnect=False)
+            except Exception as e:
+                print(f"User activity writer lost its database connection ({e}), reconnecting.")
+                self.close_connection()
+        if self.connection is None:
+            self.connection = self.connect()
+            if self.connection is None:
+                raise ConnectionError("Could not connect to the database")
+        return self.connection
+
+    def close_connection(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+    def spool(self, activities):
+        if not activities:
+            return
+        lines = ''.join(json.dumps(activity) + '\n' for activity in activities)
+        with open(self.spool_path, 'a') as f:
+            # The app processes on a host share the spool file
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        self.spooled += len(activities)
+
+    def has_spooled_activities(self):
+        return os.path.exists(self.spool_path) and os.path.getsize(self.spool_path) > 0
+
+    def replay_spool(self, user_activity_repo: UserActivityRepository):
+        """
+        Writes the spooled activities in one statement. When the database rejects
+        it, they are written one at a time and the rejected ones are moved to the
+        dead letter file. A lost connection raises and keeps the rest spooled.
+        """
+        if not self.has_spooled_activities():
+            return
+        with open(self.spool_path, 'r+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                remaining = [line for line in f if line.strip()]
+                try:
+                    try:
+                        user_activity_repo.add_activities([tuple(json.loads(line)) for line in remaining])
+                        print(f"Wrote {len(remaining)} spooled user activities")
+                        remaining = []
+                    except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+                        raise
+                    except Exception as e:
+                        print(f"Error while writing spooled user activities, writing them one at a time: {e}")
+                        user_activity_repo.connection.rollback()
+                        self.replay_one_at_a_time(user_activity_repo, remaining)
+                finally:
+                    # Emptied rather than removed, another process may be waiting on the lock of this file
+                    f.seek(0)
+                    f.truncate()
+                    f.writelines(remaining)
+                    f.flush()
+                    os.fsync(f.fileno())
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def replay_one_at_a_time(self, user_activity_repo: UserActivityRepository, remaining):
+        """Writes the spooled lines, removing each from remaining once it is written or dead lettered."""
+        while remaining:
+            line = remaining[0]
+            try:
+                user_activity_repo.add_activities([tuple(json.loads(line))])
+            except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+                raise
+            except Exception as e:
+                print(f"Moving a spooled user activity the database rejected to {self.dead_letter_path}: {e}")
+                user_activity_repo.connection.rollback()
+                self.dead_letter(line)
+            remaining.pop(0)
+
+    def dead_letter(self, line):
+        with open(self.dead_letter_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(line if line.endswith('\n') else line + '\n')
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        self.dead_lettered += 1
+
+    def get_stats(self):
+        with self.condition:
+            pending = len(self.pending)
+        return {'pending': pending, 'written': self.written, 'spooled': self.spooled,
+                'dead_lettered': self.dead_lettered}
@@ -0,0 +1,76 @@
+import struct
+
+import numpy as np
+
+
+class WaveformPeaks:
+    """
+    Min/max peaks of a recording at a few zoom levels, stored as int8 pairs so
+    list pages can draw a waveform without downloading the audio. The finest
+    level holds one pair per SAMPLES_PER_PEAK[0] samples, coarser levels are
+    reduced from it. A 2 minute recording takes about 6 KB.
+    """
+    MAGIC = b'PEAK'
+    VERSION = 1
+    # Coarse enough for a 10 minute recording to stay around 30 KB
+    SAMPLES_PER_PEAK = (1024, 8192)
+    HEADER = struct.Struct('<4sBBI')
+    LEVEL_HEADER = struct.Struct('<II')
+
+    def __init__(self, sample_rate, levels):
+        self.sample_rate = sample_rate
+        # (samples per peak, int8 array of shape (n, 2) with the min and max of each window)
+        self.levels = levels
+
+    @classmethod
+    def from_audio(cls, y, sr, samples_per_peak=SAMPLES_PER_PEAK):
+        finest = samples_per_peak[0]
+        windows = -(-len(y) // finest)
+        padded = np.zeros(windows * finest, dtype=np.float32)
+        padded[:len(y)] = y
+        padded = padded.reshape(windows, finest)
+        peaks = np.stack([padded.min(axis=1), padded.max(axis=1)], axis=1)
+
+        levels = []
+        for size in samples_per_peak:
+            # Each coarser window is a whole number of finest windows, so its peaks are exact
+            starts = np.arange(0, windows, size // finest)
+            level = np.stack([np.minimum.reduceat(peaks[:, 0], starts),
+                              np.maximum.reduceat(peaks[:, 1], starts)], axis=1)
+            levels.append((size, np.clip(np.round(level * 127), -127, 127).astype(np.int8)))
+        return cls(sr, levels)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, num_levels, sample_rate = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"Unsupported peaks data: {magic!r} version {version}")
+        offset = cls.HEADER.size
+        sizes = []
+        for _ in range(num_levels):
+            sizes.append(cls.LEVEL_HEADER.unpack_from(data, offset))
+            offset += cls.LEVEL_HEADER.size
+        levels = []
+        for samples_per_peak, count in sizes:
+            level = np.frombuffer(data, dtype=np.int8, count=count * 2, offset=offset).reshape(count, 2)
+            levels.append((samples_per_peak, level))
+            offset += count * 2
+        return cls(sample_rate, levels)
+
+    def to_bytes(self):
+        parts = [self.HEADER.pack(self.MAGIC, self.VERSION, len(self.levels), self.sample_rate)]
+        parts += [self.LEVEL_HEADER.pack(samples_per_peak, len(level)) for samples_per_peak, level in self.levels]
+        parts += [level.tobytes() for _, level in self.levels]
+        return b''.join(parts)
+
+    def get_level(self, columns):
+        """Returns the peaks of the coarsest level that still has a pair for every column."""
+        for samples_per_peak, level in sorted(self.levels, key=lambda item: -item[0]):
+            if len(level) >= columns:
+                return level
+        return min(self.levels, key=lambda item: item[0])[1]
+
+    @property
+    def duration(self):
+        samples_per_peak, level = self.levels[0]
+        return len(level) * samples_per_peak / self.sample_rate
@@ -0,0 +1,35 @@
+import numpy as np
+
+from components.WaveformPeaks import WaveformPeaks
+
+
+class WaveformRenderer:
+    """
+    Draws a waveform thumbnail of precomputed peaks as an inline SVG, one
+    vertical line per column, to embed in list rows with st.markdown.
+    """
+
+    def __init__(self, width=240, height=40, color='#4A90A4'):
+        self.width = width
+        self.height = height
+        self.color = color
+
+    def to_svg(self, peaks: WaveformPeaks):
+        level = peaks.get_level(self.width)
+        columns = min(self.width, len(level))
+        if columns == 0:
+            return ''
+        # Merge the peaks of each column, so short spikes stay visible
+        starts = np.linspace(0, len(level), columns, endpoint=False).astype(int)
+        minima = np.minimum.reduceat(level[:, 0].astype(np.int16), starts)
+        maxima = np.maximum.reduceat(level[:, 1].astype(np.int16), starts)
+
+        middle = self.height / 2
+        tops = middle - maxima / 127 * middle
+        # At least a pixel tall, so silence still shows as a line
+        bottoms = np.maximum(middle - minima / 127 * middle, tops + 1)
+        path = ''.join(f"M{x}.5 {top:.1f}V{bottom:.1f}" for x, (top, bottom) in enumerate(zip(tops, bottoms)))
+        return (f"<svg xmlns='http://www.w3.org/2000/svg' width='{self.width}' height='{self.height}' "
+                f"viewBox='0 0 {columns} {self.height}' preserveAspectRatio='none'>"
+                f"<path d='{path}' stroke='{self.color}' stroke-width='1' fill='none' "
+                f"vector-effect='non-scaling-stroke'/></svg>")
@@ -0,0 +1,63 @@
+import pandas as pd
+import streamlit as st
+
+from repositories.AnalysisTimingRepository import AnalysisTimingRepository
+from repositories.ConnectionPool import ConnectionPool
+
+
+class AnalysisTimingsDashboard:
+    def __init__(self, analysis_timing_repo: AnalysisTimingRepository, connection_pool: ConnectionPool = None):
+        self.analysis_timing_repo = analysis_timing_repo
+        self.connection_pool = connection_pool
+
+    def build(self):
+        if self.connection_pool is not None:
+            self.show_pool_stats(self.connection_pool.get_stats())
+
+        days = st.selectbox("Time Frame", [1, 7, 30, 90], index=1,
+                            format_func=lambda d: f"Last {d} day{'s' if d > 1 else ''}")
+        stages = self.analysis_timing_repo.get_stage_summary(days)
+        if not stages:
+            st.info("No analysis timings recorded yet.")
+            return
+
+        summary = self.get_stage_summary(stages)
+        st.dataframe(summary, use_container_width=True)
+
+        # p50/p95 per day of one stage, the slowest first, so a regression shows up as a step
+        stage = st.selectbox("Stage", summary.index.tolist())
+        daily = self.get_daily_percentiles(self.analysis_timing_repo.get_daily_percentiles(stage, days))
+        st.line_chart(daily)
+
+    @staticmethod
+    def get_stage_summary(stages):
+        # MySQL returns the sums and averages as Decimal
+        df = pd.DataFrame(stages).set_index('stage')
+        summary = pd.DataFrame({
+            'count': df['count'],
+            'p50_ms': df['p50_ms'].astype(float),
+            'p95_ms': df['p95_ms'].astype(float),
+            'total_s': df['total_ms'].astype(float) / 1000,
+            'mean_kb': df['mean_bytes'].astype(float) / 1024})
+        return summary.sort_values('p95_ms', ascending=False).round(1)
+
+    @staticmethod
+    def get_daily_percentiles(rows):
+        daily = pd.DataFrame(rows)
+        daily = daily.set_index(pd.to_datetime(daily['date']))[['p50_ms', 'p95_ms']].astype(float)
+        daily.columns = ['p50 (ms)', 'p95 (ms)']
+        daily.index.name = 'Date'
+        return daily
+
+    @staticmethod
+    def show_pool_stats(stats):
+        # Each app process has its own pool, these are the ones of the process serving this page
+        st.markdown("**Database connection pool**")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("In use", f"{stats['in_use']} of {stats['max_size']}", f"{stats['idle']} idle",
+                    delta_color="off")
+        col2.metric("Waits", f"{stats['waits']} of {stats['checkouts']}", f"{stats['timeouts']} timed out",
+                    delta_color="off")
+        col3.metric("Mean wait", f"{stats['mean_wait_ms']:.0f} ms", f"max {stats['max_wait_ms']:.0f} ms",
+                    delta_color="off")
+        col4.metric("Recycled", stats['recycled'])
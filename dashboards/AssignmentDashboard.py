@@ -1,5 +1,3 @@
-import os
-import tempfile
 from datetime import datetime
 
 import pandas as pd
@@ -77,25 +75,17 @@ class AssignmentDashboard:
                 expander_label = "▶▶️️&nbsp;&nbsp;🎻&nbsp;&nbsp;▶▶️️"
                 with st.expander(expander_label):
                     st.write(f"**Instructions**: {track['description']}")
-                    # Assume self.storage_repo has a method to get the audio URL directly
                     st.write("**Track**")
-                    audio_data = self.storage_repo.download_blob_by_url(track['track_path'])
-                    with tempfile.NamedTemporaryFile(mode="wb", delete=False) as temp_file:
-                        temp_file.write(audio_data)
-                        recording_path = temp_file.name
-
-                    st.audio(audio_data, format='audio/m4a')
+                    audio_source = self.storage_repo.get_audio_source_by_url(track['track_path'])
+                    st.audio(audio_source, format='audio/m4a')
                     st.write("**Recording**")
-                    uploaded, badge_awarded, recording_id, recording_name = \
+                    uploaded, badge_awarded, recording_id, _ = \
                         self.recording_uploader.upload(
                             session_id, org_id, user_id, track, bucket, selected_assignment['id'])
+                    self.recording_uploader.show_score(
+                        f"assignment_{track['assignment_detail_id']}", recording_id if uploaded else None,
+                        lambda score: st.write(f"**Score**: {score}"))
                     if uploaded:
-                        with st.spinner("Please wait..."):
-                            distance, score, analysis = self.recording_uploader.analyze_recording(
-                                track, recording_path, recording_name)
-                            self.recording_repo.update_score_and_analysis(
-                                recording_id, distance, score, analysis)
-                        st.write(f"**Score**: {score}")
                         # Update assignment status
                         self.assignment_repo.update_assignment_status_by_detail(
                             user_id, track['assignment_detail_id'], "Completed")
@@ -114,10 +104,6 @@ class AssignmentDashboard:
                     with col2:
                         self._display_track_score_trends(track['id'], recordings)
                     st.write("")
-                    if recording_path:
-                        os.remove(recording_path)
-                    if recording_name:
-                        os.remove(recording_name)
                     st.write("")
 
             self.divider()
@@ -165,9 +151,8 @@ class AssignmentDashboard:
                     st.write(f"**Instructions**: {track['description']}")
                     # Add a button to load the audio track
                     if st.button(f"Load Track", key=f"load_group_{track['assignment_detail_id']}"):
-                        # Assume self.storage_repo has a method to get the audio URL directly
-                        audio_url = self.storage_repo.download_blob_by_url(track['track_path'])
-                        st.audio(audio_url, format='audio/m4a')
+                        audio_source = self.storage_repo.get_audio_source_by_url(track['track_path'])
+                        st.audio(audio_source, format='audio/m4a')
 
             # Display assigned resources with their own expanders and status updates
             assigned_resources = self.assignment_repo.get_assigned_resources_by_id(
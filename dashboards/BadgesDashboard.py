@@ -1,7 +1,6 @@
-import os
-
 import streamlit as st
 
+from components.AssetSync import AssetSync
 from enums.Badges import UserBadges, TrackBadges
 from enums.Settings import Settings
 from repositories.SettingsRepository import SettingsRepository
@@ -61,25 +60,7 @@ class BadgesDashboard:
                     st.image(self.get_badge(badge.description), width=200)
 
     def get_badge(self, badge_name):
-        # Directory where badges are stored locally
-        local_badges_directory = 'badges'
-
-        # Construct the local file path for the badge
-        local_file_path = os.path.join(local_badges_directory, f"{badge_name}.png")
-
-        # Check if the badge exists locally
-        if os.path.exists(local_file_path):
-            return local_file_path
-
-        # If badge not found locally, attempt to download from remote
-        remote_path = f"{self.get_badges_bucket()}/{badge_name}.png"
-        success = self.storage_repo.download_blob_and_save(remote_path, local_file_path)
-
-        if success:
-            return local_file_path
-        else:
-            print(f"Failed to download badge named '{badge_name}' from remote location.")
-            return None
+        return AssetSync.get_instance(self.storage_repo).get_path(f"{self.get_badges_bucket()}/{badge_name}.png")
 
     @staticmethod
     def get_badges_bucket():
@@ -1,6 +1,3 @@
-import base64
-import os
-
 from components.AvatarLoader import AvatarLoader
 from components.BadgeAwarder import BadgeAwarder
 from enums.Badges import UserBadges
@@ -107,17 +104,6 @@ class HallOfFameDashboard:
         if 'hall_of_fame_winners' in st.session_state:
             st.session_state.pop('hall_of_fame_winners')
 
-    @staticmethod
-    def get_avatar_base64_string(avatar_file_path):
-        # Check if the avatar file exists, else use a default image
-        if avatar_file_path and os.path.isfile(avatar_file_path):
-            with open(avatar_file_path, "rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode()
-        else:
-            # Use a default base64 encoded string for a placeholder image
-            encoded_string = 'base64_string_of_a_default_placeholder_avatar'
-        return encoded_string
-
     @staticmethod
     def ordinal(n):
         suffix = ['th', 'st', 'nd', 'rd', 'th'][min(n % 10, 4)]
@@ -1,5 +1,3 @@
-import base64
-import os
 import re
 from datetime import datetime
 import streamlit as st
@@ -48,20 +46,12 @@ class MessageDashboard:
                 content_with_links = content_with_links.replace("\n", "<br>")
                 sender_name = message['sender_name']
                 avatar_name = message.get('avatar_name', 'avatar 10')
-                avatar_file_path = self.avatar_loader.get_avatar(avatar_name) \
-                    if avatar_name else 'path_to_default_avatar'
+                avatar_data_uri = self.avatar_loader.get_avatar_data_uri(avatar_name) if avatar_name else None
 
-                # Check if the avatar file exists, else use a default image
-                if avatar_file_path and os.path.isfile(avatar_file_path):
-                    with open(avatar_file_path, "rb") as image_file:
-                        encoded_string = base64.b64encode(image_file.read()).decode()
-                else:
-                    # Use a default base64 encoded string for a placeholder image
-                    encoded_string = 'base64_string_of_a_default_placeholder_avatar'
-
-                # Embed the base64 string into the HTML image tag
-                avatar_image_html = f'<img src="data:image/png;base64,{encoded_string}" alt="avatar" style="width: 60px; ' \
-                                    f'height: 60px; border-radius: 50%; margin-right: 10px;"> '
+                avatar_image_html = ""
+                if avatar_data_uri:
+                    avatar_image_html = f'<img src="{avatar_data_uri}" alt="avatar" style="width: 60px; ' \
+                                        f'height: 60px; border-radius: 50%; margin-right: 10px;"> '
 
                 st.markdown(f"""
                     <div style='display: flex; align-items: center; background-color: #E8F4FA; border-radius: 10px; padding: 10px; margin-bottom: 5px;'>
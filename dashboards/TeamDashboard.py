@@ -1,6 +1,3 @@
-import base64
-import os
-
 from components.AvatarLoader import AvatarLoader
 from components.BadgeAwarder import BadgeAwarder
 from components.ListBuilder import ListBuilder
@@ -26,10 +23,12 @@ class TeamDashboard:
 
     def build(self, group_ids, time_frame):
         with st.spinner("Please wait.."):
-            # Iterate over each group ID and fetch the dashboard data
+            # The data of all the groups is fetched in one query
+            dashboard_columns = self.portal_repo.fetch_teams_dashboard_data(group_ids, time_frame)
+
+            # Iterate over each group ID and display its share of the dashboard data
             for group_id in group_ids:
-                dashboard_data = self.portal_repo.fetch_team_dashboard_data(
-                    group_id, time_frame)
+                dashboard_data = self.portal_repo.get_dashboard_rows(dashboard_columns, group_id)
 
                 # Display group information
                 group = self.user_repo.get_group(group_id)
@@ -47,15 +46,7 @@ class TeamDashboard:
                     user_id = data['user_id']
                     badges = self.user_achievement_repo.get_user_badges(user_id, time_frame)
                     avatar = data.get('avatar')
-                    avatar_file_path = self.avatar_loader.get_avatar(avatar) if avatar else None
-
-                    # If an avatar file path is provided and the file exists
-                    avatar_image_html = ""
-                    if avatar_file_path and os.path.isfile(avatar_file_path):
-                        with open(avatar_file_path, "rb") as image_file:
-                            encoded_string = base64.b64encode(image_file.read()).decode()
-                        avatar_image_html = f'<img src="data:image/png;base64,{encoded_string}" alt="avatar" style="width: ' \
-                                            f'60px; height: 60px; border-radius: 50%; margin-right: 10px;"> '
+                    avatar_image_html = self.get_avatar_image_html(avatar)
 
                     divider = "<hr style='height:1px; margin-top: 0; border-width:0; background: lightblue;'>"
                     with st.container():
@@ -155,16 +146,7 @@ class TeamDashboard:
                 badge = winner['weekly_badge']
                 avatar = winner['avatar']
 
-                # Get the avatar image file path
-                avatar_file_path = self.avatar_loader.get_avatar(
-                    avatar) if avatar else 'path_to_default_avatar'
-
-                # Convert the image to a base64 string for embedding
-                encoded_string = self.get_avatar_base64_string(avatar_file_path)
-
-                # Embed the base64 string into the HTML image tag
-                avatar_image_html = f'<img src="data:image/png;base64,{encoded_string}" alt="avatar" style="width: ' \
-                                    f'60px; height: 60px; border-radius: 50%; margin-right: 10px;"> '
+                avatar_image_html = self.get_avatar_image_html(avatar)
                 winner['avatar_image_html'] = avatar_image_html
 
                 if badge not in winners_by_badge:
@@ -225,13 +207,10 @@ class TeamDashboard:
             st.write("")
             st.markdown(f"{divider}", unsafe_allow_html=True)
 
-    @staticmethod
-    def get_avatar_base64_string(avatar_file_path):
-        # Check if the avatar file exists, else use a default image
-        if avatar_file_path and os.path.isfile(avatar_file_path):
-            with open(avatar_file_path, "rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode()
-        else:
-            # Use a default base64 encoded string for a placeholder image
-            encoded_string = 'base64_string_of_a_default_placeholder_avatar'
-        return encoded_string
+    def get_avatar_image_html(self, avatar):
+        # The data URI is cached for the process, nothing is read or encoded per row
+        avatar_data_uri = self.avatar_loader.get_avatar_data_uri(avatar) if avatar else None
+        if not avatar_data_uri:
+            return ""
+        return f'<img src="{avatar_data_uri}" alt="avatar" style="width: ' \
+               f'60px; height: 60px; border-radius: 50%; margin-right: 10px;"> '
@@ -0,0 +1,37 @@
+from enum import Enum
+
+
+class AnalysisProfile(Enum):
+    # (name, sample rate, hop length, n_fft, DTW band ratio, chroma feature)
+    FAST = ("Fast", 11025, 1024, 2048, 0.1, 'chroma_stft')
+    # The librosa defaults every track and recording was analysed with so far
+    STANDARD = ("Standard", 22050, 512, 2048, 0.1, 'chroma_stft')
+    PRECISE = ("Precise", 22050, 256, 4096, 0.15, 'chroma_cqt')
+
+    @classmethod
+    def get_by_name(cls, name):
+        return next((item for item in cls if item.profile_name == name), cls.STANDARD)
+
+    @property
+    def profile_name(self):
+        return self.value[0]
+
+    @property
+    def sample_rate(self):
+        return self.value[1]
+
+    @property
+    def hop_length(self):
+        return self.value[2]
+
+    @property
+    def n_fft(self):
+        return self.value[3]
+
+    @property
+    def dtw_band_ratio(self):
+        return self.value[4]
+
+    @property
+    def chroma_feature(self):
+        return self.value[5]
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class DTWEngine(Enum):
+    FASTDTW = 'fastdtw'
+    BANDED = 'banded'
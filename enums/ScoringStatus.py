@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class ScoringStatus(Enum):
+    QUEUED = 'Queued'
+    PROCESSING = 'Processing'
+    COMPLETED = 'Completed'
+    FAILED = 'Failed'
@@ -22,6 +22,7 @@ class Settings(Enum):
     TAB_BACKGROUND_COLOR = ("Tab Background Color", Portal.TEACHER, SettingType.COLOR)
     TAB_HEADING_FONT_COLOR = ("Tab Heading Font Color", Portal.TEACHER, SettingType.COLOR)
     MAX_ROW_COUNT_IN_LIST = ("Max Row Count In List", Portal.TEACHER, SettingType.INTEGER)
+    ANALYSIS_PROFILE = ("Analysis Profile", Portal.TEACHER, SettingType.TEXT)
 
     @classmethod
     def get_by_description(cls, description):
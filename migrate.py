@@ -0,0 +1,50 @@
+import argparse
+
+from repositories.DatabaseManager import DatabaseManager
+from repositories.QueryPlanChecker import QueryPlanChecker
+from repositories.SchemaMigrator import SchemaMigrator
+from script_env import set_env
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        description="Apply the pending schema migrations, or check the query plans of the repositories.")
+    parser.add_argument('--target', type=int, help="Only apply migrations up to this version")
+    parser.add_argument('--dry-run', action='store_true', help="List the pending migrations without applying them")
+    parser.add_argument('--explain', action='store_true',
+                        help="EXPLAIN every repository query and report full table scans instead of migrating")
+    parser.add_argument('--min-rows', type=int, default=1000,
+                        help="Only report scans of tables estimated at this many rows or more")
+    return parser.parse_args(args)
+
+
+def check_query_plans(connection, min_rows):
+    full_scans, errors, skipped = QueryPlanChecker(connection, min_rows=min_rows).check()
+    for scan in full_scans:
+        print(f"FULL SCAN  {scan['location']}: {scan['table']} (~{scan['rows']} rows)")
+    for error in errors:
+        print(f"NOT CHECKED  {error['location']}: {error['error']}")
+    for location in skipped:
+        print(f"SKIPPED  {location}: query built at run time")
+    print(f"{len(full_scans)} full table scans, {len(errors)} queries not checked, {len(skipped)} skipped")
+    return not full_scans
+
+
+def main():
+    args = parse_args()
+    set_env()
+    database_manager = DatabaseManager()
+    try:
+        if args.explain:
+            if not check_query_plans(database_manager.connection, args.min_rows):
+                raise SystemExit(1)
+            return
+        migrations = SchemaMigrator(database_manager.connection).migrate(args.target, args.dry_run)
+        if not migrations:
+            print("The schema is up to date")
+    finally:
+        database_manager.close()
+
+
+if __name__ == "__main__":
+    main()
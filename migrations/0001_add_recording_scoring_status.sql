@@ -0,0 +1,2 @@
+-- Scoring status of each recording, set by the scoring queue
+ALTER TABLE recordings ADD COLUMN scoring_status VARCHAR(16);
@@ -0,0 +1,14 @@
+CREATE TABLE IF NOT EXISTS `scoring_jobs` (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    recording_id INT,
+    track_id INT,
+    analysis_profile VARCHAR(16) DEFAULT 'Standard',
+    status ENUM('Queued', 'Processing', 'Completed', 'Failed') DEFAULT 'Queued',
+    attempts INT DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP NULL,
+    completed_at TIMESTAMP NULL,
+    INDEX (status, id),
+    FOREIGN KEY (recording_id) REFERENCES recordings(id) ON DELETE CASCADE
+);
@@ -0,0 +1,10 @@
+CREATE TABLE IF NOT EXISTS `analysis_timings` (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    trace_id CHAR(32),
+    stage VARCHAR(64),
+    parent_stage VARCHAR(64),
+    started_at DATETIME(3),
+    duration_ms FLOAT,
+    bytes BIGINT NULL,
+    INDEX (started_at, stage)
+);
@@ -0,0 +1,5 @@
+-- Opus playback copy, FLAC analysis proxy and waveform peaks of each recording
+ALTER TABLE recordings
+    ADD COLUMN playback_blob_name VARCHAR(255),
+    ADD COLUMN analysis_blob_name VARCHAR(255),
+    ADD COLUMN peaks MEDIUMBLOB;
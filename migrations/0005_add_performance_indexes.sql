@@ -0,0 +1,10 @@
+-- Recording lists of a student and track, newest first
+CREATE INDEX idx_recordings_user_track_timestamp ON recordings (user_id, track_id, timestamp);
+-- Duplicate upload check
+CREATE INDEX idx_recordings_user_track_hash ON recordings (user_id, track_id, file_hash);
+-- Notifications since the last activity
+CREATE INDEX idx_user_activities_timestamp_user ON user_activities (timestamp, user_id);
+CREATE INDEX idx_user_practice_logs_user_timestamp ON user_practice_logs (user_id, timestamp);
+CREATE INDEX idx_user_achievements_user_timestamp ON user_achievements (user_id, timestamp);
+-- Students of a group
+CREATE INDEX idx_users_group_type ON users (group_id, user_type);
@@ -0,0 +1,45 @@
+-- Per user and day totals read by the dashboards, backfilled from the raw tables below.
+-- Rows written between this migration and the deploy of the code that maintains the totals
+-- are repaired with: python rebuild_daily_stats.py --from-date <day of the migration>
+CREATE TABLE IF NOT EXISTS `user_daily_stats` (
+    user_id INT NOT NULL,
+    date DATE NOT NULL,
+    recordings INT NOT NULL DEFAULT 0,
+    recording_seconds INT NOT NULL DEFAULT 0,
+    scored_recordings INT NOT NULL DEFAULT 0,
+    score_sum INT NOT NULL DEFAULT 0,
+    practice_minutes INT NOT NULL DEFAULT 0,
+    badges INT NOT NULL DEFAULT 0,
+    sessions INT NOT NULL DEFAULT 0,
+    session_seconds INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, date)
+);
+
+-- The same totals as UserDailyStatsRepository.rebuild over every day. REPLACE keeps a rerun
+-- after a failure from adding the totals twice
+REPLACE INTO user_daily_stats (user_id, date, recordings, recording_seconds, scored_recordings, score_sum,
+                               practice_minutes, badges, sessions, session_seconds)
+SELECT user_id, date, SUM(recordings), SUM(recording_seconds), SUM(scored_recordings), SUM(score_sum),
+       SUM(practice_minutes), SUM(badges), SUM(sessions), SUM(session_seconds)
+FROM (
+    SELECT user_id, DATE(timestamp) AS date, COUNT(*) AS recordings,
+           COALESCE(SUM(duration), 0) AS recording_seconds, COUNT(score) AS scored_recordings,
+           COALESCE(SUM(score), 0) AS score_sum, 0 AS practice_minutes, 0 AS badges, 0 AS sessions,
+           0 AS session_seconds
+    FROM recordings
+    GROUP BY user_id, DATE(timestamp)
+    UNION ALL
+    SELECT user_id, DATE(timestamp), 0, 0, 0, 0, COALESCE(SUM(minutes), 0), 0, 0, 0
+    FROM user_practice_logs
+    GROUP BY user_id, DATE(timestamp)
+    UNION ALL
+    SELECT user_id, DATE(timestamp), 0, 0, 0, 0, 0, COUNT(*), 0, 0
+    FROM user_achievements
+    GROUP BY user_id, DATE(timestamp)
+    UNION ALL
+    SELECT user_id, DATE(open_session_time), 0, 0, 0, 0, 0, 0, COUNT(*), COALESCE(SUM(session_duration), 0)
+    FROM user_sessions
+    GROUP BY user_id, DATE(open_session_time)
+) AS daily
+WHERE user_id IS NOT NULL
+GROUP BY user_id, date;
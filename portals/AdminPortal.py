@@ -3,11 +3,14 @@ from abc import ABC
 import streamlit as st
 
 from components.ListBuilder import ListBuilder
+from dashboards.AnalysisTimingsDashboard import AnalysisTimingsDashboard
 from enums.ActivityType import ActivityType
 from enums.Features import Features
 from enums.Settings import Portal
 from portals.BasePortal import BasePortal
 from enums.UserType import UserType
+from repositories.AnalysisTimingRepository import AnalysisTimingRepository
+from repositories.ConnectionPool import ConnectionPool
 
 DEFAULT_TEACHER_AVATAR = "teacher avatar 1"
 
@@ -15,6 +18,12 @@ DEFAULT_TEACHER_AVATAR = "teacher avatar 1"
 class AdminPortal(BasePortal, ABC):
     def __init__(self):
         super().__init__()
+        self.analysis_timings_dashboard_builder = None
+
+    def init_repositories(self):
+        super().init_repositories()
+        self.analysis_timings_dashboard_builder = AnalysisTimingsDashboard(
+            AnalysisTimingRepository(self.get_connection()), ConnectionPool.get_instance())
 
     def get_portal(self):
         return Portal.ADMIN
@@ -38,7 +47,8 @@ class AdminPortal(BasePortal, ABC):
             ("🗂️ Sessions", self.sessions) if self.is_feature_enabled(
                 Features.ADMIN_PORTAL_SHOW_USER_SESSIONS) else None,
             ("📊 Activities", self.activities) if self.is_feature_enabled(
-                Features.ADMIN_PORTAL_SHOW_USER_ACTIVITY) else None
+                Features.ADMIN_PORTAL_SHOW_USER_ACTIVITY) else None,
+            ("⏱️ Analysis Timings", self.analysis_timings)
         ]
         return {tab[0]: tab[1] for tab in tabs if tab}
 
@@ -147,6 +157,9 @@ class AdminPortal(BasePortal, ABC):
             else:
                 st.error(f"Failed to assign tutor: {message}")
 
+    def analysis_timings(self):
+        self.analysis_timings_dashboard_builder.build()
+
     def list_schools(self):
         # Fetch and display the list of schools linked to this admin (tenant)
         schools = self.org_repo.get_organizations_by_tenant_id(self.get_tenant_id())
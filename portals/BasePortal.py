@@ -1,4 +1,4 @@
-import base64
+import html
 import random
 from datetime import datetime
 import os
@@ -9,21 +9,29 @@ from abc import ABC, abstractmethod
 import streamlit as st
 from langchain.llms.openai import AzureOpenAI
 
+from components.AssetService import AssetService
+from components.AssetSync import AssetSync
+from components.AudioTranscoder import AudioTranscoder
 from components.AvatarLoader import AvatarLoader
 from components.ListBuilder import ListBuilder
+from components.TrackFeatureStore import TrackFeatureStore
+from components.UserActivityWriter import UserActivityWriter
+from components.WaveformPeaks import WaveformPeaks
+from components.WaveformRenderer import WaveformRenderer
 from dashboards.NotificationsDashboard import NotificationsDashboard
 from enums.ActivityType import ActivityType
-from enums.Badges import UserBadges, TrackBadges
+from enums.AnalysisProfile import AnalysisProfile
 from enums.Settings import Settings, SettingType
 from enums.SoundEffect import SoundEffect
 from enums.UserType import UserType
 from repositories.AssignmentRepository import AssignmentRepository
-from repositories.DatabaseManager import DatabaseManager
+from repositories.ConnectionPool import ConnectionPool
 from repositories.FeatureToggleRepository import FeatureToggleRepository
 from repositories.MessageRepository import MessageRepository
 from repositories.PortalRepository import PortalRepository
 from repositories.RagaRepository import RagaRepository
 from repositories.RecordingRepository import RecordingRepository
+from repositories.ScoringJobRepository import ScoringJobRepository
 from repositories.SettingsRepository import SettingsRepository
 from repositories.StorageRepository import StorageRepository
 from repositories.TenantRepository import TenantRepository
@@ -49,6 +57,7 @@ class BasePortal(ABC):
         self.portal_repo = None
         self.settings_repo = None
         self.recording_repo = None
+        self.scoring_job_repo = None
         self.track_repo = None
         self.storage_repo = None
         self.feature_repo = None
@@ -59,17 +68,18 @@ class BasePortal(ABC):
         self.message_repo = None
         self.assessment_repo = None
         self.avatar_loader = None
+        self.track_feature_store = None
         self.notifications_dashboard = None
+        self.connection = None
         self.set_env()
-        self.database_manager = DatabaseManager()
-        self.init_repositories()
 
     def init_repositories(self):
+        """Creates the repositories and dashboards on the connection of the script run, subclasses add theirs."""
         self.tenant_repo = TenantRepository(self.get_connection())
         self.org_repo = OrganizationRepository(self.get_connection())
         self.user_repo = UserRepository(self.get_connection())
         self.user_session_repo = UserSessionRepository(self.get_connection())
-        self.user_activity_repo = UserActivityRepository(self.get_connection())
+        self.user_activity_repo = UserActivityRepository(self.get_connection(), UserActivityWriter.get_instance())
         self.user_achievement_repo = UserAchievementRepository(self.get_connection())
         self.user_practice_log_repo = UserPracticeLogRepository(self.get_connection())
         self.feature_repo = FeatureToggleRepository(self.get_connection())
@@ -77,13 +87,18 @@ class BasePortal(ABC):
         self.raga_repo = RagaRepository(self.get_connection())
         self.track_repo = TrackRepository(self.get_connection())
         self.recording_repo = RecordingRepository(self.get_connection())
+        self.scoring_job_repo = ScoringJobRepository(self.get_connection())
         self.portal_repo = PortalRepository(self.get_connection())
         self.resource_repo = ResourceRepository(self.get_connection())
         self.assignment_repo = AssignmentRepository(self.get_connection())
         self.message_repo = MessageRepository(self.get_connection())
         self.assessment_repo = UserAssessmentRepository(self.get_connection())
         self.storage_repo = StorageRepository('melodymaster')
+        self.asset_sync = AssetSync.get_instance(self.storage_repo)
+        self.asset_service = AssetService.get_instance(self.storage_repo)
         self.avatar_loader = AvatarLoader(self.storage_repo, self.user_repo)
+        self.track_feature_store = TrackFeatureStore(self.track_repo, self.storage_repo)
+        self.waveform_renderer = WaveformRenderer()
         self.notifications_dashboard = NotificationsDashboard(
             self.user_session_repo, self.portal_repo)
 
@@ -92,38 +107,52 @@ class BasePortal(ABC):
         pass
 
     def get_connection(self):
-        return self.database_manager.connection
+        return self.connection
 
     def close_connection(self):
-        self.database_manager.close()
+        if self.connection is not None:
+            ConnectionPool.get_instance().checkin(self.connection)
+            self.connection = None
 
     def start(self, register=False):
-        self.init_session()
-        self.cache_badges()
-        self.cache_sound_effects()
-        self.avatar_loader.cache_avatars()
-        self.set_app_layout()
-        if self.user_logged_in():
-            user = self.user_repo.get_user(self.get_user_id())
-            st.session_state['group_id'] = user['group_id']
-            last_activity_time = self.user_session_repo.get_last_activity_time(
-                self.get_session_id())
-            self.show_notifications(last_activity_time)
-            self.user_session_repo.update_last_activity_time(self.get_session_id())
-        else:
-            self.show_introduction()
+        try:
+            # Borrowed from the process-wide pool for this script run, and checked back in by clean_up
+            try:
+                self.connection = ConnectionPool.get_instance().checkout()
+            except TimeoutError as e:
+                print(f"No database connection for the script run: {e}")
+                st.error("The app is busy right now. Please try again in a moment.")
+                return
+            self.init_repositories()
+            self.init_session()
+            # Syncs the badges, avatars and sound effects once per process, reruns return right away
+            self.asset_sync.sync()
+            self.set_app_layout()
+            if self.user_logged_in():
+                user = self.user_repo.get_user(self.get_user_id())
+                st.session_state['group_id'] = user['group_id']
+                last_activity_time = self.user_session_repo.get_last_activity_time(
+                    self.get_session_id())
+                self.show_notifications(last_activity_time)
+                self.user_session_repo.update_last_activity_time(self.get_session_id())
+            else:
+                self.show_introduction()
 
-        if not self.user_logged_in():
-            if register:
-                self.register_and_login_user()
+            if not self.user_logged_in():
+                if register:
+                    self.register_and_login_user()
+                else:
+                    self.login_user()
             else:
-                self.login_user()
-        else:
-            self.build_tabs()
-        self.show_copyright()
-        self.clean_up()
+                self.build_tabs()
+            self.show_copyright()
+        finally:
+            # st.rerun and st.stop raise, the connection must go back to the pool either way
+            self.clean_up()
 
     def show_notifications(self, last_activity_time):
+        # Activities logged by this process are written first, other processes flush within seconds
+        self.user_activity_repo.flush()
         messages = self.notifications_dashboard.notify(
             self.get_user_id(), self.get_group_id(), self.get_org_id(), last_activity_time)
         if len(messages) > 0:
@@ -132,98 +161,63 @@ class BasePortal(ABC):
                 st.toast(message)
 
     def play_sound_effect(self, effect_type: SoundEffect):
-        with open(self.get_sound_effect(effect_type), "rb") as f:
-            data = f.read()
-            b64 = base64.b64encode(data).decode()
-            md = f"""
-                <audio autoplay>
-                    <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
+        effect = random.choice(effect_type.effects)
+        data_uri = self.asset_service.get_data_uri(f"{self.get_sound_effects_bucket()}/{effect}")
+        if data_uri is None:
+            return
+        md = f"""
+            <audio autoplay>
+                <source src="{data_uri}" type="audio/mp3">
+            </audio>
+            """
+        st.markdown(md, unsafe_allow_html=True)
+
+    @staticmethod
+    def get_recording_blob_names(recordings, blob_name_key='blob_name', url_key='blob_url'):
+        """Returns the original and playback blob names of the recordings that have audio, to sign them together."""
+        for recording in recordings:
+            if recording[url_key]:
+                yield recording[blob_name_key]
+                if recording['playback_blob_name']:
+                    yield recording['playback_blob_name']
+
+    def show_recording_audio(self, container, blob_name, playback_blob_name, audio_sources, peaks, key):
+        """
+        Draws the waveform of a recording from its precomputed peaks, and its player.
+        A signed URL is only fetched by the browser when played. The Opus playback
+        file is offered first and the original after it, for browsers that cannot
+        decode Opus (older Safari and iOS). Without signing, st.audio can only be
+        handed one source, so the original is downloaded once the row's Listen
+        toggle is switched on.
+        """
+        if isinstance(peaks, (bytes, bytearray)):
+            container.markdown(self.waveform_renderer.to_svg(WaveformPeaks.from_bytes(peaks)),
+                               unsafe_allow_html=True)
+        source = audio_sources.get(blob_name)
+        # Rows of a DataFrame hold NaN rather than None for recordings without derivatives
+        playback_source = audio_sources.get(playback_blob_name) if isinstance(playback_blob_name, str) else None
+        if isinstance(source, str) and isinstance(playback_source, str):
+            container.markdown(f"""
+                <audio controls preload="none" style="width: 100%;">
+                    <source src="{html.escape(playback_source)}" type="{AudioTranscoder.PLAYBACK_MIME_TYPE}">
+                    <source src="{html.escape(source)}" type="{AudioTranscoder.get_mime_type(blob_name)}">
                 </audio>
-                """
-            st.markdown(md, unsafe_allow_html=True)
+                """, unsafe_allow_html=True)
+            return
+        if source is None and container.toggle("Listen", key=f"listen_{key}"):
+            source = self.storage_repo.download_blob_by_name(blob_name)
+        if source is not None:
+            container.audio(source, format=AudioTranscoder.get_mime_type(blob_name))
 
     def show_avatar(self, avatar):
         st.image(self.avatar_loader.get_avatar(avatar), width=75)
 
     def get_sound_effect(self, sound_effect: SoundEffect):
-        # Directory where badges are stored locally
-        local_directory = self.get_sound_effects_bucket()
-
-        # Construct the local file path for the badge
         effect = random.choice(sound_effect.effects)
-        local_file_path = os.path.join(local_directory, effect)
-
-        # Check if the badge exists locally
-        if os.path.exists(local_file_path):
-            return local_file_path
-
-        # If badge not found locally, attempt to download from remote
-        remote_path = f"{self.get_sound_effects_bucket()}/{sound_effect}"
-        success = self.storage_repo.download_blob_and_save(remote_path, local_file_path)
-
-        if success:
-            return local_file_path
-
-    def cache_sound_effects(self):
-        # Directory where sound effects are stored locally
-        local_sound_effects_directory = self.get_sound_effects_bucket()
-
-        # Ensure the directory exists
-        if not os.path.exists(local_sound_effects_directory):
-            os.makedirs(local_sound_effects_directory)
-
-        effects = SoundEffect.get_all_effects()
-        for effect in effects:
-            self._download_if_not_exist(
-                self.get_sound_effects_bucket(), effect, local_sound_effects_directory)
-
-    def cache_badges(self):
-        # Directory where badges are stored locally
-        local_badges_directory = self.get_badges_bucket()
-
-        # Ensure the directory exists
-        if not os.path.exists(local_badges_directory):
-            os.makedirs(local_badges_directory)
-
-        # Create a set to store all badge values (user and track)
-        all_badges = set(badge.value for badge in UserBadges) | \
-                     set(badge.value for badge in TrackBadges)
-
-        # Now, iterate over all badges and download them if they don't exist
-        for badge in all_badges:
-            self._download_if_not_exist(
-                self.get_badges_bucket(), f"{badge}.png", local_badges_directory)
-
-    def _download_if_not_exist(self, bucket, filename, directory):
-        # Construct the local file path
-        local_path = os.path.join(directory, filename)
-
-        # Check if the badge exists locally
-        if not os.path.exists(local_path):
-            # If the badge doesn't exist locally, download it
-            remote_path = f"{bucket}/{filename}"
-            self.storage_repo.download_blob_and_save(remote_path, local_path)
+        return self.asset_sync.get_path(f"{self.get_sound_effects_bucket()}/{effect}")
 
     def get_badge(self, badge_name):
-        # Directory where badges are stored locally
-        local_badges_directory = 'badges'
-
-        # Construct the local file path for the badge
-        local_file_path = os.path.join(local_badges_directory, f"{badge_name}.png")
-
-        # Check if the badge exists locally
-        if os.path.exists(local_file_path):
-            return local_file_path
-
-        # If badge not found locally, attempt to download from remote
-        remote_path = f"{self.get_badges_bucket()}/{badge_name}.png"
-        success = self.storage_repo.download_blob_and_save(remote_path, local_file_path)
-
-        if success:
-            return local_file_path
-        else:
-            print(f"Failed to download badge named '{badge_name}' from remote location.")
-            return None
+        return self.asset_sync.get_path(f"{self.get_badges_bucket()}/{badge_name}.png")
 
     def set_app_layout(self):
         self.set_background_color()
@@ -298,7 +292,7 @@ class BasePortal(ABC):
                 </style>
                 """, unsafe_allow_html=True)
 
-        image = self.storage_repo.download_blob_by_name(f"logo/{self.get_app_name()}.png")
+        image = self.asset_service.get_bytes(f"{self.get_logo_bucket()}/{self.get_app_name()}.png")
         if width == 0:
             left_column, center_column, right_column = st.columns([5.5, 10, 2.5])
             with center_column:
@@ -642,6 +636,12 @@ class BasePortal(ABC):
             st.session_state["limit"] = self.settings_repo.get_setting(
                 self.get_org_id(), Settings.MAX_ROW_COUNT_IN_LIST)
 
+    def get_analysis_profile(self):
+        if "analysis_profile" not in st.session_state:
+            st.session_state["analysis_profile"] = AnalysisProfile.get_by_name(
+                self.settings_repo.get_setting(self.get_org_id(), Settings.ANALYSIS_PROFILE))
+        return st.session_state["analysis_profile"]
+
     def set_tab_heading_font_color(self):
         if "tab_heading_font_color" not in st.session_state:
             st.session_state["tab_heading_font_color"] = self.settings_repo.get_setting(
@@ -853,6 +853,11 @@ class BasePortal(ABC):
                 new_value = cols[1].checkbox(key=setting_name, label='Value', value=bool(setting_value))
             elif data_type == SettingType.COLOR:
                 new_value = cols[1].color_picker(key=setting_name, label='Value', value=str(setting_value))
+            elif setting_enum == Settings.ANALYSIS_PROFILE:
+                profile_names = [profile.profile_name for profile in AnalysisProfile]
+                new_value = cols[1].selectbox(
+                    key=setting_name, label='Value', options=profile_names,
+                    index=profile_names.index(AnalysisProfile.get_by_name(setting_value).profile_name))
             else:
                 new_value = cols[1].text_input(key=setting_name, label='Value', value=str(setting_value))
 
@@ -875,6 +880,8 @@ class BasePortal(ABC):
                     new_value,
                     self.get_portal()
                 )
+        # Pick up a changed analysis profile on the next upload
+        st.session_state.pop("analysis_profile", None)
 
     @staticmethod
     def build_form(form_key, field_names, button_label='Submit', clear_on_submit=True):
@@ -940,6 +947,13 @@ class BasePortal(ABC):
             temp_file.write(blob_data)
             return temp_file.name
 
+    @staticmethod
+    def save_to_temp_file(data, suffix=''):
+        """Write a bytes-like buffer to a temporary file and return the file's path."""
+        with tempfile.NamedTemporaryFile(mode="wb", suffix=suffix, delete=False) as temp_file:
+            temp_file.write(data)
+            return temp_file.name
+
     @staticmethod
     def divider(height=2):
         divider = f"<hr style='height:{height}px; margin-top: 0; border-width:0; background: lightblue;'>"
@@ -962,7 +976,6 @@ class BasePortal(ABC):
         self.user_practice_log_repo = None
         self.resource_repo = None
         self.close_connection()
-        self.database_manager = None
 
     @staticmethod
     def is_feature_enabled(feature):
@@ -1,7 +1,6 @@
 # Standard library imports
 import datetime
 import json
-import os
 
 # Third-party imports
 import pandas as pd
@@ -13,6 +12,7 @@ from streamlit_lottie import st_lottie
 from components.BadgeAwarder import BadgeAwarder
 from components.ListBuilder import ListBuilder
 from components.RecordingUploader import RecordingUploader
+from components.ScoringWorker import ScoringWorker
 from components.TimeConverter import TimeConverter
 from dashboards.AssignmentDashboard import AssignmentDashboard
 from dashboards.BadgesDashboard import BadgesDashboard
@@ -35,6 +35,12 @@ from components.AudioProcessor import AudioProcessor
 class StudentPortal(BasePortal, ABC):
     def __init__(self):
         super().__init__()
+        self.badge_awarder = None
+        self.resource_dashboard_builder = None
+        ScoringWorker.ensure_started()
+
+    def init_repositories(self):
+        super().init_repositories()
         self.badge_awarder = BadgeAwarder(
             self.settings_repo, self.recording_repo,
             self.user_achievement_repo, self.user_practice_log_repo,
@@ -42,10 +48,13 @@ class StudentPortal(BasePortal, ABC):
         self.resource_dashboard_builder = ResourceDashboard(
             self.resource_repo, self.storage_repo)
 
+    def get_audio_processor(self):
+        return AudioProcessor(self.track_feature_store, profile=self.get_analysis_profile())
+
     def get_recording_uploader(self):
         return RecordingUploader(
             self.recording_repo, self.raga_repo, self.user_activity_repo, self.user_session_repo,
-            self.storage_repo, self.badge_awarder, AudioProcessor())
+            self.storage_repo, self.badge_awarder, self.get_audio_processor(), self.scoring_job_repo)
 
     def get_progress_dashboard(self):
         return ProgressDashboard(
@@ -196,29 +205,23 @@ class StudentPortal(BasePortal, ABC):
 
         self.create_track_headers()
 
-        # Download and save the audio files to temporary locations
         with st.spinner("Please wait.."):
-            track_audio_path = self.download_to_temp_file_by_url(track['track_path'])
+            track_audio = self.storage_repo.get_audio_source_by_url(track['track_path'])
         load_recordings = False
         col1, col2, col3 = st.columns([5, 5, 5])
         recording_uploader = self.get_recording_uploader()
         with col1:
-            self.display_track_files(track_audio_path)
+            self.display_track_files(track_audio)
             if st.button("Load Recordings", type="primary"):
                 load_recordings = True
 
         with col2:
-            uploaded, badge_awarded, recording_id, recording_name = recording_uploader.upload(
+            uploaded, badge_awarded, recording_id, _ = recording_uploader.upload(
                 self.get_session_id(), self.get_org_id(),
                 self.get_user_id(), track, self.get_recordings_bucket())
         with col3:
-            if uploaded:
-                with st.spinner("Please wait..."):
-                    distance, score, analysis = recording_uploader.analyze_recording(
-                        track, track_audio_path, recording_name)
-                    self.display_score(score)
-                    self.recording_repo.update_score_and_analysis(
-                        recording_id, distance, score, analysis)
+            recording_uploader.show_score(f"track_{track['id']}", recording_id if uploaded else None,
+                                          self.display_score)
 
         if badge_awarded:
             self.show_animations()
@@ -226,9 +229,6 @@ class StudentPortal(BasePortal, ABC):
         if load_recordings:
             self.recordings(track['id'])
 
-        if uploaded:
-            os.remove(recording_name)
-
     @staticmethod
     def display_recordings_header():
         st.markdown("<h3 style='text-align: center; margin-bottom: 0;'>Recordings</h3>", unsafe_allow_html=True)
@@ -251,15 +251,19 @@ class StudentPortal(BasePortal, ABC):
         list_builder.build_header(
             column_names=["Track", "Remarks", "Score", "Time", "Badges"])
 
+        # Recordings that cannot be signed are only downloaded when played
+        recording_audio = self.storage_repo.get_audio_sources(self.get_recording_blob_names(recordings),
+                                                              prefetch=False)
         # Loop through each recording and create a table row
         for index, recording in df.iterrows():
             st.markdown("<div style='border-top:1px solid #AFCAD6; height: 1px;'>", unsafe_allow_html=True)
             with st.container():
                 col1, col2, col3, col4, col5 = st.columns([1, 1, 1, 1, 1])
                 if recording['blob_url']:
-                    filename = self.storage_repo.download_blob_by_name(recording['blob_name'])
                     col1.write("")
-                    col1.audio(filename, format='dashboards/m4a')
+                    self.show_recording_audio(col1, recording['blob_name'], recording['playback_blob_name'],
+                                              recording_audio, recording['peaks'],
+                                              f"student_recording_{recording['id']}")
                 else:
                     col1.write("No dashboards data available.")
 
@@ -273,8 +277,12 @@ class StudentPortal(BasePortal, ABC):
                     unsafe_allow_html=True)
 
                 col3.write("")
+                score = recording.get('score')
+                if score is None or pd.isna(score):
+                    # Not scored yet, show where the recording is in the scoring queue
+                    score = recording.get('scoring_status') or 'N/A'
                 col3.markdown(
-                    f"<div style='padding-top:8px;color:black;font-size:14px;'>{recording.get('score')}</div>",
+                    f"<div style='padding-top:8px;color:black;font-size:14px;'>{score}</div>",
                     unsafe_allow_html=True)
                 local_timestamp = recording['timestamp'].strftime('%-I:%M %p | %b %d')
                 col4.write("")
@@ -318,6 +326,10 @@ class StudentPortal(BasePortal, ABC):
         list_builder.build_header(
             column_names=["Track Name", "Track", "Recording", "Score", "Teacher Remarks", "Badges"])
 
+        track_audio = self.storage_repo.get_audio_sources_by_url(
+            submission['track_audio_url'] for submission in submissions)
+        recording_audio = self.storage_repo.get_audio_sources(
+            self.get_recording_blob_names(submissions, 'recording_blob_name', 'recording_audio_url'), prefetch=False)
         # Display submissions
         for submission in submissions:
             st.markdown("<div style='border-top:1px solid #AFCAD6; height: 1px;'>", unsafe_allow_html=True)
@@ -329,14 +341,14 @@ class StudentPortal(BasePortal, ABC):
                     f"{submission['track_name']}</div>",
                     unsafe_allow_html=True)
                 if submission['track_audio_url']:
-                    track_audio = self.storage_repo.download_blob_by_url(submission['track_audio_url'])
-                    col2.audio(track_audio, format='dashboards/m4a')
+                    col2.audio(track_audio.get(submission['track_audio_url']), format='audio/mp4')
                 else:
                     col2.warning("No audio available.")
 
                 if submission['recording_audio_url']:
-                    track_audio = self.storage_repo.download_blob_by_url(submission['recording_audio_url'])
-                    col3.audio(track_audio, format='dashboards/m4a')
+                    self.show_recording_audio(col3, submission['recording_blob_name'],
+                                              submission['playback_blob_name'], recording_audio, submission['peaks'],
+                                              f"student_submission_{submission['recording_id']}")
                 else:
                     col3.warning("No audio available.")
 
@@ -1,4 +1,3 @@
-import base64
 import hashlib
 import os
 from abc import ABC
@@ -9,6 +8,7 @@ from components.AudioProcessor import AudioProcessor
 from components.BadgeAwarder import BadgeAwarder
 from components.ListBuilder import ListBuilder
 from components.RecordingUploader import RecordingUploader
+from components.ScoringWorker import ScoringWorker
 from dashboards.AssignmentDashboard import AssignmentDashboard
 from dashboards.HallOfFameDashboard import HallOfFameDashboard
 from dashboards.MessageDashboard import MessageDashboard
@@ -19,6 +19,7 @@ from dashboards.ResourceDashboard import ResourceDashboard
 from dashboards.StudentAssessmentDashboard import StudentAssessmentDashboard
 from dashboards.TeamDashboard import TeamDashboard
 from enums.ActivityType import ActivityType
+from enums.AnalysisProfile import AnalysisProfile
 from enums.Badges import TrackBadges
 from enums.Features import Features
 from enums.Settings import Portal
@@ -34,7 +35,15 @@ from repositories.NotesRepository import NotesRepository
 class TeacherPortal(BasePortal, ABC):
     def __init__(self):
         super().__init__()
-        self.audio_processor = AudioProcessor()
+        self.badge_awarder = None
+        self.notes_repo = None
+        self.student_assessment_dashboard_builder = None
+        self.hall_of_fame_dashboard_builder = None
+        self.resource_dashboard_builder = None
+        ScoringWorker.ensure_started()
+
+    def init_repositories(self):
+        super().init_repositories()
         self.badge_awarder = BadgeAwarder(
             self.settings_repo, self.recording_repo,
             self.user_achievement_repo, self.user_practice_log_repo,
@@ -85,10 +94,13 @@ class TeacherPortal(BasePortal, ABC):
     def get_notes_dashboard(self):
         return NotesDashboard(self.notes_repo)
 
+    def get_audio_processor(self):
+        return AudioProcessor(self.track_feature_store, profile=self.get_analysis_profile())
+
     def get_recording_uploader(self):
         return RecordingUploader(
             self.recording_repo, self.raga_repo, self.user_activity_repo, self.user_session_repo,
-            self.storage_repo, self.badge_awarder, AudioProcessor())
+            self.storage_repo, self.badge_awarder, self.get_audio_processor(), self.scoring_job_repo)
 
     @staticmethod
     def load_llm(temperature):
@@ -225,13 +237,11 @@ class TeacherPortal(BasePortal, ABC):
 
         avatar_image_html = ""
         for student in students:
-            avatar_file_path = self.avatar_loader.get_avatar(student['avatar'])
-            if os.path.isfile(avatar_file_path):
-                with open(avatar_file_path, "rb") as image_file:
-                    encoded_string = base64.b64encode(image_file.read()).decode()
-                    avatar_image_html = f'<img src="data:image/png;base64,{encoded_string}" alt="avatar" ' \
-                                        f'style="width: 60px; ' \
-                                        f'height: 60px; border-radius: 50%; margin-right: 10px;"> '
+            avatar_data_uri = self.avatar_loader.get_avatar_data_uri(student['avatar'])
+            if avatar_data_uri:
+                avatar_image_html = f'<img src="{avatar_data_uri}" alt="avatar" ' \
+                                    f'style="width: 60px; ' \
+                                    f'height: 60px; border-radius: 50%; margin-right: 10px;"> '
             row_data = {
                 "Name": student['name'],
                 "Username": student['username'],
@@ -499,6 +509,15 @@ class TeacherPortal(BasePortal, ABC):
         else:
             st.error("Resource not found.")
 
+    def calibrate_track(self, track_path, ref_track_path, track_hash, track_url, profile):
+        audio_processor = AudioProcessor(self.track_feature_store, profile=profile)
+        track_chroma, track_mfcc = audio_processor.extract_features(track_path, profile)
+        ref_track_chroma, ref_track_mfcc = audio_processor.extract_features(ref_track_path, profile)
+        offset = audio_processor.compare_features(track_chroma, ref_track_chroma)
+        stored_offset = None if profile == AnalysisProfile.STANDARD else offset
+        self.track_feature_store.save(track_hash, track_url, track_chroma, track_mfcc, stored_offset, profile)
+        return offset
+
     def create_track(self):
         st.markdown(f"<h2 style='text-align: center; font-weight: bold; color: {self.get_tab_heading_font_color()}; "
                     "font-size: 28px;'> 🔊 Create Audio Tracks 🔊 </h2>", unsafe_allow_html=True)
@@ -535,11 +554,21 @@ class TeacherPortal(BasePortal, ABC):
                     track_url = self.upload_track_to_storage(track_file, track_data)
                     ref_track_data = ref_track_file.getbuffer()
                     ref_track_url = self.upload_track_to_storage(ref_track_file, ref_track_data)
-                    self.storage_repo.download_blob(track_url, track_file.name)
-                    self.storage_repo.download_blob(ref_track_url, ref_track_file.name)
-                    offset = self.audio_processor.compare_audio(track_file.name, ref_track_file.name)
-                    os.remove(track_file.name)
-                    os.remove(ref_track_file.name)
+                    # The features are computed from the uploaded buffers, nothing is downloaded back
+                    track_path = self.save_to_temp_file(track_data, os.path.splitext(track_file.name)[1])
+                    ref_track_path = self.save_to_temp_file(
+                        ref_track_data, os.path.splitext(ref_track_file.name)[1])
+                    # Compute the track features once and persist them for scoring recordings.
+                    # tracks.offset holds the STANDARD calibration, the org's profile is
+                    # calibrated as well when it differs
+                    offset = self.calibrate_track(track_path, ref_track_path, track_hash,
+                                                  track_url, AnalysisProfile.STANDARD)
+                    profile = self.get_analysis_profile()
+                    if profile != AnalysisProfile.STANDARD:
+                        self.calibrate_track(track_path, ref_track_path, track_hash,
+                                             track_url, profile)
+                    os.remove(track_path)
+                    os.remove(ref_track_path)
                     self.track_repo.add_track(
                         name=track_name,
                         track_path=track_url,
@@ -593,6 +622,7 @@ class TeacherPortal(BasePortal, ABC):
         list_builder.build_header(
             column_names=["Track Name", "Audio", "Ragam", "Level", "Description"])
 
+        track_audio = self.storage_repo.get_audio_sources_by_url(track['track_path'] for track in selected_tracks)
         for track in selected_tracks:
             col1, col2, col3, col4, col5 = st.columns([1, 1, 1, 1, 1])
             row_data = {
@@ -607,9 +637,8 @@ class TeacherPortal(BasePortal, ABC):
                 unsafe_allow_html=True)
 
             col2.write("")
-            blob_url = track['track_path']
-            audio_file_path = self.storage_repo.download_blob_by_url(blob_url)
-            col2.audio(audio_file_path, format='dashboards/m4a')
+            audio_file_path = track_audio.get(track['track_path'])
+            col2.audio(audio_file_path, format='audio/mp4')
 
             col3.write("")
             col3.markdown(
@@ -709,6 +738,10 @@ class TeacherPortal(BasePortal, ABC):
                         st.warning(f"Failed to remove file '{file_path}' from storage.")
                         return
 
+                # Remove the precomputed track features
+                if track_details.get('track_hash'):
+                    self.track_feature_store.delete(track_details)
+
                 # Remove the track from database
                 if self.track_repo.remove_track_by_id(selected_track_id):
                     st.success(f"Track '{selected_track_name}' removed successfully!")
@@ -770,8 +803,8 @@ class TeacherPortal(BasePortal, ABC):
 
         st.write("")
         st.write("")
-        audio_data = self.storage_repo.download_blob_by_url(url)
-        st.audio(audio_data, format='audio/mp4')
+        audio_source = self.storage_repo.get_audio_source_by_url(url)
+        st.audio(audio_source, format='audio/mp4')
 
     def list_recordings(self):
         st.markdown(f"<h2 style='text-align: center; font-weight: bold; color: {self.get_tab_heading_font_color()}; "
@@ -788,12 +821,15 @@ class TeacherPortal(BasePortal, ABC):
             st.info("No recordings found.")
             return
 
+        recording_audio = self.storage_repo.get_audio_sources(self.get_recording_blob_names(recordings),
+                                                              prefetch=False)
         for recording in recordings:
             with st.expander(
                     f"Recording ID {recording['id']} - {recording['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}"):
                 if recording['blob_url']:
-                    filename = self.storage_repo.download_blob_by_url(recording['blob_url'])
-                    st.audio(filename, format='dashboards/m4a')
+                    self.show_recording_audio(st, recording['blob_name'], recording['playback_blob_name'],
+                                              recording_audio, recording['peaks'],
+                                              f"teacher_recording_{recording['id']}")
                 else:
                     st.write("No dashboards data available.")
 
@@ -835,30 +871,38 @@ class TeacherPortal(BasePortal, ABC):
 
         df = pd.DataFrame(submissions)
 
+        # Sign the audio of every submission up front, recordings that cannot be signed are
+        # only downloaded when played
+        track_audio = self.storage_repo.get_audio_sources_by_url(df['track_path'])
+        recording_audio = self.storage_repo.get_audio_sources(self.get_recording_blob_names(submissions),
+                                                              prefetch=False)
+
         # Display each recording in an expander
         for index, recording in df.iterrows():
-            self.show_submission(recording)
+            self.show_submission(recording, track_audio, recording_audio)
 
-    def show_submission(self, submission):
+    def show_submission(self, submission, track_audio, recording_audio):
         expander_label = f"**{submission.get('user_name', 'N/A')} - " \
                          f"{submission.get('track_name', 'N/A')} - " \
                          f"{submission.get('timestamp', 'N/A')}**"
         with st.expander(expander_label):
-            with st.form(key=f"submission_form_{submission['id']}"):
-                if submission['track_path']:
-                    filename = self.storage_repo.download_blob_by_url(submission['track_path'])
-                    st.markdown("<span style='font-size: 15px;'>Track:</span>", unsafe_allow_html=True)
-                    st.audio(filename, format='dashboards/m4a')
-                else:
-                    st.write("No dashboards data available.")
-
-                if submission['blob_url']:
-                    filename = self.storage_repo.download_blob_by_name(submission['blob_name'])
-                    st.markdown("<span style='font-size: 15px;'>Submission:</span>", unsafe_allow_html=True)
-                    st.audio(filename, format='dashboards/m4a')
-                else:
-                    st.write("No dashboards data available.")
+            if submission['track_path']:
+                filename = track_audio.get(submission['track_path'])
+                st.markdown("<span style='font-size: 15px;'>Track:</span>", unsafe_allow_html=True)
+                st.audio(filename, format='audio/mp4')
+            else:
+                st.write("No dashboards data available.")
+
+            # Outside the form, so the Listen toggle takes effect without submitting it
+            if submission['blob_url']:
+                st.markdown("<span style='font-size: 15px;'>Submission:</span>", unsafe_allow_html=True)
+                self.show_recording_audio(st, submission['blob_name'], submission['playback_blob_name'],
+                                          recording_audio, submission['peaks'],
+                                          f"teacher_submission_{submission['id']}")
+            else:
+                st.write("No dashboards data available.")
 
+            with st.form(key=f"submission_form_{submission['id']}"):
                 score = st.text_input("Score", key=f"submission_score_{submission['id']}",
                                       value=submission['score'])
                 remarks = st.text_area("Remarks", key=f"submission_remarks_{submission['id']}")
@@ -1006,8 +1050,8 @@ class TeacherPortal(BasePortal, ABC):
                         error_message = "Badges cannot be awarded for the current Week, Month or Year."
                     else:
                         with st.spinner("Please wait.."):
+                            self.badge_awarder.auto_award_badges(selected_group_ids, timeframe)
                             for group_id in selected_group_ids:
-                                self.badge_awarder.auto_award_badges(self.get_group_id(), timeframe)
                                 self.log_activity(self.get_activity_type(timeframe), group_id)
                     self.hall_of_fame_dashboard_builder.clear_cache()
 
@@ -0,0 +1,30 @@
+import argparse
+
+from repositories.DatabaseManager import DatabaseManager
+from repositories.UserDailyStatsRepository import UserDailyStatsRepository
+from script_env import set_env
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        description="Recompute the daily user stats from the raw tables, to backfill or repair the rollup.")
+    parser.add_argument('--user-id', type=int, help="Only the stats of this user")
+    parser.add_argument('--from-date', help="First day to recompute (YYYY-MM-DD)")
+    parser.add_argument('--to-date', help="Last day to recompute, inclusive (YYYY-MM-DD)")
+    return parser.parse_args(args)
+
+
+def main():
+    args = parse_args()
+    set_env()
+    database_manager = DatabaseManager()
+    try:
+        days = UserDailyStatsRepository(database_manager.connection).rebuild(
+            args.user_id, args.from_date, args.to_date)
+        print(f"Rebuilt {days} daily user stats")
+    finally:
+        database_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import pymysql.cursors
+
+
+class AnalysisTimingRepository:
+    def __init__(self, connection):
+        self.connection = connection
+        #self.create_analysis_timings_table()
+
+    def create_analysis_timings_table(self):
+        # Existing databases get the table from migrations/0003_create_analysis_timings.sql, with python migrate.py
+        cursor = self.connection.cursor()
+        create_table_query = """
+            CREATE TABLE IF NOT EXISTS `analysis_timings` (
+                id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                trace_id CHAR(32),
+                stage VARCHAR(64),
+                parent_stage VARCHAR(64),
+                started_at DATETIME(3),
+                duration_ms FLOAT,
+                bytes BIGINT NULL,
+                INDEX (started_at, stage)
+            );
+        """
+        cursor.execute(create_table_query)
+        self.connection.commit()
+
+    def add_timings(self, spans):
+        cursor = self.connection.cursor()
+        insert_query = """
+            INSERT INTO analysis_timings (trace_id, stage, parent_stage, started_at, duration_ms, bytes)
+            VALUES (%s, %s, %s, %s, %s, %s);
+        """
+        cursor.executemany(insert_query, [
+            (span.trace_id, span.stage, span.parent_stage, span.started_at, span.duration_ms, span.bytes)
+            for span in spans])
+        self.connection.commit()
+
+    def get_stage_summary(self, days=7):
+        """
+        Returns the span count, p50/p95 and total duration and mean bytes of each
+        stage over the last days. The percentiles are nearest-rank and computed by
+        MySQL, so the dashboard reads a row per stage rather than every span.
+        """
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        query = """
+            SELECT stage, COUNT(*) AS count,
+                   MIN(CASE WHEN row_num >= CEIL(0.5 * total) THEN duration_ms END) AS p50_ms,
+                   MIN(CASE WHEN row_num >= CEIL(0.95 * total) THEN duration_ms END) AS p95_ms,
+                   SUM(duration_ms) AS total_ms, AVG(bytes) AS mean_bytes
+            FROM (
+                SELECT stage, duration_ms, bytes,
+                       ROW_NUMBER() OVER (PARTITION BY stage ORDER BY duration_ms) AS row_num,
+                       COUNT(*) OVER (PARTITION BY stage) AS total
+                FROM analysis_timings
+                WHERE started_at >= NOW() - INTERVAL %s DAY
+            ) AS ranked
+            GROUP BY stage;
+        """
+        cursor.execute(query, (days,))
+        return cursor.fetchall()
+
+    def get_daily_percentiles(self, stage, days=7):
+        """Returns the nearest-rank p50/p95 duration of one stage for each of the last days."""
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        query = """
+            SELECT date,
+                   MIN(CASE WHEN row_num >= CEIL(0.5 * total) THEN duration_ms END) AS p50_ms,
+                   MIN(CASE WHEN row_num >= CEIL(0.95 * total) THEN duration_ms END) AS p95_ms
+            FROM (
+                SELECT DATE(started_at) AS date, duration_ms,
+                       ROW_NUMBER() OVER (PARTITION BY DATE(started_at) ORDER BY duration_ms) AS row_num,
+                       COUNT(*) OVER (PARTITION BY DATE(started_at)) AS total
+                FROM analysis_timings
+                WHERE stage = %s AND started_at >= NOW() - INTERVAL %s DAY
+            ) AS ranked
+            GROUP BY date
+            ORDER BY date;
+        """
+        cursor.execute(query, (stage, days))
+        return cursor.fetchall()
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from google.cloud.sql.connector import Connector
+
+from repositories.DatabaseManager import DatabaseManager
+from repositories.Tracer import Tracer
+
+
+class PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of MySQL connections shared by every Streamlit session.
+    One Cloud SQL connector is kept for the process and at most max_size
+    connections are open. A session checks a connection out for a script run
+    and checks it back in at the end, instead of paying the TLS and auth
+    handshakes on every rerun. Connections idle for longer than ping_after
+    seconds are pinged on checkout, and connections older than max_lifetime
+    seconds are closed and replaced.
+    """
+    MAX_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    TIMEOUT_SECONDS = float(os.environ.get('DB_POOL_TIMEOUT_SECONDS', 30))
+    MAX_LIFETIME_SECONDS = float(os.environ.get('DB_POOL_MAX_LIFETIME_SECONDS', 3600))
+    PING_AFTER_SECONDS = float(os.environ.get('DB_POOL_PING_AFTER_SECONDS', 30))
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, connect=None, max_size=MAX_SIZE, timeout=TIMEOUT_SECONDS,
+                 max_lifetime=MAX_LIFETIME_SECONDS, ping_after=PING_AFTER_SECONDS):
+        self._connect = connect or self.connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_after = ping_after
+        self.connector = None
+        self.condition = threading.Condition()
+        # Most recently used last, so the warmest connection is handed out first
+        self.idle = deque()
+        self.in_use = {}
+        self.size = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.recycled = 0
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def connect(self):
+        if self.connector is None:
+            self.connector = Connector()
+        return DatabaseManager.connect(self.connector)
+
+    def checkout(self):
+        """Returns a live connection, waiting up to the timeout for one to be checked in."""
+        start = time.monotonic()
+        waited = False
+        while True:
+            with self.condition:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = self.timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise TimeoutError(f"No database connection was free within {self.timeout} s "
+                                           f"({self.size} of {self.max_size} in use)")
+                    waited = True
+                    self.condition.wait(remaining)
+                pooled = self.idle.pop() if self.idle else None
+                if pooled is None:
+                    # Reserved before connecting, so concurrent checkouts never open more than max_size
+                    self.size += 1
+
+            if pooled is None:
+                pooled = self._open()
+            elif not self._is_usable(pooled):
+                self._discard(pooled)
+                continue
+
+            wait_seconds = time.monotonic() - start
+            with self.condition:
+                self.in_use[id(pooled.connection)] = pooled
+                self.checkouts += 1
+                if waited:
+                    self.waits += 1
+                    self.wait_seconds += wait_seconds
+                    self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            if waited:
+                # Only checkouts that had to wait are recorded, the others take microseconds
+                Tracer.record('db.pool_wait', wait_seconds * 1000)
+            return pooled.connection
+
+    def checkin(self, connection):
+        with self.condition:
+            pooled = self.in_use.pop(id(connection), None)
+        if pooled is None:
+            return
+        try:
+            # Ends the read snapshot of the borrower, so the next one sees current data
+            connection.rollback()
+        except Exception:
+            self._discard(pooled)
+            return
+        if time.monotonic() - pooled.created_at > self.max_lifetime:
+            self._discard(pooled, recycled=True)
+            return
+        pooled.last_used_at = time.monotonic()
+        with self.condition:
+            self.idle.append(pooled)
+            self.condition.notify()
+
+    @contextmanager
+    def connection(self):
+        connection = self.checkout()
+        try:
+            yield connection
+        finally:
+            self.checkin(connection)
+
+    def get_stats(self):
+        with self.condition:
+            return {
+                'size': self.size,
+                'max_size': self.max_size,
+                'idle': len(self.idle),
+                'in_use': len(self.in_use),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'mean_wait_ms': self.wait_seconds / self.waits * 1000 if self.waits else 0.0,
+                'max_wait_ms': self.max_wait_seconds * 1000,
+                'timeouts': self.timeouts,
+                'recycled': self.recycled,
+            }
+
+    def _open(self):
+        try:
+            with Tracer.span('db.connect'):
+                connection = self._connect()
+            if connection is None:
+                raise ConnectionError("Could not connect to the database")
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        return PooledConnection(connection)
+
+    def _is_usable(self, pooled):
+        now = time.monotonic()
+        if now - pooled.created_at > self.max_lifetime:
+            with self.condition:
+                self.recycled += 1
+            return False
+        if now - pooled.last_used_at > self.ping_after:
+            try:
+                pooled.connection.ping(reconnect=False)
+            except Exception as e:
+                print(f"Dropping a pooled database connection that failed its ping: {e}")
+                return False
+        return True
+
+    def _discard(self, pooled, recycled=False):
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+        with self.condition:
+            self.size -= 1
+            if recycled:
+                self.recycled += 1
+            self.condition.notify()
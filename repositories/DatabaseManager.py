@@ -16,7 +16,8 @@ class DatabaseManager:
         self.connection = self.connect()
 
     @staticmethod
-    def connect():
+    def connect(connector: Connector = None):
+        """Opens a connection, through the given Cloud SQL connector or a new one."""
         with tempfile.NamedTemporaryFile(mode="w", delete=False) as temp_file:
             temp_file.write(os.environ["GOOGLE_APP_CRED"])
             credentials_file_path = temp_file.name
@@ -30,7 +31,7 @@ class DatabaseManager:
         retries = 0
         while retries < MAX_RETRIES:
             try:
-                connection = Connector().connect(
+                connection = (connector or Connector()).connect(
                     instance_connection_name,
                     "pymysql",
                     user=db_user,
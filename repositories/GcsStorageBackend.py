@@ -0,0 +1,68 @@
+import base64
+import datetime
+import hashlib
+import mimetypes
+
+from components.BufferReader import BufferReader
+from repositories.StorageBackend import BlobStat, StorageBackend
+from repositories.StorageClientFactory import StorageClientFactory
+
+
+class GcsStorageBackend(StorageBackend):
+    # Larger uploads are sent in resumable chunks, which must be a multiple of 256 KB
+    RESUMABLE_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+    RESUMABLE_CHUNK_SIZE = 4 * 1024 * 1024
+    supports_signing = True
+
+    def __init__(self, bucket_name):
+        super().__init__(bucket_name)
+        self.storage_client = StorageClientFactory.get_client()
+        # Creating the handle makes no request, unlike storage_client.get_bucket()
+        self.bucket = self.storage_client.bucket(bucket_name)
+
+    def put(self, name, data, content_type=None):
+        """
+        Streams the buffer straight from memory. The MD5 of the data is sent
+        along, so the bucket rejects an upload that arrived corrupted.
+        """
+        reader = BufferReader(data)
+        size = len(reader)
+        blob = self.bucket.blob(name)
+        if size > self.RESUMABLE_UPLOAD_THRESHOLD:
+            blob.chunk_size = self.RESUMABLE_CHUNK_SIZE
+        blob.md5_hash = base64.b64encode(hashlib.md5(reader.view).digest()).decode()
+        content_type = content_type or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        # The server validates the MD5, a client-side checksum would hash the data again
+        blob.upload_from_file(reader, size=size, content_type=content_type, checksum=None)
+        return self.to_stat(blob)
+
+    def get(self, name, generation=None):
+        return self.bucket.blob(name, generation=generation).download_as_bytes()
+
+    def get_to_file(self, name, file, generation=None):
+        self.bucket.blob(name, generation=generation).download_to_file(file)
+
+    def get_range(self, name, start, end):
+        return self.bucket.blob(name).download_as_bytes(start=start, end=end)
+
+    def delete(self, name):
+        self.bucket.blob(name).delete()
+
+    def list(self, prefix):
+        return [self.to_stat(blob) for blob in self.bucket.list_blobs(prefix=prefix)]
+
+    def signed_url(self, name, expiration_seconds):
+        # Signing happens locally with the service account key, no request is made
+        return self.bucket.blob(name).generate_signed_url(
+            version="v4", method="GET", expiration=datetime.timedelta(seconds=expiration_seconds))
+
+    def stat(self, name):
+        blob = self.bucket.get_blob(name)
+        return self.to_stat(blob) if blob is not None else None
+
+    def public_url(self, name):
+        return self.bucket.blob(name).public_url
+
+    @staticmethod
+    def to_stat(blob):
+        return BlobStat(blob.name, blob.size, blob.generation, blob.md5_hash, blob.content_type)
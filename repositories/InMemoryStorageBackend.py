@@ -0,0 +1,79 @@
+import base64
+import hashlib
+import itertools
+import mimetypes
+import threading
+from urllib.parse import quote
+
+from google.api_core.exceptions import NotFound
+
+from repositories.StorageBackend import BlobStat, StorageBackend
+
+
+class InMemoryStorageBackend(StorageBackend):
+    """
+    Keeps the blobs in a dict shared by every repository of the same bucket in
+    the process, for tests and benchmarks.
+    """
+    _buckets = {}
+    _buckets_lock = threading.Lock()
+    _generations = itertools.count(1)
+
+    def __init__(self, bucket_name):
+        super().__init__(bucket_name)
+        # The blobs are shared between instances, and so is the lock
+        self.lock = self._buckets_lock
+        with self.lock:
+            self.blobs = self._buckets.setdefault(bucket_name, {})
+
+    def put(self, name, data, content_type=None):
+        data = bytes(data)
+        md5_hash = base64.b64encode(hashlib.md5(data).digest()).decode()
+        stat = BlobStat(name, len(data), next(self._generations), md5_hash,
+                        content_type or mimetypes.guess_type(name)[0])
+        with self.lock:
+            self.blobs[name] = (stat, data)
+        return stat
+
+    def get(self, name, generation=None):
+        stat, data = self.get_blob(name)
+        if generation is not None and stat.generation != generation:
+            raise NotFound(f"Generation {generation} of blob {name} not found in bucket {self.bucket_name}")
+        return data
+
+    def get_to_file(self, name, file, generation=None):
+        file.write(self.get(name, generation))
+
+    def get_range(self, name, start, end):
+        return self.get_blob(name)[1][start:end + 1]
+
+    def delete(self, name):
+        with self.lock:
+            if self.blobs.pop(name, None) is None:
+                raise NotFound(f"Blob {name} not found in bucket {self.bucket_name}")
+
+    def list(self, prefix):
+        with self.lock:
+            return sorted((stat for stat, _ in self.blobs.values() if stat.name.startswith(prefix)),
+                          key=lambda stat: stat.name)
+
+    def stat(self, name):
+        with self.lock:
+            blob = self.blobs.get(name)
+        return blob[0] if blob is not None else None
+
+    def public_url(self, name):
+        return f"memory://{self.bucket_name}/{quote(name)}"
+
+    def get_blob(self, name):
+        with self.lock:
+            blob = self.blobs.get(name)
+        if blob is None:
+            raise NotFound(f"Blob {name} not found in bucket {self.bucket_name}")
+        return blob
+
+    @classmethod
+    def clear(cls):
+        with cls._buckets_lock:
+            for blobs in cls._buckets.values():
+                blobs.clear()
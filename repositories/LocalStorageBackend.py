@@ -0,0 +1,96 @@
+import mimetypes
+import os
+import shutil
+import threading
+import time
+from urllib.parse import quote
+
+from google.api_core.exceptions import NotFound
+
+from repositories.StorageBackend import BlobStat, StorageBackend
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Keeps the blobs as files under <root>/<bucket name>. The file's modification
+    time in nanoseconds serves as the generation.
+    """
+
+    def __init__(self, bucket_name, root='local_storage'):
+        super().__init__(bucket_name)
+        self.directory = os.path.join(root, bucket_name)
+
+    def put(self, name, data, content_type=None):
+        path = self.get_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if name.endswith('/'):
+            # A folder placeholder, the directory is all there is to it
+            return BlobStat(name, 0, None, None, content_type)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return self.stat(name)
+
+    def get(self, name, generation=None):
+        self.check_generation(name, generation)
+        try:
+            with open(self.get_path(name), 'rb') as f:
+                return f.read()
+        except (FileNotFoundError, IsADirectoryError):
+            raise NotFound(f"Blob {name} not found in {self.directory}")
+
+    def get_to_file(self, name, file, generation=None):
+        self.check_generation(name, generation)
+        try:
+            with open(self.get_path(name), 'rb') as f:
+                shutil.copyfileobj(f, file)
+        except (FileNotFoundError, IsADirectoryError):
+            raise NotFound(f"Blob {name} not found in {self.directory}")
+
+    def get_range(self, name, start, end):
+        try:
+            with open(self.get_path(name), 'rb') as f:
+                f.seek(start)
+                return f.read(end - start + 1)
+        except (FileNotFoundError, IsADirectoryError):
+            raise NotFound(f"Blob {name} not found in {self.directory}")
+
+    def delete(self, name):
+        try:
+            os.remove(self.get_path(name))
+        except FileNotFoundError:
+            raise NotFound(f"Blob {name} not found in {self.directory}")
+
+    def list(self, prefix):
+        stats = []
+        for directory, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue
+                name = os.path.relpath(os.path.join(directory, filename), self.directory).replace(os.sep, '/')
+                if name.startswith(prefix):
+                    stats.append(self.stat(name))
+        return sorted((stat for stat in stats if stat is not None), key=lambda stat: stat.name)
+
+    def stat(self, name):
+        try:
+            stat = os.stat(self.get_path(name))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if not os.path.isfile(self.get_path(name)):
+            return None
+        return BlobStat(name, stat.st_size, stat.st_mtime_ns, None, mimetypes.guess_type(name)[0])
+
+    def public_url(self, name):
+        return f"local://{self.bucket_name}/{quote(name)}"
+
+    def get_path(self, name):
+        return os.path.join(self.directory, *name.split('/'))
+
+    def check_generation(self, name, generation):
+        if generation is None:
+            return
+        stat = self.stat(name)
+        if stat is None or stat.generation != generation:
+            raise NotFound(f"Generation {generation} of blob {name} not found in {self.directory}")
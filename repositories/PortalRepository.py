@@ -8,6 +8,10 @@ from enums.TimeFrame import TimeFrame
 
 
 class PortalRepository:
+    TEAM_DASHBOARD_COLUMNS = ('group_id', 'user_id', 'teammate', 'avatar', 'unique_tracks', 'recordings',
+                              'recording_minutes', 'score', 'practice_minutes', 'max_daily_practice_minutes',
+                              'badges_earned')
+
     def __init__(self, connection):
         self.connection = connection
 
@@ -107,7 +111,8 @@ class PortalRepository:
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         query = """
             SELECT r.id, r.blob_name, r.blob_url, t.name as track_name, t.track_path, r.timestamp, r.duration,
-                   r.track_id, r.score, r.analysis, r.remarks, r.user_id, u.name as user_name                  
+                   r.track_id, r.score, r.analysis, r.remarks, r.user_id, u.name as user_name,
+                   r.playback_blob_name, r.peaks
             FROM recordings r
             JOIN tracks t ON r.track_id = t.id
             JOIN users u ON r.user_id = u.id
@@ -137,7 +142,8 @@ class PortalRepository:
     def get_submissions_by_user_id(self, user_id, limit=20, timezone='America/Los_Angeles'):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         query = """
-        SELECT r.timestamp, t.name AS track_name, r.blob_url AS recording_audio_url, 
+        SELECT r.timestamp, t.name AS track_name, r.blob_url AS recording_audio_url,
+               r.blob_name AS recording_blob_name, r.playback_blob_name, r.peaks,
                t.track_path AS track_audio_url, r.analysis AS system_remarks, 
                r.remarks AS teacher_remarks, r.score, t.id as track_id, r.id as recording_id
         FROM recordings r
@@ -168,108 +174,72 @@ class PortalRepository:
         return [{'track_id': row['track_id'], 'badges': row['badges'].split(',')} for row in result]
 
     def fetch_team_dashboard_data(self, group_id, time_frame: TimeFrame):
+        return self.get_dashboard_rows(self.fetch_teams_dashboard_data([group_id], time_frame))
+
+    def fetch_teams_dashboard_data(self, group_ids, time_frame: TimeFrame):
+        """
+        Returns the per-student metrics of all the groups in one query, as a
+        dict of equally long column lists keyed by TEAM_DASHBOARD_COLUMNS. The
+        metrics are aggregated per user in derived tables restricted to the
+        students of the groups, and then joined to the users once.
+        """
+        if not group_ids:
+            return {name: [] for name in self.TEAM_DASHBOARD_COLUMNS}
         cursor = self.connection.cursor()
 
         start_date, end_date = time_frame.get_date_range()
 
-        # Query to fetch recordings data
-        recordings_query = """
-        SELECT u.id AS user_id,
+        query = """
+        SELECT u.group_id,
+               u.id AS user_id,
                u.name AS teammate,
                a.name AS avatar,
-               COALESCE(COUNT(DISTINCT r.track_id), 0) AS unique_tracks,
-               COALESCE(COUNT(r.id), 0) AS recordings,
-               COALESCE(ROUND(SUM(r.duration) / 60, 2), 0) AS recording_minutes,
-               COALESCE(SUM(r.score), 0) AS score
+               COALESCE(t.unique_tracks, 0) AS unique_tracks,
+               COALESCE(d.recordings, 0) AS recordings,
+               COALESCE(d.recording_minutes, 0) AS recording_minutes,
+               COALESCE(d.score, 0) AS score,
+               COALESCE(d.practice_minutes, 0) AS practice_minutes,
+               COALESCE(d.max_daily_practice_minutes, 0) AS max_daily_practice_minutes,
+               COALESCE(d.badges_earned, 0) AS badges_earned
         FROM users u
         LEFT JOIN avatars a ON u.avatar_id = a.id
-        LEFT JOIN recordings r ON u.id = r.user_id AND (r.timestamp BETWEEN %s AND %s)
-        WHERE u.group_id = %s AND u.user_type = 'student'
-        GROUP BY u.id
+        LEFT JOIN (
+            SELECT ds.user_id,
+                   SUM(ds.recordings) AS recordings,
+                   ROUND(SUM(ds.recording_seconds) / 60, 2) AS recording_minutes,
+                   SUM(ds.score_sum) AS score,
+                   SUM(ds.practice_minutes) AS practice_minutes,
+                   MAX(ds.practice_minutes) AS max_daily_practice_minutes,
+                   SUM(ds.badges) AS badges_earned
+            FROM users gu
+            JOIN user_daily_stats ds ON gu.id = ds.user_id AND (ds.date BETWEEN DATE(%s) AND DATE(%s))
+            WHERE gu.group_id IN %s AND gu.user_type = 'student'
+            GROUP BY ds.user_id
+        ) d ON u.id = d.user_id
+        LEFT JOIN (
+            -- Distinct tracks do not add up across days, so they are counted on the recordings
+            SELECT r.user_id, COUNT(DISTINCT r.track_id) AS unique_tracks
+            FROM users gu
+            JOIN recordings r ON gu.id = r.user_id
+                AND r.timestamp >= DATE(%s) AND r.timestamp < DATE(%s) + INTERVAL 1 DAY
+            WHERE gu.group_id IN %s AND gu.user_type = 'student'
+            GROUP BY r.user_id
+        ) t ON u.id = t.user_id
+        WHERE u.group_id IN %s AND u.user_type = 'student'
+        ORDER BY u.group_id, u.id
         """
+        group_ids = tuple(group_ids)
+        cursor.execute(query, (start_date, end_date, group_ids, start_date, end_date, group_ids, group_ids))
+        rows = cursor.fetchall()
 
-        # Query to fetch practice log data
-        practice_logs_query = """
-        SELECT u.id AS user_id, COALESCE(SUM(p.minutes), 0) AS practice_minutes
-        FROM users u
-        LEFT JOIN user_practice_logs p ON u.id = p.user_id AND (p.timestamp BETWEEN %s AND %s)
-        WHERE u.group_id = %s AND u.user_type = 'student'
-        GROUP BY u.id
-        """
+        return {name: [row[i] for row in rows] for i, name in enumerate(self.TEAM_DASHBOARD_COLUMNS)}
 
-        # Query to fetch each user's maximum daily practice log minutes
-        max_practice_log_query = """
-            SELECT u.id AS user_id, MAX(daily_minutes) AS max_daily_practice_minutes
-            FROM users u
-            LEFT JOIN (
-                SELECT user_id, DATE(timestamp) AS log_date, SUM(minutes) AS daily_minutes
-                FROM user_practice_logs
-                WHERE (timestamp BETWEEN %s AND %s)
-                GROUP BY user_id, log_date
-            ) p ON u.id = p.user_id
-            WHERE u.group_id = %s AND u.user_type = 'student'
-            GROUP BY u.id
-            """
-
-        # Execute the query
-        cursor.execute(max_practice_log_query, (start_date, end_date, group_id))
-        max_practice_log_results = cursor.fetchall()
-
-        # Query to fetch achievements data
-        achievements_query = """
-        SELECT u.id AS user_id, COALESCE(COUNT(ua.id), 0) AS badges_earned
-        FROM users u
-        LEFT JOIN user_achievements ua ON u.id = ua.user_id AND (ua.timestamp BETWEEN %s AND %s)
-        WHERE u.group_id = %s AND u.user_type = 'student'
-        GROUP BY u.id
-        """
-
-        # Execute recordings query
-        cursor.execute(recordings_query, (start_date, end_date, group_id))
-        recordings_results = cursor.fetchall()
-
-        # Execute practice logs query
-        cursor.execute(practice_logs_query, (start_date, end_date, group_id))
-        practice_logs_results = cursor.fetchall()
-
-        # Execute achievements query
-        cursor.execute(achievements_query, (start_date, end_date, group_id))
-        achievements_results = cursor.fetchall()
-
-        # Create a dictionary to store aggregated results by user_id
-        aggregated_data = {}
-
-        # Aggregate recordings data
-        for row in recordings_results:
-            user_id = row[0]
-            if user_id not in aggregated_data:
-                aggregated_data[user_id] = {'user_id': user_id, 'teammate': row[1]}
-            aggregated_data[user_id]['avatar'] = row[2]
-            aggregated_data[user_id]['unique_tracks'] = row[3]
-            aggregated_data[user_id]['recordings'] = row[4]
-            aggregated_data[user_id]['recording_minutes'] = row[5]
-            aggregated_data[user_id]['score'] = row[6]
-
-        # Aggregate practice logs data
-        for row in practice_logs_results:
-            user_id = row[0]
-            aggregated_data[user_id]['practice_minutes'] = row[1]
-
-        # Process the results to get each user's max daily practice minutes
-        for row in max_practice_log_results:
-            user_id = row[0]
-            aggregated_data[user_id]['max_daily_practice_minutes'] = \
-                row[1] if row[1] is not None else 0
-
-        # Aggregate achievements data
-        for row in achievements_results:
-            user_id = row[0]
-            aggregated_data[user_id]['badges_earned'] = row[1]
-
-        # Convert aggregated data to a list of dictionaries
-        dashboard_data = list(aggregated_data.values())
-
-        return dashboard_data
+    @classmethod
+    def get_dashboard_rows(cls, columns, group_id=None):
+        """Turns the columns of fetch_teams_dashboard_data into one dict per student, of one group or all."""
+        names = cls.TEAM_DASHBOARD_COLUMNS[1:]
+        return [dict(zip(names, values[1:])) for values in zip(*(columns[name] for name in cls.TEAM_DASHBOARD_COLUMNS))
+                if group_id is None or values[0] == group_id]
 
     def get_winners(self, group_id, time_frame: TimeFrame):
         with self.connection.cursor(pymysql.cursors.DictCursor) as cursor:
@@ -314,7 +284,14 @@ class PortalRepository:
         return badges
 
     def get_group_stats(self, group_id, timeframe=TimeFrame.PREVIOUS_WEEK):
-        dashboard_data = self.fetch_team_dashboard_data(group_id, timeframe)
+        return self.get_groups_stats([group_id], timeframe)[group_id]
+
+    def get_groups_stats(self, group_ids, timeframe=TimeFrame.PREVIOUS_WEEK):
+        columns = self.fetch_teams_dashboard_data(group_ids, timeframe)
+        return {group_id: self.get_winners_by_category(self.get_dashboard_rows(columns, group_id), timeframe)
+                for group_id in group_ids}
+
+    def get_winners_by_category(self, dashboard_data, timeframe):
 
         # Determine the badge type based on the timeframe
         badge_type = 'WEEKLY' if timeframe in \
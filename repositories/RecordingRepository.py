@@ -1,14 +1,20 @@
 import pymysql.cursors
 from components.TimeConverter import TimeConverter
+from enums.ScoringStatus import ScoringStatus
 from enums.TimeFrame import TimeFrame
+from repositories.UserDailyStatsRepository import UserDailyStatsRepository
 
 
 class RecordingRepository:
     def __init__(self, connection):
         self.connection = connection
+        self.user_daily_stats_repo = UserDailyStatsRepository(connection)
         #self.create_recordings_table()
 
     def create_recordings_table(self):
+        # Existing databases get the columns added since with python migrate.py:
+        # scoring_status from migrations/0001_add_recording_scoring_status.sql,
+        # playback_blob_name, analysis_blob_name and peaks from migrations/0004_add_recording_derivatives.sql
         cursor = self.connection.cursor()
         create_table_query = """CREATE TABLE IF NOT EXISTS recordings (
             id INT AUTO_INCREMENT PRIMARY KEY,
@@ -24,6 +30,12 @@ class RecordingRepository:
             analysis TEXT,
             remarks TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci,
             file_hash VARCHAR(32),
+            scoring_status VARCHAR(16),
+            playback_blob_name VARCHAR(255),
+            analysis_blob_name VARCHAR(255),
+            peaks MEDIUMBLOB,
+            INDEX idx_recordings_user_track_timestamp (user_id, track_id, timestamp),
+            INDEX idx_recordings_user_track_hash (user_id, track_id, file_hash),
             FOREIGN KEY (track_id) REFERENCES tracks(id) ON DELETE SET NULL,
             FOREIGN KEY (assignment_id) REFERENCES assignments(id) ON DELETE SET NULL
         );
@@ -41,9 +53,27 @@ class RecordingRepository:
         cursor.execute(add_recording_query,
                        (user_id, track_id, blob_name, blob_url, timestamp, duration, file_hash, analysis, remarks,
                         assignment_id))
+        self.user_daily_stats_repo.add_recording(user_id, timestamp, duration)
         self.connection.commit()
         return cursor.lastrowid
 
+    def get_recording_by_id(self, recording_id):
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        query = """SELECT id, user_id, track_id, blob_name, blob_url, timestamp, duration,
+                          score, distance, scoring_status, playback_blob_name, analysis_blob_name
+                   FROM recordings
+                   WHERE id = %s;"""
+        cursor.execute(query, (recording_id,))
+        return cursor.fetchone()
+
+    def get_score_and_status(self, recording_id):
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        query = """SELECT score, scoring_status FROM recordings WHERE id = %s;"""
+        cursor.execute(query, (recording_id,))
+        # Each poll must start a new transaction to see the worker's update
+        self.connection.commit()
+        return cursor.fetchone()
+
     def is_duplicate_recording(self, user_id, track_id, file_hash):
         cursor = self.connection.cursor()
         query = """SELECT COUNT(*) FROM recordings
@@ -64,7 +94,8 @@ class RecordingRepository:
     def get_recordings_by_user_id_and_track_id(
             self, user_id, track_id, timezone='America/Los_Angeles'):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
-        query = """SELECT id, user_id, blob_name, blob_url, timestamp, duration, track_id, score, remarks 
+        query = """SELECT id, user_id, blob_name, blob_url, timestamp, duration, track_id, score, remarks,
+                          scoring_status, playback_blob_name, peaks
                    FROM recordings 
                    WHERE user_id = %s AND track_id = %s 
                    ORDER BY timestamp DESC;"""
@@ -133,13 +164,75 @@ class RecordingRepository:
             score,
             analysis):
         cursor = self.connection.cursor()
-        update_query = """UPDATE recordings SET score = %s, distance = %s, analysis = %s 
+        self.user_daily_stats_repo.add_recording_scores([(recording_id, score)])
+        update_query = """UPDATE recordings SET score = %s, distance = %s, analysis = %s, scoring_status = %s
                         WHERE id = %s;"""
-        cursor.execute(update_query, (score, distance, analysis, recording_id))
+        cursor.execute(update_query, (score, distance, analysis, ScoringStatus.COMPLETED.value, recording_id))
+        self.connection.commit()
+
+    def update_scores_and_analyses(self, results):
+        """Writes back a batch of (recording_id, distance, score, analysis) with one UPDATE statement."""
+        if not results:
+            return
+        cursor = self.connection.cursor()
+        self.user_daily_stats_repo.add_recording_scores(
+            [(recording_id, score) for recording_id, distance, score, analysis in results])
+        # executemany runs an UPDATE once per row, so the rows are folded into CASE expressions
+        cases = ' '.join(['WHEN %s THEN %s'] * len(results))
+        update_query = f"""UPDATE recordings
+                        SET score = CASE id {cases} END,
+                            distance = CASE id {cases} END,
+                            analysis = CASE id {cases} END,
+                            scoring_status = %s
+                        WHERE id IN %s;"""
+        params = []
+        for column in (2, 1, 3):
+            for result in results:
+                params += [result[0], result[column]]
+        params += [ScoringStatus.COMPLETED.value, tuple(result[0] for result in results)]
+        cursor.execute(update_query, params)
         self.connection.commit()
 
+    def update_derivatives(self, recording_id, playback_blob_name, analysis_blob_name, peaks):
+        cursor = self.connection.cursor()
+        update_query = """UPDATE recordings SET playback_blob_name = %s, analysis_blob_name = %s, peaks = %s
+                        WHERE id = %s;"""
+        cursor.execute(update_query, (playback_blob_name, analysis_blob_name, peaks, recording_id))
+        self.connection.commit()
+
+    def get_recordings_for_rescoring(self, after_id=0, limit=500, track_id=None, org_id=None,
+                                     group_id=None, from_date=None, to_date=None):
+        """Returns the next page of recordings matching the filters, in id order."""
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        conditions = ["r.id > %s", "r.track_id IS NOT NULL"]
+        params = [after_id]
+        if track_id is not None:
+            conditions.append("r.track_id = %s")
+            params.append(track_id)
+        if org_id is not None:
+            conditions.append("u.org_id = %s")
+            params.append(org_id)
+        if group_id is not None:
+            conditions.append("u.group_id = %s")
+            params.append(group_id)
+        if from_date is not None:
+            conditions.append("r.timestamp >= %s")
+            params.append(from_date)
+        if to_date is not None:
+            conditions.append("r.timestamp < %s")
+            params.append(to_date)
+        query = f"""SELECT r.id, r.track_id, r.blob_name, r.analysis_blob_name, u.org_id
+                   FROM recordings r
+                   JOIN users u ON r.user_id = u.id
+                   WHERE {' AND '.join(conditions)}
+                   ORDER BY r.id
+                   LIMIT %s;"""
+        cursor.execute(query, params + [limit])
+        return cursor.fetchall()
+
     def update_score(self, recording_id, score):
         cursor = self.connection.cursor()
+        self.user_daily_stats_repo.add_recording_scores([(recording_id, score)])
         update_query = """UPDATE recordings SET score = %s WHERE id = %s;"""
         cursor.execute(update_query, (score, recording_id))
         self.connection.commit()
@@ -175,12 +268,9 @@ class RecordingRepository:
     def get_recording_duration_by_date(self, user_id):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         query = """
-            SELECT DATE(timestamp) as date, 
-                   COALESCE(SUM(duration), 0) as total_duration,
-                   COUNT(*) as total_tracks
-            FROM recordings 
-            WHERE user_id = %s 
-            GROUP BY DATE(timestamp) 
+            SELECT date, recording_seconds as total_duration, recordings as total_tracks
+            FROM user_daily_stats
+            WHERE user_id = %s AND recordings > 0
             ORDER BY date ASC;
             """
         cursor.execute(query, (user_id,))
@@ -195,11 +285,10 @@ class RecordingRepository:
     def get_average_scores_over_time(self, user_id):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         query = """
-            SELECT DATE(timestamp) as date, AVG(score) as avg_score
-            FROM recordings 
-            WHERE user_id = %s AND score IS NOT NULL
-            GROUP BY DATE(timestamp) 
-            ORDER BY DATE(timestamp) ASC;
+            SELECT date, score_sum / scored_recordings as avg_score
+            FROM user_daily_stats
+            WHERE user_id = %s AND scored_recordings > 0
+            ORDER BY date ASC;
         """
         cursor.execute(query, (user_id,))
         result = cursor.fetchall()
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import re
+
+import pymysql.cursors
+
+
+class Migration:
+    def __init__(self, version, name, sql):
+        self.version = version
+        self.name = name
+        self.sql = sql
+        self.checksum = hashlib.sha256(sql.encode()).hexdigest()
+
+    def __str__(self):
+        return f"{self.version:04d}_{self.name}"
+
+    def get_statements(self):
+        """Splits the script on the semicolons ending a line, after dropping comment lines."""
+        lines = [line for line in self.sql.splitlines() if not line.strip().startswith('--')]
+        statements = re.split(r';\s*$', '\n'.join(lines), flags=re.MULTILINE)
+        return [statement.strip() for statement in statements if statement.strip()]
+
+
+class SchemaMigrator:
+    """
+    Applies the SQL scripts in the migrations directory in version order and
+    records each applied version in the schema_migrations table, so every
+    database is brought to the same schema and each script runs once. Scripts
+    are named <version>_<name>.sql. MySQL commits DDL implicitly, so a script
+    that fails halfway is not recorded and has to be fixed up by hand before
+    the next run. A named lock keeps two runners from migrating at once.
+    """
+    MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+    LOCK_NAME = 'schema_migrations'
+    LOCK_TIMEOUT_SECONDS = 60
+
+    def __init__(self, connection, migrations_dir=MIGRATIONS_DIR):
+        self.connection = connection
+        self.migrations_dir = migrations_dir
+
+    def create_schema_migrations_table(self):
+        cursor = self.connection.cursor()
+        create_table_query = """
+            CREATE TABLE IF NOT EXISTS `schema_migrations` (
+                version INT PRIMARY KEY,
+                name VARCHAR(255),
+                checksum CHAR(64),
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """
+        cursor.execute(create_table_query)
+        self.connection.commit()
+
+    def get_migrations(self):
+        migrations = []
+        for file_name in sorted(os.listdir(self.migrations_dir)):
+            match = re.fullmatch(r'(\d+)_(\w+)\.sql', file_name)
+            if not match:
+                continue
+            with open(os.path.join(self.migrations_dir, file_name)) as f:
+                migrations.append(Migration(int(match.group(1)), match.group(2), f.read()))
+        migrations.sort(key=lambda migration: migration.version)
+        versions = [migration.version for migration in migrations]
+        if len(set(versions)) != len(versions):
+            raise ValueError(f"Duplicate migration versions in {self.migrations_dir}")
+        return migrations
+
+    def get_applied_versions(self):
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        cursor.execute("SELECT version, checksum FROM schema_migrations ORDER BY version;")
+        return {row['version']: row['checksum'] for row in cursor.fetchall()}
+
+    def get_pending_migrations(self):
+        applied = self.get_applied_versions()
+        pending = []
+        for migration in self.get_migrations():
+            if migration.version not in applied:
+                pending.append(migration)
+            elif applied[migration.version] != migration.checksum:
+                # Applied scripts are history, a change has to go into a new migration
+                raise ValueError(f"Migration {migration} was changed after it was applied")
+        return pending
+
+    def migrate(self, target_version=None, dry_run=False):
+        """Applies the pending migrations up to the target version and returns them."""
+        self.create_schema_migrations_table()
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT GET_LOCK(%s, %s);", (self.LOCK_NAME, self.LOCK_TIMEOUT_SECONDS))
+        if cursor.fetchone()[0] != 1:
+            raise TimeoutError("Another migration run holds the schema_migrations lock")
+        try:
+            migrations = [migration for migration in self.get_pending_migrations()
+                          if target_version is None or migration.version <= target_version]
+            for migration in migrations:
+                print(f"{'Would apply' if dry_run else 'Applying'} migration {migration}")
+                if not dry_run:
+                    self.apply(migration)
+            return migrations
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s);", (self.LOCK_NAME,))
+
+    def apply(self, migration: Migration):
+        cursor = self.connection.cursor()
+        for statement in migration.get_statements():
+            try:
+                cursor.execute(statement)
+            except pymysql.MySQLError as e:
+                self.connection.rollback()
+                raise RuntimeError(f"Migration {migration} failed on: {statement}") from e
+        cursor.execute("INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s);",
+                       (migration.version, migration.name, migration.checksum))
+        self.connection.commit()
@@ -0,0 +1,130 @@
+import pymysql
+import pymysql.cursors
+
+from enums.AnalysisProfile import AnalysisProfile
+from enums.ScoringStatus import ScoringStatus
+
+
+class ScoringJobRepository:
+    def __init__(self, connection):
+        self.connection = connection
+        #self.create_scoring_jobs_table()
+
+    def create_scoring_jobs_table(self):
+        # Existing databases get the table from migrations/0002_create_scoring_jobs.sql, with python migrate.py
+        cursor = self.connection.cursor()
+        create_table_query = """
+            CREATE TABLE IF NOT EXISTS `scoring_jobs` (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                recording_id INT,
+                track_id INT,
+                analysis_profile VARCHAR(16) DEFAULT 'Standard',
+                status ENUM('Queued', 'Processing', 'Completed', 'Failed') DEFAULT 'Queued',
+                attempts INT DEFAULT 0,
+                error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP NULL,
+                completed_at TIMESTAMP NULL,
+                INDEX (status, id),
+                FOREIGN KEY (recording_id) REFERENCES recordings(id) ON DELETE CASCADE
+            );
+        """
+        cursor.execute(create_table_query)
+        self.connection.commit()
+
+    def enqueue(self, recording_id, track_id, profile: AnalysisProfile = AnalysisProfile.STANDARD):
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            INSERT INTO scoring_jobs (recording_id, track_id, analysis_profile, status)
+            VALUES (%s, %s, %s, %s);
+        """, (recording_id, track_id, profile.profile_name, ScoringStatus.QUEUED.value))
+        job_id = cursor.lastrowid
+        cursor.execute("UPDATE recordings SET scoring_status = %s WHERE id = %s;",
+                       (ScoringStatus.QUEUED.value, recording_id))
+        self.connection.commit()
+        return job_id
+
+    def claim_jobs(self, limit):
+        """
+        Marks up to `limit` queued jobs as processing and returns them. Rows locked
+        by another worker are skipped, so several workers can poll the same table.
+        """
+        cursor = self.connection.cursor(pymysql.cursors.DictCursor)
+        try:
+            cursor.execute("""
+                SELECT id, recording_id, track_id, analysis_profile, attempts
+                FROM scoring_jobs
+                WHERE status = %s
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED;
+            """, (ScoringStatus.QUEUED.value, limit))
+            jobs = cursor.fetchall()
+            if jobs:
+                job_ids = [job['id'] for job in jobs]
+                placeholders = ', '.join(['%s'] * len(job_ids))
+                cursor.execute(f"""
+                    UPDATE scoring_jobs
+                    SET status = %s, attempts = attempts + 1, started_at = CURRENT_TIMESTAMP
+                    WHERE id IN ({placeholders});
+                """, [ScoringStatus.PROCESSING.value] + job_ids)
+                recording_ids = [job['recording_id'] for job in jobs]
+                cursor.execute(f"""
+                    UPDATE recordings SET scoring_status = %s WHERE id IN ({placeholders});
+                """, [ScoringStatus.PROCESSING.value] + recording_ids)
+            # Always end the transaction so the next poll sees newly queued jobs
+            self.connection.commit()
+            return list(jobs)
+        except pymysql.MySQLError as e:
+            print(f"Error while claiming scoring jobs: {e}")
+            self.connection.rollback()
+            return []
+
+    def complete_job(self, job_id):
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            UPDATE scoring_jobs SET status = %s, error = NULL, completed_at = CURRENT_TIMESTAMP
+            WHERE id = %s;
+        """, (ScoringStatus.COMPLETED.value, job_id))
+        self.connection.commit()
+
+    def fail_job(self, job, error, max_attempts=3):
+        # Jobs are retried until they have been attempted max_attempts times
+        status = ScoringStatus.QUEUED if job['attempts'] + 1 < max_attempts else ScoringStatus.FAILED
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            UPDATE scoring_jobs SET status = %s, error = %s, completed_at = CURRENT_TIMESTAMP
+            WHERE id = %s;
+        """, (status.value, error, job['id']))
+        cursor.execute("UPDATE recordings SET scoring_status = %s WHERE id = %s;",
+                       (status.value, job['recording_id']))
+        self.connection.commit()
+
+    def requeue_stale_jobs(self, timeout_minutes=15, max_attempts=3):
+        """
+        Hands the jobs left processing by a worker that died out again, or fails them
+        once they have been attempted max_attempts times. The attempt that stalled was
+        counted when the job was claimed, so a recording that kills its process is not
+        retried forever.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            UPDATE scoring_jobs j
+            JOIN recordings r ON j.recording_id = r.id
+            SET j.status = IF(j.attempts >= %s, %s, %s),
+                j.error = IF(j.attempts >= %s, 'Abandoned after the scoring process stopped responding', j.error),
+                j.completed_at = IF(j.attempts >= %s, CURRENT_TIMESTAMP, j.completed_at),
+                r.scoring_status = IF(j.attempts >= %s, %s, %s)
+            WHERE j.status = %s AND j.started_at < NOW() - INTERVAL %s MINUTE;
+        """, (max_attempts, ScoringStatus.FAILED.value, ScoringStatus.QUEUED.value,
+              max_attempts, max_attempts,
+              max_attempts, ScoringStatus.FAILED.value, ScoringStatus.QUEUED.value,
+              ScoringStatus.PROCESSING.value, timeout_minutes))
+        self.connection.commit()
+        return cursor.rowcount
+
+    def get_queue_length(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM scoring_jobs WHERE status = %s;",
+                       (ScoringStatus.QUEUED.value,))
+        return cursor.fetchone()[0]
@@ -1,5 +1,6 @@
 from datetime import datetime
 
+from enums.AnalysisProfile import AnalysisProfile
 from enums.Settings import Settings, Portal, SettingType
 
 
@@ -144,3 +145,7 @@ class SettingsRepository:
         cursor.execute(query, (Settings.MAX_ROW_COUNT_IN_LIST.description, Portal.TEACHER.value))
         if cursor.fetchone() is None:
             self.upsert_setting(None, Settings.MAX_ROW_COUNT_IN_LIST, 25, Portal.TEACHER)
+        cursor.execute(query, (Settings.ANALYSIS_PROFILE.description, Portal.TEACHER.value))
+        if cursor.fetchone() is None:
+            self.upsert_setting(None, Settings.ANALYSIS_PROFILE,
+                                AnalysisProfile.STANDARD.profile_name, Portal.TEACHER)
@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+# What a backend knows about a stored blob. The generation changes whenever the blob is overwritten.
+BlobStat = namedtuple('BlobStat', ['name', 'size', 'generation', 'md5_hash', 'content_type'])
+
+
+class SigningNotSupported(Exception):
+    """Raised by signed_url on a backend whose supports_signing is not set."""
+    pass
+
+
+class StorageBackend(ABC):
+    """
+    Where StorageRepository keeps its blobs. GcsStorageBackend is used in
+    production, LocalStorageBackend and InMemoryStorageBackend let the upload
+    and playback paths run, be load tested and be benchmarked without a bucket.
+    """
+    # Whether signed_url can hand out URLs, players are served the blob's bytes otherwise
+    supports_signing = False
+
+    def __init__(self, bucket_name):
+        self.bucket_name = bucket_name
+
+    @abstractmethod
+    def put(self, name, data, content_type=None) -> BlobStat:
+        """Stores a bytes-like buffer and returns the stat of the new generation."""
+        pass
+
+    @abstractmethod
+    def get(self, name, generation=None) -> bytes:
+        """Returns the blob's data, raising NotFound when the blob or generation does not exist."""
+        pass
+
+    @abstractmethod
+    def get_to_file(self, name, file, generation=None):
+        """Writes the blob's data to a binary file object as it arrives, raising NotFound like get."""
+        pass
+
+    @abstractmethod
+    def get_range(self, name, start, end) -> bytes:
+        """Returns bytes start to end of the blob, both inclusive."""
+        pass
+
+    @abstractmethod
+    def delete(self, name):
+        pass
+
+    @abstractmethod
+    def list(self, prefix) -> list:
+        """Returns the stats of the blobs whose names start with the prefix."""
+        pass
+
+    def signed_url(self, name, expiration_seconds) -> str:
+        """Returns a URL a browser can read the blob from. Only called when supports_signing is set."""
+        raise SigningNotSupported(f"{type(self).__name__} cannot sign URLs, check supports_signing first")
+
+    @abstractmethod
+    def stat(self, name) -> BlobStat:
+        """Returns the blob's stat, or None when it does not exist."""
+        pass
+
+    @abstractmethod
+    def public_url(self, name) -> str:
+        pass
@@ -0,0 +1,37 @@
+import json
+import os
+import threading
+
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud import storage
+from requests.adapters import HTTPAdapter
+
+
+class StorageClientFactory:
+    """
+    Builds the storage client once per process. Every StorageRepository shares
+    it, so reruns no longer write the credentials to a temp file and open new
+    connections, and concurrent sessions reuse a pool of keep-alive connections.
+    """
+    # Enough connections for the prefetch pool and the sessions rendering at the same time
+    POOL_SIZE = int(os.environ.get('STORAGE_HTTP_POOL_SIZE', 32))
+    _client = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls):
+        if cls._client is None:
+            with cls._lock:
+                if cls._client is None:
+                    cls._client = cls.create_client()
+        return cls._client
+
+    @classmethod
+    def create_client(cls):
+        info = json.loads(os.environ["GOOGLE_APP_CRED"])
+        credentials, project = google.auth.load_credentials_from_dict(info, scopes=storage.Client.SCOPE)
+        session = AuthorizedSession(credentials)
+        adapter = HTTPAdapter(pool_connections=cls.POOL_SIZE, pool_maxsize=cls.POOL_SIZE)
+        session.mount("https://", adapter)
+        return storage.Client(project=project or info.get('project_id'), credentials=credentials, _http=session)
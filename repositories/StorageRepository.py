@@ -1,56 +1,88 @@
 import os
-import uuid
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, unquote
 
-from google.cloud import storage
-import tempfile
+from google.api_core.exceptions import NotFound
+
+from components.BlobCache import BlobCache
+from repositories.GcsStorageBackend import GcsStorageBackend
+from repositories.InMemoryStorageBackend import InMemoryStorageBackend
+from repositories.LocalStorageBackend import LocalStorageBackend
+from repositories.StorageBackend import StorageBackend
+from repositories.Tracer import Tracer
 
 
 class StorageRepository:
-    def __init__(self, bucket_name):
-        with tempfile.NamedTemporaryFile(mode="w", delete=False) as temp_file:
-            temp_file.write(os.environ["GOOGLE_APP_CRED"])
-            credentials_path = temp_file.name
-            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = credentials_path
+    # Shared by every session of the process, so concurrent page renders cannot
+    # open more than this many downloads at once
+    PREFETCH_WORKERS = int(os.environ.get('STORAGE_PREFETCH_WORKERS', 8))
+    _prefetch_executor = None
+    _prefetch_executor_lock = threading.Lock()
+    # Players are handed signed URLs, which are reused until shortly before they expire.
+    # Kept in signing order, which is also expiry order, so the stale ones are at the front
+    SIGNED_URL_SECONDS = 3600
+    SIGNED_URL_REFRESH_SECONDS = 300
+    SIGNED_URL_CACHE_SIZE = int(os.environ.get('STORAGE_SIGNED_URL_CACHE_SIZE', 10000))
+    _signed_urls = OrderedDict()
+    _signed_urls_lock = threading.Lock()
+    # The generation of a blob is looked up once per this many seconds, so repeat views of a
+    # cached blob make no request. A blob overwritten meanwhile is served stale until then
+    GENERATION_TTL_SECONDS = float(os.environ.get('STORAGE_GENERATION_TTL_SECONDS', 60))
+    GENERATION_CACHE_SIZE = int(os.environ.get('STORAGE_GENERATION_CACHE_SIZE', 10000))
+    _generations = OrderedDict()
+    _generations_lock = threading.Lock()
 
+    def __init__(self, bucket_name, blob_cache: BlobCache = None, backend: StorageBackend = None):
         self.bucket_name = bucket_name
-        self.storage_client = storage.Client()
-        os.remove(credentials_path)
+        self.backend = backend or self.create_backend(bucket_name)
+        self.blob_cache = blob_cache or BlobCache.get_instance()
+        # Also cleared when signing fails, e.g. without a service account key or on a GCS emulator
+        self.signing_supported = self.backend.supports_signing
 
-    def get_bucket(self):
-        return self.storage_client.get_bucket(self.bucket_name)
+    @staticmethod
+    def create_backend(bucket_name):
+        """
+        Chooses the backend with STORAGE_BACKEND: 'gcs' (the default), 'local' or
+        'local:<directory>' for files on disk, or 'memory'.
+        """
+        backend = os.environ.get('STORAGE_BACKEND', 'gcs')
+        if backend == 'memory':
+            return InMemoryStorageBackend(bucket_name)
+        if backend == 'local':
+            return LocalStorageBackend(bucket_name)
+        if backend.startswith('local:'):
+            return LocalStorageBackend(bucket_name, backend[len('local:'):])
+        return GcsStorageBackend(bucket_name)
 
     def create_folder(self, folder_path):
-        """Create a folder in GCS by creating a zero-byte object."""
+        """Create a folder by creating a zero-byte object."""
         blob_name = folder_path if folder_path.endswith('/') else folder_path + '/'
-        bucket = self.get_bucket()
-        blob = bucket.blob(blob_name)
-        blob.upload_from_string('')
+        self.backend.put(blob_name, b'')
 
-    def upload_blob(self, data, blob_name):
-        filename = f"{uuid.uuid4()}.tmp"
-        with open(filename, "wb") as f:
-            f.write(data)
-        bucket = self.get_bucket()
-        blob = bucket.blob(blob_name)
-        blob.upload_from_filename(filename)
-        os.remove(filename)
-        return blob.public_url
+    def upload_blob(self, data, blob_name, content_type=None):
+        """Uploads a bytes-like buffer, such as the memoryview of an uploaded file, without copying it."""
+        with Tracer.span('storage.upload', memoryview(data).nbytes):
+            stat = self.backend.put(blob_name, data, content_type)
+            # The uploaded recording is scored right after, so keep it for the download
+            self.set_generation(blob_name, stat.generation)
+            self.blob_cache.put(BlobCache.get_key(blob_name, stat.generation), data)
+            return self.backend.public_url(blob_name)
 
     def download_blob(self, blob_url, filename):
         blob_name = self.get_blob_name(blob_url)
-        bucket = self.get_bucket()
-        blob = bucket.blob(blob_name)
-        data = blob.download_as_bytes()
+        data = self.download_blob_by_name(blob_name)
         with open(filename, "wb") as f:
             f.write(data)
 
     def delete_file(self, blob_url):
         blob_name = self.get_blob_name(blob_url)
+        with self._generations_lock:
+            self._generations.pop((self.bucket_name, blob_name), None)
         try:
-            bucket = self.get_bucket()
-            blob = bucket.blob(blob_name)
-            blob.delete()
+            self.backend.delete(blob_name)
             return True
         except Exception as e:
             print(f"Error while deleting blob with URL {blob_url}: {e}")
@@ -60,31 +92,188 @@ class StorageRepository:
         # Parse the URL to extract the blob name
         parsed_url = urlparse(blob_url)
         blob_name = unquote(parsed_url.path[1:])
+        if parsed_url.netloc == self.bucket_name:
+            # URLs of the local and in-memory backends, <scheme>://<bucket>/<blob name>
+            return blob_name
         blob_name = blob_name.replace(f'{self.bucket_name}/', '', 1)
         return blob_name
 
     def get_public_url(self, blob_name):
-        bucket = self.get_bucket()
-        blob = bucket.blob(blob_name)
-        return blob.public_url
+        return self.backend.public_url(blob_name)
+
+    def download_blob_by_name(self, blob_name, generation=None):
+        """
+        Returns the blob's data, from the cache when its generation was downloaded
+        before. Pass the generation when it is known, e.g. from a listing, otherwise
+        it is looked up at most once per GENERATION_TTL_SECONDS.
+        """
+        if generation is None:
+            generation = self.get_generation(blob_name)
+        key = BlobCache.get_key(blob_name, generation)
+
+        data = self.blob_cache.get(key)
+        if data is not None:
+            return data
+        try:
+            with Tracer.span('storage.download') as span:
+                data = self.backend.get(blob_name, generation)
+                span.add_bytes(len(data))
+        except NotFound:
+            # Overwritten since the generation was looked up, so look it up again
+            with self._generations_lock:
+                cached = self._generations.pop((self.bucket_name, blob_name), None)
+            if cached is None:
+                raise
+            return self.download_blob_by_name(blob_name)
+        self.blob_cache.put(key, data)
+        return data
+
+    def get_generation(self, blob_name):
+        now = time.time()
+        with self._generations_lock:
+            cached = self._generations.get((self.bucket_name, blob_name))
+        if cached and now - cached[1] < self.GENERATION_TTL_SECONDS:
+            return cached[0]
+        # The generation changes whenever the blob is overwritten
+        stat = self.backend.stat(blob_name)
+        if stat is None:
+            raise NotFound(f"Blob {blob_name} not found in bucket {self.bucket_name}")
+        self.set_generation(blob_name, stat.generation)
+        return stat.generation
+
+    def set_generation(self, blob_name, generation):
+        key = (self.bucket_name, blob_name)
+        now = time.time()
+        with self._generations_lock:
+            self._generations[key] = (generation, now)
+            self._generations.move_to_end(key)
+            # Kept in lookup order, so the expired ones are at the front
+            while self._generations:
+                _, checked_at = next(iter(self._generations.values()))
+                if len(self._generations) <= self.GENERATION_CACHE_SIZE \
+                        and now - checked_at < self.GENERATION_TTL_SECONDS:
+                    break
+                self._generations.popitem(last=False)
+
+    def download_blob_range(self, blob_name, start, end):
+        """Returns bytes start to end of the blob, both inclusive, e.g. to read a container header."""
+        with Tracer.span('storage.download') as span:
+            data = self.backend.get_range(blob_name, start, end)
+            span.add_bytes(len(data))
+            return data
+
+    def prefetch(self, blob_names):
+        """
+        Downloads the blobs concurrently and returns a dict of blob name to bytes,
+        so a list view waits for its slowest blob rather than for all of them in
+        turn. Blobs that fail to download are left out.
+        """
+        blob_names = list(dict.fromkeys(name for name in blob_names if name))
+        futures = {name: self.get_prefetch_executor().submit(self.download_blob_by_name, name)
+                   for name in blob_names}
+        blobs = {}
+        for name, future in futures.items():
+            try:
+                blobs[name] = future.result()
+            except Exception as e:
+                print(f"Error while downloading blob {name}: {e}")
+        return blobs
 
-    def download_blob_by_name(self, blob_name):
-        bucket = self.get_bucket()
-        blob = bucket.blob(blob_name)
-        return blob.download_as_bytes()
+    def prefetch_by_url(self, blob_urls):
+        """Same as prefetch, keyed by blob URL."""
+        names = {url: self.get_blob_name(url) for url in blob_urls if url}
+        blobs = self.prefetch(names.values())
+        return {url: blobs[name] for url, name in names.items() if name in blobs}
+
+    def get_signed_url(self, blob_name):
+        """
+        Returns a V4 signed URL for reading the blob, so browsers stream it
+        straight from the bucket with range requests instead of through the app.
+        """
+        key = (self.bucket_name, blob_name)
+        with self._signed_urls_lock:
+            cached = self._signed_urls.get(key)
+        if cached and cached[1] - time.time() > self.SIGNED_URL_REFRESH_SECONDS:
+            return cached[0]
+
+        url = self.backend.signed_url(blob_name, self.SIGNED_URL_SECONDS)
+        now = time.time()
+        with self._signed_urls_lock:
+            self._signed_urls[key] = (url, now + self.SIGNED_URL_SECONDS)
+            self._signed_urls.move_to_end(key)
+            self.prune_signed_urls(now)
+        return url
+
+    @classmethod
+    def prune_signed_urls(cls, now):
+        """Drops the URLs too close to expiry to be handed out, and the oldest ones beyond the cache size."""
+        while cls._signed_urls:
+            _, expires_at = next(iter(cls._signed_urls.values()))
+            if len(cls._signed_urls) <= cls.SIGNED_URL_CACHE_SIZE and expires_at - now > cls.SIGNED_URL_REFRESH_SECONDS:
+                break
+            cls._signed_urls.popitem(last=False)
+
+    def get_audio_sources(self, blob_names, prefetch=True):
+        """
+        Returns a dict of blob name to something st.audio can play: a signed URL,
+        or the blob's bytes when URLs cannot be signed. Without prefetch, blobs
+        that cannot be signed are left out for the caller to download on demand.
+        """
+        blob_names = list(dict.fromkeys(name for name in blob_names if name))
+        sources = {}
+        if self.signing_supported:
+            try:
+                for name in blob_names:
+                    sources[name] = self.get_signed_url(name)
+            except Exception as e:
+                print(f"Error while signing blob URLs, serving the audio bytes instead: {e}")
+                self.signing_supported = False
+        if prefetch:
+            sources.update(self.prefetch(name for name in blob_names if name not in sources))
+        return sources
+
+    def get_audio_sources_by_url(self, blob_urls):
+        """Same as get_audio_sources, keyed by blob URL."""
+        names = {url: self.get_blob_name(url) for url in blob_urls if url}
+        sources = self.get_audio_sources(names.values())
+        return {url: sources[name] for url, name in names.items() if name in sources}
+
+    def get_audio_source_by_url(self, blob_url):
+        return self.get_audio_sources_by_url([blob_url]).get(blob_url)
+
+    @classmethod
+    def get_prefetch_executor(cls):
+        if cls._prefetch_executor is None:
+            with cls._prefetch_executor_lock:
+                if cls._prefetch_executor is None:
+                    cls._prefetch_executor = ThreadPoolExecutor(
+                        max_workers=cls.PREFETCH_WORKERS, thread_name_prefix='storage-prefetch')
+        return cls._prefetch_executor
+
+    def list_blobs(self, prefix):
+        return self.backend.list(prefix)
+
+    def download_blob_to_file(self, blob_name, filename, generation=None):
+        """Downloads one generation of a blob, replacing the file only once the download completed."""
+        temp_path = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with Tracer.span('storage.download') as span:
+                with open(temp_path, "wb") as f:
+                    self.backend.get_to_file(blob_name, f, generation)
+                    span.add_bytes(f.tell())
+            os.replace(temp_path, filename)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
 
     def download_blob_and_save(self, blob_name, filename):
-        bucket = self.get_bucket()
-        blob = bucket.blob(blob_name)
-        data = blob.download_as_bytes()
+        data = self.download_blob_by_name(blob_name)
         with open(filename, "wb") as f:
             f.write(data)
 
     def download_blob_by_url(self, blob_url):
         blob_name = self.get_blob_name(blob_url)
-        bucket = self.get_bucket()
-        blob = bucket.blob(blob_name)
-        return blob.download_as_bytes()
+        return self.download_blob_by_name(blob_name)
 
 
 
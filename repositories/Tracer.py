@@ -0,0 +1,206 @@
+import datetime
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from repositories.AnalysisTimingRepository import AnalysisTimingRepository
+from repositories.DatabaseManager import DatabaseManager
+
+
+class Span:
+    def __init__(self, trace_id, stage, parent_stage, num_bytes=None):
+        self.trace_id = trace_id
+        self.stage = stage
+        self.parent_stage = parent_stage
+        self.bytes = num_bytes
+        self.started_at = datetime.datetime.now()
+        self.duration_ms = None
+
+    def add_bytes(self, num_bytes):
+        self.bytes = (self.bytes or 0) + num_bytes
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'stage': self.stage,
+            'parent_stage': self.parent_stage,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': self.duration_ms,
+            'bytes': self.bytes,
+        }
+
+
+class JsonlTimingSink:
+    """Appends spans to a JSON lines file, one span per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def add_timings(self, spans):
+        lines = ''.join(json.dumps(span.to_dict()) + '\n' for span in spans)
+        with self.lock, open(self.path, 'a') as f:
+            f.write(lines)
+
+
+class DatabaseTimingSink:
+    """
+    Writes spans to the analysis_timings table from a background thread with a
+    connection of its own, so tracing never waits on the database. Sessions only
+    put their batches on a bounded queue. When the queue is full, because the
+    database is slow or unreachable, new batches are dropped and counted rather
+    than held in memory.
+    """
+    MAX_PENDING_BATCHES = int(os.environ.get('ANALYSIS_TIMINGS_MAX_PENDING', 1000))
+    RETRY_SECONDS = 30
+
+    def __init__(self, max_pending=MAX_PENDING_BATCHES):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = None
+        self.thread_lock = threading.Lock()
+        self.analysis_timing_repo = None
+        self.dropped = 0
+
+    def add_timings(self, spans):
+        try:
+            self.queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += len(spans)
+            return
+        if self.thread is None:
+            with self.thread_lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self.run, name='analysis-timings-writer', daemon=True)
+                    self.thread.start()
+
+    def run(self):
+        while True:
+            spans = self.queue.get()
+            # Everything queued meanwhile goes into the same INSERT
+            while len(spans) < 500:
+                try:
+                    spans = spans + self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.write(spans)
+
+    def write(self, spans):
+        try:
+            if self.analysis_timing_repo is None:
+                self.analysis_timing_repo = AnalysisTimingRepository(DatabaseManager.connect())
+            self.analysis_timing_repo.add_timings(spans)
+        except Exception as e:
+            # Timings are best effort, the batch is dropped and the connection opened again later
+            print(f"Error while writing {len(spans)} analysis timings: {e}")
+            self.dropped += len(spans)
+            self.analysis_timing_repo = None
+            time.sleep(self.RETRY_SECONDS)
+
+
+class Tracer:
+    """
+    Records how long each stage of the recording pipeline takes. Stages are
+    timed with context-manager spans using a monotonic clock, spans opened
+    inside another span share its trace id, and the spans of a trace are
+    written to the sink in one batch when its outermost span closes.
+
+        with Tracer.span('storage.upload', len(data)):
+            ...
+
+    The sink is chosen with ANALYSIS_TIMINGS_SINK: 'off' (the default), 'db'
+    for the analysis_timings table, written in the background, or
+    'jsonl:<path>' for a file.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.local = threading.local()
+
+    @classmethod
+    def get(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(cls.get_sink_from_env())
+        return cls._instance
+
+    @classmethod
+    def configure(cls, sink):
+        with cls._instance_lock:
+            cls._instance = cls(sink)
+        return cls._instance
+
+    @staticmethod
+    def get_sink_from_env():
+        sink = os.environ.get('ANALYSIS_TIMINGS_SINK', 'off')
+        if sink == 'db':
+            return DatabaseTimingSink()
+        if sink.startswith('jsonl:'):
+            return JsonlTimingSink(sink[len('jsonl:'):])
+        return None
+
+    @classmethod
+    def span(cls, stage, num_bytes=None):
+        return cls.get().start_span(stage, num_bytes)
+
+    @classmethod
+    def record(cls, stage, duration_ms, num_bytes=None):
+        cls.get().add_span(stage, duration_ms, num_bytes)
+
+    def add_span(self, stage, duration_ms, num_bytes=None):
+        """Records a stage timed by the caller, inside the open span if there is one."""
+        if self.sink is None:
+            return
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+            self.local.finished = []
+        parent = stack[-1] if stack else None
+        span = Span(parent.trace_id if parent else uuid.uuid4().hex, stage,
+                    parent.stage if parent else None, num_bytes)
+        span.started_at -= datetime.timedelta(milliseconds=duration_ms)
+        span.duration_ms = duration_ms
+        self.local.finished.append(span)
+        if not stack:
+            self.flush()
+
+    @contextmanager
+    def start_span(self, stage, num_bytes=None):
+        if self.sink is None:
+            yield Span(None, stage, None, num_bytes)
+            return
+
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+            self.local.finished = []
+        parent = stack[-1] if stack else None
+        span = Span(parent.trace_id if parent else uuid.uuid4().hex, stage,
+                    parent.stage if parent else None, num_bytes)
+        stack.append(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            stack.pop()
+            self.local.finished.append(span)
+            if not stack:
+                self.flush()
+
+    def flush(self):
+        spans = getattr(self.local, 'finished', None)
+        if not spans:
+            return
+        self.local.finished = []
+        try:
+            self.sink.add_timings(spans)
+        except Exception as e:
+            # Timings must never break an upload or a scoring job
+            print(f"Error while writing analysis timings: {e}")
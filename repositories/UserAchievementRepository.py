@@ -2,11 +2,13 @@ import datetime
 import pymysql.cursors
 from enums.Badges import UserBadges, TrackBadges
 from enums.TimeFrame import TimeFrame
+from repositories.UserDailyStatsRepository import UserDailyStatsRepository
 
 
 class UserAchievementRepository:
     def __init__(self, connection):
         self.connection = connection
+        self.user_daily_stats_repo = UserDailyStatsRepository(connection)
         #self.create_achievements_table()
 
     def create_achievements_table(self):
@@ -18,7 +20,8 @@ class UserAchievementRepository:
                 recording_id INT NULL,
                 badge VARCHAR(255),
                 value INT DEFAULT 0,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_user_achievements_user_timestamp (user_id, timestamp)
             ); """
         cursor.execute(create_table_query)
         self.connection.commit()
@@ -47,6 +50,7 @@ class UserAchievementRepository:
                 "INSERT INTO user_achievements (user_id, badge, timestamp, value) VALUES (%s, %s, %s, %s)",
                 (user_id, badge.value, end_date, value)
             )
+            self.user_daily_stats_repo.add_badge(user_id, end_date)
         else:
             # If badge exists, update the record
             cursor.execute(
@@ -84,6 +88,7 @@ class UserAchievementRepository:
                 "INSERT INTO user_achievements (user_id, badge, timestamp) VALUES (%s, %s, %s)",
                 (user_id, badge.value, timestamp)
             )
+            self.user_daily_stats_repo.add_badge(user_id, timestamp)
             self.connection.commit()
             return True, f"Awarded {badge.name} to user with ID {user_id}"
         else:
@@ -107,6 +112,7 @@ class UserAchievementRepository:
                 "VALUES (%s, %s, %s, %s)",
                 (user_id, badge.value, recording_id, timestamp)
             )
+            self.user_daily_stats_repo.add_badge(user_id, timestamp)
             self.connection.commit()
             return True, f"Awarded {badge.value} to user with ID {user_id}"
         else:
@@ -1,3 +1,4 @@
+import datetime
 import json
 import pytz
 import pymysql
@@ -7,8 +8,10 @@ from enums.TimeFrame import TimeFrame
 
 
 class UserActivityRepository:
-    def __init__(self, connection):
+    def __init__(self, connection, activity_writer=None):
         self.connection = connection
+        # When set, activities are buffered and written in batches off the request path
+        self.activity_writer = activity_writer
         #self.create_activities_table()
 
     def create_activities_table(self):
@@ -21,6 +24,7 @@ class UserActivityRepository:
                 activity_type VARCHAR(255),
                 additional_params JSON,
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_user_activities_timestamp_user (timestamp, user_id),
                 FOREIGN KEY (user_id) REFERENCES `users`(id)
             );
         """
@@ -35,18 +39,33 @@ class UserActivityRepository:
         # Add the session_id to the additional_params
         additional_params['session_id'] = session_id
 
+        # Convert the additional_params dictionary to a JSON string. The time of the event is
+        # kept, as a buffered activity reaches the table a few seconds later
+        activity = (user_id, session_id, activity_type.value, json.dumps(additional_params),
+                    datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S'))
+        if self.activity_writer is not None:
+            self.activity_writer.enqueue(activity)
+        else:
+            self.add_activities([activity])
+
+    def add_activities(self, activities):
+        """Inserts (user_id, session_id, activity_type, additional_params, timestamp) rows in one statement."""
         cursor = self.connection.cursor()
-        insert_activity_query = """
-            INSERT INTO user_activities (user_id, session_id, activity_type, additional_params)
-            VALUES (%s, %s, %s, %s);
+        insert_activities_query = """
+            INSERT INTO user_activities (user_id, session_id, activity_type, additional_params, timestamp)
+            VALUES (%s, %s, %s, %s, %s);
         """
-        # Convert the additional_params dictionary to a JSON string
-        additional_params_json = json.dumps(additional_params)
-        cursor.execute(insert_activity_query,
-                       (user_id, session_id, activity_type.value, additional_params_json))
+        # pymysql turns executemany of an INSERT into a single multi-row INSERT
+        cursor.executemany(insert_activities_query, activities)
         self.connection.commit()
 
+    def flush(self):
+        """Writes out the buffered activities, for reads that must see them."""
+        if self.activity_writer is not None:
+            self.activity_writer.flush()
+
     def get_user_activities(self, user_id, timezone='America/Los_Angeles', limit=50):
+        self.flush()
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         query = """
             SELECT activity_id,
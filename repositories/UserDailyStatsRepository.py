@@ -0,0 +1,142 @@
+class UserDailyStatsRepository:
+    """
+    Per user and day totals of recordings, scores, practice, badges and
+    sessions, read by the progress and team dashboards instead of grouping the
+    raw rows on every view. The write paths add their deltas here before they
+    commit, so a row and its totals land in the same transaction. None of the
+    add methods commit. Migration 0006 backfills the table, and rebuild
+    recomputes a range from the raw tables to repair it after data was changed
+    by hand.
+    """
+    COLUMNS = ('recordings', 'recording_seconds', 'scored_recordings', 'score_sum', 'practice_minutes', 'badges',
+               'sessions', 'session_seconds')
+
+    def __init__(self, connection):
+        self.connection = connection
+        #self.create_user_daily_stats_table()
+
+    def create_user_daily_stats_table(self):
+        cursor = self.connection.cursor()
+        create_table_query = """
+            CREATE TABLE IF NOT EXISTS `user_daily_stats` (
+                user_id INT NOT NULL,
+                date DATE NOT NULL,
+                recordings INT NOT NULL DEFAULT 0,
+                recording_seconds INT NOT NULL DEFAULT 0,
+                scored_recordings INT NOT NULL DEFAULT 0,
+                score_sum INT NOT NULL DEFAULT 0,
+                practice_minutes INT NOT NULL DEFAULT 0,
+                badges INT NOT NULL DEFAULT 0,
+                sessions INT NOT NULL DEFAULT 0,
+                session_seconds INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, date)
+            );
+        """
+        cursor.execute(create_table_query)
+        self.connection.commit()
+
+    @staticmethod
+    def get_upsert_query(columns, source_query):
+        """Adds the (user_id, date, *columns) rows of the source query to the existing totals."""
+        increments = ', '.join(f"{column} = {column} + VALUES({column})" for column in columns)
+        return f"""INSERT INTO user_daily_stats (user_id, date, {', '.join(columns)})
+                   {source_query}
+                   ON DUPLICATE KEY UPDATE {increments};"""
+
+    def add_recording(self, user_id, timestamp, duration):
+        cursor = self.connection.cursor()
+        query = self.get_upsert_query(('recordings', 'recording_seconds'), "SELECT %s, DATE(%s), 1, %s")
+        cursor.execute(query, (user_id, timestamp, duration or 0))
+
+    def add_recording_scores(self, scores):
+        """Adds the change from the stored score to the new one of each (recording_id, score), before the update."""
+        if not scores:
+            return
+        cursor = self.connection.cursor()
+        # executemany would run an INSERT ... SELECT once per row, so the new scores are joined in as a derived table
+        new_scores = ' UNION ALL '.join(['SELECT %s AS id, %s AS score'] + ['SELECT %s, %s'] * (len(scores) - 1))
+        query = self.get_upsert_query(('scored_recordings', 'score_sum'), f"""
+            SELECT r.user_id, DATE(r.timestamp), SUM((s.score IS NOT NULL) - (r.score IS NOT NULL)),
+                   SUM(COALESCE(s.score, 0) - COALESCE(r.score, 0))
+            FROM recordings r
+            JOIN ({new_scores}) AS s ON r.id = s.id
+            GROUP BY r.user_id, DATE(r.timestamp)""")
+        cursor.execute(query, [value for recording_id, score in scores for value in (recording_id, score)])
+
+    def add_practice(self, user_id, timestamp, minutes):
+        cursor = self.connection.cursor()
+        query = self.get_upsert_query(('practice_minutes',), "SELECT %s, DATE(%s), %s")
+        cursor.execute(query, (user_id, timestamp, minutes or 0))
+
+    def add_badge(self, user_id, timestamp):
+        cursor = self.connection.cursor()
+        query = self.get_upsert_query(('badges',), "SELECT %s, DATE(%s), 1")
+        cursor.execute(query, (user_id, timestamp))
+
+    def add_session(self, session_id):
+        cursor = self.connection.cursor()
+        query = self.get_upsert_query(('sessions',), """
+            SELECT user_id, DATE(open_session_time), 1 FROM user_sessions WHERE session_id = %s""")
+        cursor.execute(query, (session_id,))
+
+    def add_session_seconds(self, session_id, closing=False):
+        """Adds the time since the stored session duration, before the session is updated or closed."""
+        cursor = self.connection.cursor()
+        # Closing a session ends it at its last activity, the activity updates extend it to now
+        end_time = 'last_activity_time' if closing else 'CURRENT_TIMESTAMP'
+        query = self.get_upsert_query(('session_seconds',), f"""
+            SELECT user_id, DATE(open_session_time),
+                   TIMESTAMPDIFF(SECOND, open_session_time, {end_time}) - COALESCE(session_duration, 0)
+            FROM user_sessions
+            WHERE session_id = %s""")
+        cursor.execute(query, (session_id,))
+
+    def rebuild(self, user_id=None, start_date=None, end_date=None):
+        """Recomputes the totals of the days from start_date to end_date, inclusive, and returns the days written."""
+        cursor = self.connection.cursor()
+        user_condition = "user_id = %s" if user_id is not None else "%s IS NULL"
+        range_params = (user_id, start_date, end_date)
+        # Whole days, compared on the raw timestamps so that the (user_id, timestamp) indexes apply
+        in_range = (f"{user_condition} AND {{0}} >= COALESCE(%s, '1000-01-01') "
+                    f"AND {{0}} < COALESCE(%s, '9999-12-30') + INTERVAL 1 DAY")
+        source_query = f"""
+            SELECT user_id, date, SUM(recordings), SUM(recording_seconds), SUM(scored_recordings), SUM(score_sum),
+                   SUM(practice_minutes), SUM(badges), SUM(sessions), SUM(session_seconds)
+            FROM (
+                SELECT user_id, DATE(timestamp) AS date, COUNT(*) AS recordings,
+                       COALESCE(SUM(duration), 0) AS recording_seconds, COUNT(score) AS scored_recordings,
+                       COALESCE(SUM(score), 0) AS score_sum, 0 AS practice_minutes, 0 AS badges, 0 AS sessions,
+                       0 AS session_seconds
+                FROM recordings
+                WHERE {in_range.format('timestamp')}
+                GROUP BY user_id, DATE(timestamp)
+                UNION ALL
+                SELECT user_id, DATE(timestamp), 0, 0, 0, 0, COALESCE(SUM(minutes), 0), 0, 0, 0
+                FROM user_practice_logs
+                WHERE {in_range.format('timestamp')}
+                GROUP BY user_id, DATE(timestamp)
+                UNION ALL
+                SELECT user_id, DATE(timestamp), 0, 0, 0, 0, 0, COUNT(*), 0, 0
+                FROM user_achievements
+                WHERE {in_range.format('timestamp')}
+                GROUP BY user_id, DATE(timestamp)
+                UNION ALL
+                SELECT user_id, DATE(open_session_time), 0, 0, 0, 0, 0, 0, COUNT(*), COALESCE(SUM(session_duration), 0)
+                FROM user_sessions
+                WHERE {in_range.format('open_session_time')}
+                GROUP BY user_id, DATE(open_session_time)
+            ) AS daily
+            WHERE user_id IS NOT NULL
+            GROUP BY user_id, date"""
+        try:
+            cursor.execute(f"""DELETE FROM user_daily_stats
+                               WHERE {user_condition}
+                               AND date BETWEEN COALESCE(%s, '1000-01-01') AND COALESCE(%s, '9999-12-31');""",
+                           range_params)
+            cursor.execute(f"""INSERT INTO user_daily_stats (user_id, date, {', '.join(self.COLUMNS)})
+                               {source_query};""", range_params * 4)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        return cursor.rowcount
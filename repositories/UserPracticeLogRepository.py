@@ -3,11 +3,13 @@ import pymysql.cursors
 
 from enums.Badges import UserBadges
 from enums.TimeFrame import TimeFrame
+from repositories.UserDailyStatsRepository import UserDailyStatsRepository
 
 
 class UserPracticeLogRepository:
     def __init__(self, connection):
         self.connection = connection
+        self.user_daily_stats_repo = UserDailyStatsRepository(connection)
         #self.create_practice_log_table()
 
     def create_practice_log_table(self):
@@ -18,6 +20,7 @@ class UserPracticeLogRepository:
                 user_id INT,
                 timestamp DATETIME,
                 minutes INT,
+                INDEX idx_user_practice_logs_user_timestamp (user_id, timestamp),
                 FOREIGN KEY (user_id) REFERENCES `users`(id)
             );
         """
@@ -39,6 +42,7 @@ class UserPracticeLogRepository:
             VALUES (%s, %s, %s);
         """
         cursor.execute(insert_log_query, (user_id, timestamp, minutes))
+        self.user_daily_stats_repo.add_practice(user_id, timestamp, minutes)
         self.connection.commit()
 
     def get_streaks(self, user_id):
@@ -127,11 +131,10 @@ class UserPracticeLogRepository:
     def fetch_daily_practice_minutes(self, user_id):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         query = """
-            SELECT DATE(timestamp) as date, SUM(minutes) as total_minutes
-            FROM user_practice_logs
-            WHERE user_id = %s
-            GROUP BY DATE(timestamp)
-            ORDER BY DATE(timestamp)
+            SELECT date, practice_minutes as total_minutes
+            FROM user_daily_stats
+            WHERE user_id = %s AND practice_minutes > 0
+            ORDER BY date
         """
         cursor.execute(query, (user_id,))
         practice_data = cursor.fetchall()
@@ -42,6 +42,7 @@ class UserRepository:
                 group_id INT,
                 org_id INT,
                 avatar_id INT DEFAULT NULL,
+                INDEX idx_users_group_type (group_id, user_type),
                 FOREIGN KEY (group_id) REFERENCES `user_groups`(id),
                 FOREIGN KEY (org_id) REFERENCES `organizations`(id),
                 FOREIGN KEY (avatar_id) REFERENCES `avatars`(id)
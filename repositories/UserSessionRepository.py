@@ -4,11 +4,13 @@ import pymysql
 import pytz
 
 from enums.TimeFrame import TimeFrame
+from repositories.UserDailyStatsRepository import UserDailyStatsRepository
 
 
 class UserSessionRepository:
     def __init__(self, connection):
         self.connection = connection
+        self.user_daily_stats_repo = UserDailyStatsRepository(connection)
         #self.create_sessions_table()
 
     def create_sessions_table(self):
@@ -53,6 +55,7 @@ class UserSessionRepository:
         session_id = f'session-{user_id}-{int(time())}'  # Generating a simple session ID
         insert_session_query = """INSERT INTO user_sessions (session_id, user_id) VALUES (%s, %s);"""
         cursor.execute(insert_session_query, (session_id, user_id))
+        self.user_daily_stats_repo.add_session(session_id)
         self.connection.commit()
 
         cursor.close()  # close the cursor after use
@@ -60,6 +63,7 @@ class UserSessionRepository:
 
     def close_session(self, session_id):
         cursor = self.connection.cursor()
+        self.user_daily_stats_repo.add_session_seconds(session_id, closing=True)
         # Update the close_session_time, calculate session_duration, and set is_open to FALSE
         update_session_query = """
             UPDATE user_sessions
@@ -100,6 +104,7 @@ class UserSessionRepository:
 
     def update_last_activity_time(self, session_id):
         cursor = self.connection.cursor()
+        self.user_daily_stats_repo.add_session_seconds(session_id)
         update_activity_time_query = """
             UPDATE user_sessions
             SET last_activity_time = CURRENT_TIMESTAMP,
@@ -153,12 +158,9 @@ class UserSessionRepository:
     def get_time_series_data(self, user_id):
         cursor = self.connection.cursor(pymysql.cursors.DictCursor)
         query = """
-            SELECT DATE(open_session_time) as date,
-                   COALESCE(SUM(session_duration), 0) as total_duration,
-                   COUNT(*) as total_sessions
-            FROM user_sessions
-            WHERE user_id = %s
-            GROUP BY DATE(open_session_time)
+            SELECT date, session_seconds as total_duration, sessions as total_sessions
+            FROM user_daily_stats
+            WHERE user_id = %s AND sessions > 0
             ORDER BY date ASC;
             """
         cursor.execute(query, (user_id,))
@@ -0,0 +1,51 @@
+import argparse
+
+from components.RecordingRescorer import RecordingRescorer
+from enums.AnalysisProfile import AnalysisProfile
+from repositories.DatabaseManager import DatabaseManager
+from script_env import set_env
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        description="Rescore existing recordings, e.g. after a track offset or the scoring algorithm changed.")
+    parser.add_argument('--track-id', type=int, help="Only recordings of this track")
+    parser.add_argument('--org-id', type=int, help="Only recordings of users in this organization")
+    parser.add_argument('--group-id', type=int, help="Only recordings of users in this group")
+    parser.add_argument('--from-date', help="Only recordings made on or after this date (YYYY-MM-DD)")
+    parser.add_argument('--to-date', help="Only recordings made before this date (YYYY-MM-DD)")
+    parser.add_argument('--profile', choices=[profile.profile_name for profile in AnalysisProfile],
+                        help="Analysis profile to score with, defaults to the profile of each org")
+    parser.add_argument('--processes', type=int, help="Scoring processes, defaults to the CPU count")
+    parser.add_argument('--prefetch', type=int, default=32, help="Recordings downloaded ahead of scoring")
+    parser.add_argument('--batch-size', type=int, default=50, help="Scores written back per UPDATE batch")
+    parser.add_argument('--checkpoint', default='rescore_checkpoint.json',
+                        help="Progress file, the run resumes from it when the filters match")
+    return parser.parse_args(args)
+
+
+def main():
+    args = parse_args()
+    set_env()
+    filters = {
+        'track_id': args.track_id,
+        'org_id': args.org_id,
+        'group_id': args.group_id,
+        'from_date': args.from_date,
+        'to_date': args.to_date,
+    }
+    database_manager = DatabaseManager()
+    reader_database_manager = DatabaseManager()
+    rescorer = RecordingRescorer(
+        database_manager.connection, reader_database_manager.connection, filters, args.checkpoint,
+        args.processes, args.prefetch, args.batch_size,
+        profile=AnalysisProfile.get_by_name(args.profile) if args.profile else None)
+    try:
+        rescorer.run()
+    finally:
+        database_manager.close()
+        reader_database_manager.close()
+
+
+if __name__ == "__main__":
+    main()
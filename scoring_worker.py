@@ -0,0 +1,16 @@
+import os
+
+from components.ScoringWorker import ScoringWorker
+from script_env import set_env
+
+
+def main():
+    set_env()
+    # A dedicated scorer, run the app processes with SCORING_WORKER_IN_PROCESS=0 next to it
+    # so they stop starting workers of their own
+    max_workers = int(os.environ.get('SCORING_WORKER_PROCESSES', '0')) or None
+    ScoringWorker(max_workers=max_workers).run()
+
+
+if __name__ == "__main__":
+    main()
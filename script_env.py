@@ -0,0 +1,16 @@
+import os
+
+import streamlit as st
+
+
+def set_env():
+    """
+    Copies the app's secrets into the environment for the command line scripts,
+    which run outside a portal and so cannot use BasePortal.set_env.
+    """
+    env_vars = ['ROOT_USER', 'ROOT_PASSWORD', 'ADMIN_PASSWORD',
+                'SQL_SERVER', 'SQL_DATABASE', 'SQL_USERNAME', 'SQL_PASSWORD',
+                'MYSQL_CONNECTION_STRING', 'EMAIL_ID', 'EMAIL_PASSWORD']
+    for var in env_vars:
+        os.environ[var] = st.secrets[var]
+    os.environ["GOOGLE_APP_CRED"] = st.secrets["GOOGLE_APPLICATION_CREDENTIALS"]
@@ -0,0 +1,129 @@
+"""
+Times AudioProcessor on deterministic synthetic recordings and compares the results
+with the JSON baselines in tests/benchmarks/baselines. Each recording length runs in a
+fresh process so its peak RSS can be measured. The run fails when a stage is slower,
+or a case uses more memory, than its baseline allows. Everything runs offline.
+
+Run with: PYTHONPATH=. python tests/benchmarks/AudioProcessor_benchmark.py [--seconds 30 120 600]
+Update the baselines after an intended change with --update-baseline.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from tests.benchmarks.SyntheticAudio import SyntheticAudio
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'AudioProcessor.json')
+# Allowed slowdown over the baseline before a stage counts as a regression; timings
+# vary between runs, so only large changes fail
+TIME_TOLERANCE = 0.5
+RSS_TOLERANCE = 0.25
+# Stages this fast are dominated by noise and are only reported
+MIN_SECONDS_CHECKED = 0.05
+
+
+def timed(results, stage, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    results[stage] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def run_case(seconds, raga, seed):
+    """Runs every stage on one recording length, inside its own process."""
+    from components.AudioProcessor import AudioProcessor
+    from repositories.Tracer import Tracer
+    # No timings are written anywhere from the benchmark
+    Tracer.configure(None)
+
+    synthetic_audio = SyntheticAudio()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        teacher_path = os.path.join(directory, 'teacher.wav')
+        student_path = os.path.join(directory, 'student.wav')
+        synthetic_audio.write(teacher_path, synthetic_audio.generate(seconds, raga, seed))
+        synthetic_audio.write(student_path, synthetic_audio.generate(
+            seconds, raga, seed + 1, tempo_jitter=0.1, noise=0.02))
+
+        # Warm up librosa's JIT-compiled kernels so the first stage is not charged for them
+        warm_up_path = os.path.join(directory, 'warm_up.wav')
+        synthetic_audio.write(warm_up_path, synthetic_audio.generate(2, raga, seed))
+        AudioProcessor().compare_audio(warm_up_path, warm_up_path)
+        AudioProcessor.get_notes(warm_up_path)
+
+        audio_processor = AudioProcessor()
+        timed(results, 'extract_features', AudioProcessor.extract_features, student_path)
+        timed(results, 'compare_audio', audio_processor.compare_audio, teacher_path, student_path)
+        notes = timed(results, 'get_notes', AudioProcessor.get_notes, student_path)
+        timed(results, 'filter_consecutive_notes', AudioProcessor.filter_consecutive_notes, notes)
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results['peak_rss_mb'] = round(max_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    return results
+
+
+def run(seconds_list, raga='Mayamalavagowla', seed=0):
+    # maxtasksperchild=1 gives each case a fresh process, so its peak RSS is its own
+    with multiprocessing.get_context('spawn').Pool(1, maxtasksperchild=1) as pool:
+        return {f"{seconds}s": pool.apply(run_case, (seconds, raga, seed)) for seconds in seconds_list}
+
+
+def compare_with_baseline(results, baseline):
+    regressions = []
+    for case, stages in results.items():
+        for stage, value in stages.items():
+            expected = baseline.get(case, {}).get(stage)
+            if expected is None:
+                continue
+            if stage == 'peak_rss_mb':
+                if value > expected * (1 + RSS_TOLERANCE):
+                    regressions.append(f"{case} {stage}: {value} MB, baseline {expected} MB")
+            elif max(value, expected) >= MIN_SECONDS_CHECKED and value > expected * (1 + TIME_TOLERANCE):
+                regressions.append(f"{case} {stage}: {value:.3f} s, baseline {expected:.3f} s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=int, nargs='+', default=[30, 120, 300, 600])
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    results = run(args.seconds)
+    stages = ['extract_features', 'compare_audio', 'get_notes', 'filter_consecutive_notes']
+    print(f"{'case':>6} " + ' '.join(f"{stage:>24}" for stage in stages) + f" {'peak RSS (MB)':>14}")
+    for case, result in results.items():
+        print(f"{case:>6} " + ' '.join(f"{result[stage]:>24.3f}" for stage in stages) +
+              f" {result['peak_rss_mb']:>14.1f}")
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        raise SystemExit(f"No baseline at {args.baseline}, create one with --update-baseline")
+    with open(args.baseline) as f:
+        regressions = compare_with_baseline(results, json.load(f))
+    if regressions:
+        raise SystemExit("Regressions against the baseline:\n  " + '\n  '.join(regressions))
+    print("No regressions against the baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares the banded DTW engine with fastdtw on synthetic chroma sequences.
+
+Run with: PYTHONPATH=. python tests/benchmarks/DTW_benchmark.py [--sizes 1000 5000 20000]
+"""
+import argparse
+import time
+
+import numpy as np
+from fastdtw import fastdtw
+from scipy.spatial.distance import euclidean
+
+from components.BandedDTW import BandedDTW
+
+# Relative difference allowed between the banded engine and fastdtw
+TOLERANCE = 1e-3
+
+
+def synthetic_chroma(num_frames, rng, frames_per_note=40):
+    notes = rng.integers(0, 12, size=num_frames // frames_per_note + 1)
+    chroma = 0.2 * rng.random((num_frames, 12))
+    chroma[np.arange(num_frames), notes[np.arange(num_frames) // frames_per_note]] += 1
+    return chroma / chroma.max(axis=1, keepdims=True)
+
+
+def warped_copy(chroma, rng, tempo_jitter=0.1, noise=0.1):
+    rate = 1 + rng.uniform(-tempo_jitter, tempo_jitter)
+    indices = np.clip((np.arange(int(len(chroma) * rate)) / rate).astype(int), 0, len(chroma) - 1)
+    warped = chroma[indices] + noise * rng.random((len(indices), chroma.shape[1]))
+    return warped / warped.max(axis=1, keepdims=True)
+
+
+def run(sizes, seed=0):
+    rng = np.random.default_rng(seed)
+    banded_dtw = BandedDTW()
+    results = []
+    for size in sizes:
+        teacher = synthetic_chroma(size, rng)
+        student = warped_copy(teacher, rng)
+
+        start = time.perf_counter()
+        fast_distance, _ = fastdtw(teacher, student, dist=euclidean)
+        fast_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        banded_distance = banded_dtw.distance(teacher, student)
+        banded_seconds = time.perf_counter() - start
+
+        results.append({
+            'frames': size,
+            'fastdtw_seconds': fast_seconds,
+            'banded_seconds': banded_seconds,
+            'speedup': fast_seconds / banded_seconds,
+            'relative_difference': abs(banded_distance - fast_distance) / fast_distance,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 5000, 10000, 20000])
+    args = parser.parse_args()
+
+    print(f"{'frames':>8} {'fastdtw (s)':>12} {'banded (s)':>12} {'speedup':>8} {'rel. diff':>10}")
+    within_tolerance = True
+    for result in run(args.sizes):
+        print(f"{result['frames']:>8} {result['fastdtw_seconds']:>12.3f} {result['banded_seconds']:>12.3f} "
+              f"{result['speedup']:>8.1f} {result['relative_difference']:>10.2e}")
+        within_tolerance &= result['relative_difference'] <= TOLERANCE
+    if not within_tolerance:
+        raise SystemExit(f"Banded DTW differs from fastdtw by more than {TOLERANCE:.0e}")
+
+
+if __name__ == '__main__':
+    main()
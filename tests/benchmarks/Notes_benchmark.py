@@ -0,0 +1,91 @@
+"""
+Compares the batched note extraction of AudioProcessor.get_notes_from_audio with the
+previous per-onset FFT on synthetic recordings of plucked tones.
+
+Run with: PYTHONPATH=. python tests/benchmarks/Notes_benchmark.py [--onsets 50 500 2000]
+"""
+import argparse
+import time
+
+import librosa
+import numpy as np
+
+from components.AudioProcessor import AudioProcessor
+
+SAMPLE_RATE = 22050
+
+
+def synthetic_recording(num_onsets, rng, min_note_seconds=0.12, max_note_seconds=0.5):
+    """Returns a normalized recording of num_onsets decaying tones with harmonics."""
+    note_lengths = (rng.uniform(min_note_seconds, max_note_seconds, num_onsets) * SAMPLE_RATE).astype(int)
+    # Pitches between D3 and D5, the range of most student recordings
+    frequencies = 146.83 * 2 ** (rng.integers(0, 25, num_onsets) / 12)
+    tones = []
+    for length, frequency in zip(note_lengths, frequencies):
+        t = np.arange(length) / SAMPLE_RATE
+        tone = sum(np.sin(2 * np.pi * frequency * k * t) / k for k in range(1, 4))
+        tones.append(tone * np.exp(-3 * t))
+    y = np.concatenate(tones) + 0.01 * rng.standard_normal(note_lengths.sum())
+    return librosa.util.normalize(y.astype(np.float32))
+
+
+def per_onset_fft_notes(y, sr):
+    """The previous implementation, one complex FFT per onset slice."""
+    o_env = librosa.onset.onset_strength(y=y, sr=sr)
+    onset_frames = librosa.onset.onset_detect(onset_envelope=o_env, normalize=True, sr=sr)
+    onset_samples = librosa.frames_to_samples(onset_frames)
+    notes = []
+    for start, end in zip(onset_samples[:-1], onset_samples[1:]):
+        fft_result = np.fft.fft(y[start:end])
+        frequencies = np.fft.fftfreq(len(fft_result))
+        peak_frequency = frequencies[np.argmax(np.abs(fft_result))]
+        if peak_frequency > 0:
+            notes.append(AudioProcessor.freq_to_note(peak_frequency))
+    return notes
+
+
+def run(onset_counts, seed=0):
+    rng = np.random.default_rng(seed)
+    # Warm up librosa's caches so the first size is not charged for them
+    AudioProcessor.get_notes_from_audio(synthetic_recording(10, rng), SAMPLE_RATE)
+    results = []
+    for num_onsets in onset_counts:
+        y = synthetic_recording(num_onsets, rng)
+
+        start = time.perf_counter()
+        previous_notes = per_onset_fft_notes(y, SAMPLE_RATE)
+        previous_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        notes = AudioProcessor.get_notes_from_audio(y, SAMPLE_RATE)
+        batched_seconds = time.perf_counter() - start
+
+        compared = min(len(notes), len(previous_notes))
+        agreement = np.mean([a == b for a, b in zip(notes, previous_notes)]) if compared else 1.0
+        results.append({
+            'onsets': num_onsets,
+            'notes': len(notes),
+            'previous_seconds': previous_seconds,
+            'batched_seconds': batched_seconds,
+            'speedup': previous_seconds / batched_seconds,
+            'agreement': agreement,
+            'same_note_set': set(notes) == set(previous_notes),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--onsets', type=int, nargs='+', default=[50, 200, 500, 1000, 2000])
+    args = parser.parse_args()
+
+    print(f"{'onsets':>7} {'notes':>6} {'per-onset (s)':>14} {'batched (s)':>12} {'speedup':>8} "
+          f"{'agreement':>10} {'same set':>9}")
+    for result in run(args.onsets):
+        print(f"{result['onsets']:>7} {result['notes']:>6} {result['previous_seconds']:>14.3f} "
+              f"{result['batched_seconds']:>12.3f} {result['speedup']:>8.1f} "
+              f"{result['agreement']:>10.1%} {str(result['same_note_set']):>9}")
+
+
+if __name__ == '__main__':
+    main()
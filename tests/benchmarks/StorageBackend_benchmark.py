@@ -0,0 +1,72 @@
+"""
+Compares the throughput of the storage backends on two workloads: many small
+assets, like badges and avatars, and a few large recordings. Each blob is
+uploaded once, then read back from a thread pool the size of the storage
+prefetch pool, the way the list views read them. The local and in-memory
+backends run offline, GCS only runs when a scratch bucket is given.
+
+Run with: PYTHONPATH=. python tests/benchmarks/StorageBackend_benchmark.py [--gcs-bucket <bucket>]
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from repositories.InMemoryStorageBackend import InMemoryStorageBackend
+from repositories.LocalStorageBackend import LocalStorageBackend
+from repositories.StorageRepository import StorageRepository
+
+WORKLOADS = {
+    'small assets': (500, 32 * 1024),
+    'large audio': (8, 16 * 1024 * 1024),
+}
+
+
+def run_workload(backend, count, size):
+    prefix = f"benchmark/{uuid.uuid4()}"
+    names = [f"{prefix}/{i}.m4a" for i in range(count)]
+    data = os.urandom(size)
+
+    start = time.perf_counter()
+    for name in names:
+        backend.put(name, memoryview(data))
+    put_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=StorageRepository.PREFETCH_WORKERS) as executor:
+        read = sum(len(blob) for blob in executor.map(backend.get, names))
+    get_seconds = time.perf_counter() - start
+    assert read == count * size
+
+    for name in names:
+        backend.delete(name)
+    return put_seconds, get_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--gcs-bucket', help="scratch bucket to include GCS, needs GOOGLE_APP_CRED")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            'memory': InMemoryStorageBackend('benchmark'),
+            'local': LocalStorageBackend('benchmark', directory),
+        }
+        if args.gcs_bucket:
+            from repositories.GcsStorageBackend import GcsStorageBackend
+            backends['gcs'] = GcsStorageBackend(args.gcs_bucket)
+
+        print(f"{'backend':>8} {'workload':>14} {'put ops/s':>10} {'put MB/s':>9} {'get ops/s':>10} {'get MB/s':>9}")
+        for backend_name, backend in backends.items():
+            for workload, (count, size) in WORKLOADS.items():
+                put_seconds, get_seconds = run_workload(backend, count, size)
+                megabytes = count * size / (1024 * 1024)
+                print(f"{backend_name:>8} {workload:>14} {count / put_seconds:>10.1f} {megabytes / put_seconds:>9.1f} "
+                      f"{count / get_seconds:>10.1f} {megabytes / get_seconds:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
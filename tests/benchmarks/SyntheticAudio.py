@@ -0,0 +1,75 @@
+import numpy as np
+import soundfile as sf
+
+
+class SyntheticAudio:
+    """
+    Deterministic synthetic recordings of swara sequences, built from
+    aarohanam/avarohanam strings in the format RagaRepository stores them.
+    Each swara is a decaying tone with a few harmonics, so onsets, chroma and
+    pitch behave like a plucked instrument, and the same seed always gives
+    the same samples.
+    """
+
+    SAMPLE_RATE = 22050
+    # Semitones above the tonic (S) of each swara
+    SWARA_SEMITONES = {
+        'S': 0, 'R1': 1, 'R2': 2, 'G2': 3, 'G3': 4, 'M1': 5, 'M2': 6,
+        'P': 7, 'D1': 8, 'D2': 9, 'N2': 10, 'N3': 11,
+    }
+    RAGAS = {
+        'Mayamalavagowla': ('S R1 G3 M1 P D1 N3 S', 'S N3 D1 P M1 G3 R1 S'),
+        'Shankarabharanam': ('S R2 G3 M1 P D2 N3 S', 'S N3 D2 P M1 G3 R2 S'),
+        'Kalyani': ('S R2 G3 M2 P D2 N3 S', 'S N3 D2 P M2 G3 R2 S'),
+    }
+
+    def __init__(self, tonic=261.63, note_seconds=0.4, harmonics=4, sample_rate=SAMPLE_RATE):
+        self.tonic = tonic
+        self.note_seconds = note_seconds
+        self.harmonics = harmonics
+        self.sample_rate = sample_rate
+
+    def swara_frequencies(self, aarohanam, avarohanam):
+        """Frequencies of one ascent and descent, which turn around at the upper S."""
+        ascent = aarohanam.split()
+        descent = avarohanam.split()
+        octaves = [0] * (len(ascent) - 1) + [1] + [1] + [0] * (len(descent) - 1)
+        semitones = [self.SWARA_SEMITONES[swara] for swara in ascent + descent]
+        return self.tonic * 2 ** (np.array(semitones) / 12 + np.array(octaves))
+
+    def generate(self, seconds, raga='Mayamalavagowla', seed=0, tempo_jitter=0.0, noise=0.0):
+        """
+        Returns a float32 recording of the raga's aarohanam and avarohanam repeated
+        for the given number of seconds. tempo_jitter varies each note length by up
+        to that fraction and noise adds white noise at that amplitude, to mimic a
+        student playing along with the teacher track.
+        """
+        rng = np.random.default_rng(seed)
+        frequencies = self.swara_frequencies(*self.RAGAS[raga])
+        total_samples = int(seconds * self.sample_rate)
+        note_samples = int(self.note_seconds * self.sample_rate)
+        num_notes = total_samples // note_samples + 2
+        lengths = (note_samples * (1 + rng.uniform(-tempo_jitter, tempo_jitter, num_notes))).astype(int)
+        note_frequencies = frequencies[np.arange(num_notes) % len(frequencies)]
+
+        y = np.empty(lengths.sum(), dtype=np.float32)
+        position = 0
+        for length, frequency in zip(lengths, note_frequencies):
+            y[position:position + length] = self.tone(frequency, length)
+            position += length
+        y = y[:total_samples]
+        if noise:
+            y += (noise * rng.standard_normal(len(y))).astype(np.float32)
+        return y / np.max(np.abs(y))
+
+    def tone(self, frequency, length):
+        t = np.arange(length, dtype=np.float32) / self.sample_rate
+        tone = np.zeros(length, dtype=np.float32)
+        for k in range(1, self.harmonics + 1):
+            tone += np.sin(2 * np.pi * frequency * k * t) / k
+        # A short attack avoids clicks, the decay gives onset detection a clear edge
+        envelope = np.minimum(t / 0.005, 1) * np.exp(-4 * t)
+        return tone * envelope
+
+    def write(self, path, y):
+        sf.write(path, y, self.sample_rate)
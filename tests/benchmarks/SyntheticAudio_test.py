@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from components.AudioProcessor import AudioProcessor
+from tests.benchmarks.AudioProcessor_benchmark import compare_with_baseline
+from tests.benchmarks.SyntheticAudio import SyntheticAudio
+
+
+class TestSyntheticAudio:
+
+    def test_same_seed_gives_same_recording(self):
+        synthetic_audio = SyntheticAudio()
+
+        first = synthetic_audio.generate(3, seed=7, tempo_jitter=0.1, noise=0.02)
+        second = synthetic_audio.generate(3, seed=7, tempo_jitter=0.1, noise=0.02)
+
+        assert np.array_equal(first, second)
+        assert len(first) == 3 * SyntheticAudio.SAMPLE_RATE
+        assert first.dtype == np.float32
+
+    def test_swara_frequencies_turn_around_at_upper_sa(self):
+        frequencies = SyntheticAudio(tonic=200).swara_frequencies('S R2 G3 S', 'S G3 R2 S')
+
+        assert frequencies == pytest.approx(
+            [200, 200 * 2 ** (2 / 12), 200 * 2 ** (4 / 12), 400, 400, 200 * 2 ** (4 / 12), 200 * 2 ** (2 / 12), 200])
+
+    def test_chroma_peaks_on_played_swara(self):
+        synthetic_audio = SyntheticAudio(note_seconds=1.0)
+        y = synthetic_audio.generate(1, 'Kalyani')
+
+        chroma, _ = AudioProcessor.extract_features_from_audio(y, SyntheticAudio.SAMPLE_RATE)
+
+        # The first note is S on C4, chroma bin 0
+        assert np.argmax(chroma.mean(axis=1)) == 0
+
+    def test_compare_with_baseline(self):
+        baseline = {'30s': {'compare_audio': 1.0, 'get_notes': 0.01, 'peak_rss_mb': 300}}
+        results = {'30s': {'compare_audio': 1.6, 'get_notes': 0.03, 'peak_rss_mb': 310, 'new_stage': 5}}
+
+        regressions = compare_with_baseline(results, baseline)
+
+        assert regressions == ["30s compare_audio: 1.600 s, baseline 1.000 s"]
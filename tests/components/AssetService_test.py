@@ -0,0 +1,61 @@
+import base64
+from unittest.mock import MagicMock
+
+import pytest
+
+from components.AssetService import AssetService
+
+
+class TestAssetService:
+
+    @pytest.fixture
+    def asset_sync(self, tmp_path):
+        (tmp_path / 'avatars').mkdir()
+        (tmp_path / 'avatars' / 'Krishna.png').write_bytes(b'png')
+        (tmp_path / 'sound effects').mkdir()
+        (tmp_path / 'sound effects' / 'notification.mp3').write_bytes(b'mp3')
+        asset_sync = MagicMock()
+        asset_sync.versions = {'avatars/Krishna.png': 1}
+        asset_sync.get_path.side_effect = lambda name: str(tmp_path / name) if (tmp_path / name).exists() else None
+        asset_sync.get_version.side_effect = lambda name: asset_sync.versions.get(name)
+        return asset_sync
+
+    def test_data_uri_is_encoded_once(self, asset_sync):
+        asset_service = AssetService(asset_sync)
+
+        data_uri = asset_service.get_data_uri('avatars/Krishna.png')
+
+        assert data_uri == f"data:image/png;base64,{base64.b64encode(b'png').decode()}"
+        assert asset_service.get_data_uri('avatars/Krishna.png') is data_uri
+        assert asset_sync.get_path.call_count == 1
+
+    def test_sound_effect_data_uri(self, asset_sync):
+        data_uri = AssetService(asset_sync).get_data_uri('sound effects/notification.mp3')
+
+        assert data_uri.startswith('data:audio/mpeg;base64,')
+
+    def test_new_version_is_read_again(self, asset_sync, tmp_path):
+        asset_service = AssetService(asset_sync)
+        assert asset_service.get_bytes('avatars/Krishna.png') == b'png'
+        (tmp_path / 'avatars' / 'Krishna.png').write_bytes(b'new png')
+        asset_sync.versions['avatars/Krishna.png'] = 2
+
+        assert asset_service.get_bytes('avatars/Krishna.png') == b'new png'
+
+    def test_missing_asset_is_not_cached(self, asset_sync, tmp_path):
+        asset_service = AssetService(asset_sync)
+        assert asset_service.get_data_uri('avatars/Rama.png') is None
+        (tmp_path / 'avatars' / 'Rama.png').write_bytes(b'png')
+
+        assert asset_service.get_bytes('avatars/Rama.png') == b'png'
+
+    def test_least_recently_used_assets_are_evicted(self, asset_sync):
+        asset_service = AssetService(asset_sync, max_bytes=6)
+        asset_service.get_bytes('avatars/Krishna.png')
+        asset_service.get_bytes('sound effects/notification.mp3')
+        asset_service.get_bytes('avatars/Krishna.png')
+
+        asset_service.get_data_uri('avatars/Krishna.png')
+
+        assert list(key[:2] for key in asset_service.entries) == [('data_uri', 'avatars/Krishna.png')]
+        assert asset_service.total_bytes == len(asset_service.get_data_uri('avatars/Krishna.png'))
@@ -0,0 +1,104 @@
+import json
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from components.AssetSync import AssetSync
+
+
+def make_blob(name, generation):
+    blob = MagicMock(generation=generation, md5_hash=f"md5-{generation}")
+    blob.name = name
+    return blob
+
+
+class TestAssetSync:
+
+    @pytest.fixture
+    def remote(self):
+        return {
+            'logo/': [],
+            'badges/': [make_blob('badges/', 1), make_blob('badges/First Note.png', 1)],
+            'avatars/': [make_blob('avatars/Krishna.png', 3)],
+            'sound effects/': [make_blob('sound effects/award - 1.mp3', 5)],
+        }
+
+    @pytest.fixture
+    def storage_repo(self, remote):
+        storage_repo = MagicMock()
+        storage_repo.list_blobs.side_effect = lambda prefix: remote[prefix]
+
+        def download(blob_name, filename, generation=None):
+            with open(filename, 'w') as f:
+                f.write(f"{blob_name}@{generation}")
+
+        storage_repo.download_blob_to_file.side_effect = download
+        return storage_repo
+
+    def downloaded(self, storage_repo):
+        return sorted(call.args[0] for call in storage_repo.download_blob_to_file.call_args_list)
+
+    def test_first_sync_downloads_every_asset(self, storage_repo, tmp_path):
+        asset_sync = AssetSync(storage_repo, str(tmp_path))
+        asset_sync.sync()
+
+        assert self.downloaded(storage_repo) == [
+            'avatars/Krishna.png', 'badges/First Note.png', 'sound effects/award - 1.mp3']
+        path = asset_sync.get_path('badges/First Note.png')
+        assert path == os.path.join(str(tmp_path), 'badges/First Note.png')
+        with open(path) as f:
+            assert f.read() == 'badges/First Note.png@1'
+        with open(tmp_path / AssetSync.MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        assert manifest['version'] == AssetSync.MANIFEST_VERSION
+        assert manifest['assets']['avatars/Krishna.png'] == {'generation': 3, 'md5': 'md5-3'}
+
+    def test_sync_runs_once_per_process(self, storage_repo, tmp_path):
+        asset_sync = AssetSync(storage_repo, str(tmp_path))
+        asset_sync.sync()
+        asset_sync.sync()
+
+        assert storage_repo.list_blobs.call_count == len(AssetSync.PREFIXES)
+
+    def test_only_changed_assets_are_downloaded(self, storage_repo, remote, tmp_path):
+        AssetSync(storage_repo, str(tmp_path)).sync()
+        storage_repo.download_blob_to_file.reset_mock()
+        remote['avatars/'] = [make_blob('avatars/Krishna.png', 4)]
+        os.remove(tmp_path / 'sound effects' / 'award - 1.mp3')
+
+        AssetSync(storage_repo, str(tmp_path)).sync()
+
+        assert self.downloaded(storage_repo) == ['avatars/Krishna.png', 'sound effects/award - 1.mp3']
+
+    def test_failed_download_is_retried_on_the_next_sync(self, storage_repo, tmp_path):
+        download = storage_repo.download_blob_to_file.side_effect
+
+        def fail_avatars(blob_name, filename, generation=None):
+            if blob_name.startswith('avatars/'):
+                raise ConnectionError(blob_name)
+            download(blob_name, filename, generation)
+
+        storage_repo.download_blob_to_file.side_effect = fail_avatars
+        AssetSync(storage_repo, str(tmp_path)).sync()
+        storage_repo.download_blob_to_file.side_effect = download
+        storage_repo.download_blob_to_file.reset_mock()
+
+        AssetSync(storage_repo, str(tmp_path)).sync()
+
+        assert self.downloaded(storage_repo) == ['avatars/Krishna.png']
+
+    def test_asset_missing_from_the_sync_is_downloaded_on_first_use(self, storage_repo, tmp_path):
+        asset_sync = AssetSync(storage_repo, str(tmp_path))
+        asset_sync.sync()
+
+        path = asset_sync.get_path('avatars/Rama.png')
+
+        assert path == os.path.join(str(tmp_path), 'avatars/Rama.png')
+        assert asset_sync.get_path('avatars/Rama.png') == path
+        assert self.downloaded(storage_repo).count('avatars/Rama.png') == 1
+
+    def test_failed_download_on_first_use_returns_none(self, storage_repo, tmp_path):
+        storage_repo.download_blob_to_file.side_effect = ConnectionError('offline')
+
+        assert AssetSync(storage_repo, str(tmp_path)).get_path('badges/Unknown.png') is None
@@ -0,0 +1,64 @@
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+from unittest.mock import patch
+
+from components.AudioAnalysis import AudioAnalysis
+from components.AudioProcessor import AudioProcessor
+from enums.AnalysisProfile import AnalysisProfile
+from tests.benchmarks.SyntheticAudio import SyntheticAudio
+
+
+def encode(y, sr, audio_format):
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sr, format=audio_format)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope='module')
+def audio():
+    return SyntheticAudio().generate(3), SyntheticAudio.SAMPLE_RATE
+
+
+class TestAudioAnalysis:
+
+    def test_recording_is_decoded_once(self, audio):
+        analysis = AudioAnalysis.from_bytes(encode(*audio, 'WAV'), suffix='.wav')
+
+        with patch.object(AudioProcessor, 'load_and_normalize_pcm',
+                          wraps=AudioProcessor.load_and_normalize_pcm) as decode:
+            chroma, mfcc = analysis.chroma, analysis.mfcc
+            notes = analysis.notes
+            duration = analysis.duration
+
+        decode.assert_called_once()
+        assert chroma is analysis.features[0] and mfcc is analysis.features[1]
+        assert notes is analysis.notes
+        assert duration == pytest.approx(3, abs=0.05)
+
+    def test_duration_is_read_from_the_header(self, audio):
+        analysis = AudioAnalysis.from_bytes(encode(*audio, 'MP3'), suffix='.mp3')
+
+        with patch.object(AudioProcessor, 'load_and_normalize_audio') as decode:
+            assert analysis.duration == pytest.approx(3, abs=0.1)
+
+        decode.assert_not_called()
+
+    def test_duration_falls_back_to_decoding(self):
+        analysis = AudioAnalysis.from_bytes(b'not audio', suffix='.m4a')
+        y = np.zeros(22050, dtype=np.float32)
+
+        with patch.object(AudioProcessor, 'load_and_normalize_audio', return_value=(y, 22050)) as decode:
+            assert analysis.duration == pytest.approx(1)
+            assert analysis.duration == pytest.approx(1)
+
+        decode.assert_called_once()
+
+    def test_decoding_follows_the_profile(self, audio):
+        analysis = AudioAnalysis.from_bytes(encode(*audio, 'FLAC'), suffix='.flac', profile=AnalysisProfile.FAST)
+
+        _, sr = analysis.audio
+
+        assert sr == AnalysisProfile.FAST.sample_rate
@@ -0,0 +1,77 @@
+import io
+import struct
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from components.AudioDurationProbe import AudioDurationProbe
+
+
+def box(box_type, payload):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def mvhd(time_scale, duration, version=0):
+    if version == 1:
+        return box(b'mvhd', struct.pack('>B3xQQIQ', 1, 0, 0, time_scale, duration) + bytes(80))
+    return box(b'mvhd', struct.pack('>B3xIIII', 0, 0, 0, time_scale, duration) + bytes(80))
+
+
+def mdhd(time_scale, duration):
+    return box(b'mdhd', struct.pack('>B3xIIII', 0, 0, 0, time_scale, duration) + bytes(4))
+
+
+def mp4(*moov_children, moov_first=False):
+    ftyp = box(b'ftyp', b'M4A \x00\x00\x02\x00isomM4A ')
+    moov = box(b'moov', b''.join(moov_children))
+    mdat = box(b'mdat', bytes(1000))
+    return ftyp + (moov + mdat if moov_first else mdat + moov)
+
+
+def mp3(seconds, sample_rate):
+    y = 0.5 * np.sin(np.arange(int(seconds * sample_rate)) * 0.05).astype(np.float32)
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sample_rate, format='MP3')
+    return buffer.getvalue()
+
+
+class TestAudioDurationProbe:
+
+    @pytest.mark.parametrize("moov_first", [True, False])
+    def test_mp4_movie_header(self, moov_first):
+        data = mp4(mvhd(44100, 44100 * 12), moov_first=moov_first)
+
+        assert AudioDurationProbe.probe(data) == pytest.approx(12)
+
+    def test_mp4_movie_header_version_1(self):
+        assert AudioDurationProbe.probe(mp4(mvhd(1000, 93500, version=1))) == pytest.approx(93.5)
+
+    def test_mp4_falls_back_to_media_header(self):
+        trak = box(b'trak', box(b'tkhd', bytes(84)) + box(b'mdia', mdhd(48000, 48000 * 7)))
+
+        assert AudioDurationProbe.probe(mp4(mvhd(1000, 0), trak)) == pytest.approx(7)
+
+    def test_mp4_without_moov(self):
+        assert AudioDurationProbe.probe(box(b'ftyp', b'M4A ') + box(b'mdat', bytes(100))) is None
+
+    @pytest.mark.parametrize("sample_rate", [44100, 22050])
+    def test_mp3(self, sample_rate):
+        # The encoder pads the last frame, so allow a couple of frames of slack
+        assert AudioDurationProbe.probe(mp3(3, sample_rate)) == pytest.approx(3, abs=0.1)
+
+    def test_mp3_with_id3_tag(self):
+        tag = b'ID3\x04\x00\x00' + bytes([0, 0, 1, 0]) + bytes(128)
+
+        assert AudioDurationProbe.probe(tag + mp3(2, 44100)) == pytest.approx(2, abs=0.1)
+
+    def test_mp3_xing_frame_count(self):
+        # MPEG 1 layer III, 128 kbps, 44.1 kHz, stereo, with a Xing header saying 1000 frames
+        header = b'\xff\xfb\x90\x00'
+        frame = header + bytes(32) + b'Xing' + struct.pack('>II', 1, 1000)
+        frame += bytes(417 - len(frame))
+
+        assert AudioDurationProbe.probe(frame + header + bytes(413)) == pytest.approx(1000 * 1152 / 44100)
+
+    def test_unknown_data(self):
+        assert AudioDurationProbe.probe(bytes(range(256)) * 10) is None
@@ -0,0 +1,47 @@
+import librosa
+import numpy as np
+from scipy.stats import zscore
+
+from components.AudioProcessor import AudioProcessor
+from enums.AnalysisProfile import AnalysisProfile
+from tests.benchmarks.Notes_benchmark import SAMPLE_RATE, per_onset_fft_notes, synthetic_recording
+
+
+class TestAudioProcessor:
+
+    def test_freqs_to_notes_matches_freq_to_note(self):
+        freqs = np.array([0.004, 0.0123, 0.02, 110.0, 261.63, 440.0, 880.0])
+
+        notes = AudioProcessor.freqs_to_notes(freqs)
+
+        assert notes == [AudioProcessor.freq_to_note(freq) for freq in freqs]
+
+    def test_get_notes_from_audio_matches_per_onset_fft(self):
+        y = synthetic_recording(60, np.random.default_rng(3))
+
+        notes = AudioProcessor.get_notes_from_audio(y, SAMPLE_RATE)
+        previous_notes = per_onset_fft_notes(y, SAMPLE_RATE)
+
+        assert len(notes) == len(previous_notes)
+        assert np.mean([a == b for a, b in zip(notes, previous_notes)]) > 0.95
+
+    def test_get_notes_from_silence(self):
+        assert AudioProcessor.get_notes_from_audio(np.zeros(SAMPLE_RATE, dtype=np.float32), SAMPLE_RATE) == []
+
+    def test_standard_profile_uses_librosa_defaults(self):
+        y = synthetic_recording(10, np.random.default_rng(4))
+
+        chroma, mfcc = AudioProcessor.extract_features_from_audio(y, SAMPLE_RATE, AnalysisProfile.STANDARD)
+
+        assert np.allclose(chroma, librosa.feature.chroma_stft(y=y, sr=SAMPLE_RATE))
+        assert np.allclose(mfcc, zscore(librosa.feature.mfcc(y=y, sr=SAMPLE_RATE)))
+
+    def test_fast_profile_has_fewer_frames(self):
+        y = synthetic_recording(10, np.random.default_rng(5))
+        y_fast = librosa.resample(y, orig_sr=SAMPLE_RATE, target_sr=AnalysisProfile.FAST.sample_rate)
+
+        standard_chroma, _ = AudioProcessor.extract_features_from_audio(y, SAMPLE_RATE)
+        fast_chroma, _ = AudioProcessor.extract_features_from_audio(
+            y_fast, AnalysisProfile.FAST.sample_rate, AnalysisProfile.FAST)
+
+        assert fast_chroma.shape[1] == int(np.ceil(standard_chroma.shape[1] / 4))
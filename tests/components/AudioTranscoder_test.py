@@ -0,0 +1,70 @@
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from components.AudioAnalysis import AudioAnalysis
+from components.AudioTranscoder import AudioTranscoder
+from enums.AnalysisProfile import AnalysisProfile
+from tests.benchmarks.SyntheticAudio import SyntheticAudio
+
+
+@pytest.fixture(scope='module')
+def audio():
+    return SyntheticAudio().generate(5), SyntheticAudio.SAMPLE_RATE
+
+
+class TestAudioTranscoder:
+
+    def test_playback_is_mono_opus(self, audio):
+        playback_data, _ = AudioTranscoder.transcode(*audio)
+
+        info = sf.info(io.BytesIO(playback_data))
+        assert (info.format, info.subtype) == ('OGG', 'OPUS')
+        assert info.channels == 1
+        assert info.duration == pytest.approx(5, abs=0.1)
+
+    def test_analysis_proxy_is_16_bit_mono_flac(self, audio):
+        _, analysis_data = AudioTranscoder.transcode(*audio)
+
+        info = sf.info(io.BytesIO(analysis_data))
+        assert (info.format, info.subtype) == ('FLAC', 'PCM_16')
+        assert info.channels == 1
+        assert info.samplerate == AudioTranscoder.ANALYSIS_SAMPLE_RATE
+
+    def test_analysis_proxy_decodes_like_the_original(self, audio):
+        y, sr = audio
+        _, analysis_data = AudioTranscoder.transcode(y, sr)
+
+        decoded, decoded_sr = AudioAnalysis.from_bytes(analysis_data, '.flac').audio
+
+        assert decoded_sr == sr
+        assert len(decoded) == len(y)
+        # 16-bit quantization is the only loss
+        assert np.max(np.abs(decoded - y / np.max(np.abs(y)))) < 1e-3
+
+    def test_analysis_proxy_is_resampled_for_lower_rate_profiles(self, audio):
+        _, analysis_data = AudioTranscoder.transcode(*audio)
+
+        decoded, decoded_sr = AudioAnalysis.from_bytes(analysis_data, '.flac', AnalysisProfile.FAST).audio
+
+        assert decoded_sr == AnalysisProfile.FAST.sample_rate
+        assert len(decoded) == pytest.approx(5 * AnalysisProfile.FAST.sample_rate, abs=1)
+
+    def test_rejects_audio_below_the_analysis_sample_rate(self, audio):
+        with pytest.raises(ValueError):
+            AudioTranscoder.transcode(audio[0][::2], audio[1] // 2)
+
+    def test_derivative_names_sit_next_to_the_original(self):
+        assert AudioTranscoder.get_derivative_names('recordings/1-2-20240101.m4a') == (
+            'recordings/1-2-20240101.playback.opus', 'recordings/1-2-20240101.analysis.flac')
+
+    @pytest.mark.parametrize("blob_name, mime_type", [
+        ('recordings/1-2-20240101.playback.opus', 'audio/ogg'),
+        ('recordings/1-2-20240101.m4a', 'audio/mp4'),
+        ('recordings/1-2-20240101.MP3', 'audio/mpeg'),
+        ('recordings/1-2-20240101', 'audio/mp4'),
+    ])
+    def test_mime_type_follows_the_suffix(self, blob_name, mime_type):
+        assert AudioTranscoder.get_mime_type(blob_name) == mime_type
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from fastdtw import fastdtw
+from scipy.spatial.distance import cosine, euclidean
+
+from components.BandedDTW import BandedDTW
+
+
+def full_dtw(x, y, dist):
+    n, m = len(x), len(y)
+    accumulated = np.full((n + 1, m + 1), np.inf)
+    accumulated[0, 0] = 0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            accumulated[i, j] = dist(x[i - 1], y[j - 1]) + min(
+                accumulated[i - 1, j], accumulated[i, j - 1], accumulated[i - 1, j - 1])
+    return accumulated[n, m]
+
+
+class TestBandedDTW:
+
+    @pytest.mark.parametrize("n, m", [(1, 1), (1, 6), (6, 1), (30, 45), (45, 30), (40, 40)])
+    @pytest.mark.parametrize("metric, dist", [('euclidean', euclidean), ('cosine', cosine)])
+    def test_full_band_matches_exact_dtw(self, n, m, metric, dist):
+        rng = np.random.default_rng(n * 100 + m)
+        x = rng.random((n, 12))
+        y = rng.random((m, 12))
+
+        distance = BandedDTW(band_ratio=1.0, metric=metric).distance(x, y)
+
+        assert distance == pytest.approx(full_dtw(x, y, dist), rel=1e-5)
+
+    def test_agrees_with_fastdtw_on_warped_sequences(self):
+        rng = np.random.default_rng(0)
+        x = rng.random((600, 12))
+        indices = np.clip((np.arange(660) / 1.1).astype(int), 0, 599)
+        y = x[indices] + 0.05 * rng.random((660, 12))
+
+        fast_distance, _ = fastdtw(x, y, dist=euclidean)
+
+        assert BandedDTW().distance(x, y) == pytest.approx(fast_distance, rel=1e-3)
+
+    def test_identical_sequences_have_zero_distance(self):
+        x = np.random.default_rng(1).random((200, 12))
+
+        assert BandedDTW().distance(x, x) == pytest.approx(0, abs=1e-3)
+
+    def test_early_abandoning(self):
+        rng = np.random.default_rng(2)
+        x = rng.random((300, 12))
+        y = rng.random((300, 12))
+        distance = BandedDTW().distance(x, y)
+
+        assert BandedDTW().distance(x, y, max_distance=distance / 2) == float('inf')
+        assert BandedDTW().distance(x, y, max_distance=distance * 2) == pytest.approx(distance)
+
+    def test_band_covers_both_ends(self):
+        lows, highs = BandedDTW(min_band=2).get_band(100, 250)
+
+        assert lows[0] == 0
+        assert highs[-1] == 250
+        assert np.all(np.diff(lows) >= 0)
+        assert np.all(np.diff(highs) >= 0)
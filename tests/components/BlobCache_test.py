@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from components.BlobCache import BlobCache
+
+
+class TestBlobCache:
+
+    @pytest.fixture
+    def blob_cache(self, tmp_path):
+        return BlobCache(str(tmp_path / 'cache'), max_bytes=10)
+
+    def test_get_returns_what_was_put(self, blob_cache):
+        key = BlobCache.get_key('1/2/tracks/track.m4a', 1)
+        blob_cache.put(key, b'abc')
+
+        assert blob_cache.get(key) == b'abc'
+        assert blob_cache.get(BlobCache.get_key('1/2/tracks/track.m4a', 2)) is None
+        assert blob_cache.get_stats()['hits'] == 1
+        assert blob_cache.get_stats()['misses'] == 1
+
+    def test_least_recently_used_entry_is_evicted(self, blob_cache):
+        blob_cache.put('a', b'1234')
+        blob_cache.put('b', b'1234')
+        blob_cache.get('a')
+        blob_cache.put('c', b'1234')
+
+        assert blob_cache.get('b') is None
+        assert blob_cache.get('a') == b'1234'
+        assert blob_cache.get('c') == b'1234'
+        assert not os.path.exists(blob_cache.get_path('b'))
+        assert blob_cache.get_stats()['evictions'] == 1
+        assert blob_cache.get_stats()['bytes'] == 8
+
+    def test_blob_larger_than_the_cache_is_not_stored(self, blob_cache):
+        blob_cache.put('a', b'x' * 11)
+
+        assert blob_cache.get('a') is None
+        assert blob_cache.get_stats()['entries'] == 0
+
+    def test_index_is_rebuilt_from_the_directory(self, blob_cache):
+        blob_cache.put('a', b'1234')
+        with open(blob_cache.get_path('b') + '.1.1.tmp', 'wb') as f:
+            f.write(b'partial')
+
+        reopened = BlobCache(blob_cache.directory, max_bytes=10)
+
+        assert reopened.get('a') == b'1234'
+        assert reopened.get_stats()['entries'] == 1
+
+    def test_entry_removed_by_another_process_is_a_miss(self, blob_cache):
+        blob_cache.put('a', b'1234')
+        os.remove(blob_cache.get_path('a'))
+
+        assert blob_cache.get('a') is None
+        assert blob_cache.get_stats()['bytes'] == 0
+
+    def test_entry_written_by_another_process_is_a_hit(self, blob_cache):
+        other = BlobCache(blob_cache.directory, max_bytes=10)
+        other.put('a', b'1234')
+
+        assert blob_cache.get('a') == b'1234'
+        assert blob_cache.get_stats()['hits'] == 1
+
+    def test_limit_applies_to_the_whole_shared_directory(self, blob_cache):
+        other = BlobCache(blob_cache.directory, max_bytes=10)
+        blob_cache.put('a', b'1234')
+        other.put('b', b'1234')
+        blob_cache.put('c', b'1234')
+
+        assert not os.path.exists(blob_cache.get_path('a'))
+        assert other.get('b') == b'1234'
+        assert other.get('c') == b'1234'
+        assert blob_cache.get_stats()['bytes'] == 8
+
+    def test_stale_temporary_files_are_removed(self, blob_cache):
+        blob_cache.put('a', b'1234')
+        temp_path = blob_cache.get_path('b') + '.1.1.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(b'partial')
+        os.utime(temp_path, (0, 0))
+
+        blob_cache.put('c', b'1234')
+
+        assert not os.path.exists(temp_path)
+
+    def test_get_instance_is_shared_per_directory(self, tmp_path):
+        directory = str(tmp_path / 'shared')
+
+        assert BlobCache.get_instance(directory, 10) is BlobCache.get_instance(directory, 10)
+
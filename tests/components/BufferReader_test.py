@@ -0,0 +1,42 @@
+import io
+
+import numpy as np
+import pytest
+
+from components.BufferReader import BufferReader
+
+
+class TestBufferReader:
+
+    def test_reads_in_chunks(self):
+        reader = BufferReader(memoryview(b'0123456789'))
+
+        assert reader.read(4) == b'0123'
+        assert reader.read(4) == b'4567'
+        assert reader.read() == b'89'
+        assert reader.read(4) == b''
+
+    def test_seek_and_tell(self):
+        reader = BufferReader(b'0123456789')
+
+        assert reader.seek(-3, io.SEEK_END) == 7
+        assert reader.read() == b'789'
+        reader.seek(2)
+        reader.seek(1, io.SEEK_CUR)
+        assert reader.tell() == 3
+        assert reader.read(2) == b'34'
+        with pytest.raises(ValueError):
+            reader.seek(-1)
+
+    def test_wraps_without_copying(self):
+        data = bytearray(b'abc')
+        reader = BufferReader(data)
+        data[0] = ord('x')
+
+        assert reader.read() == b'xbc'
+        assert len(reader) == 3
+
+    def test_multi_byte_buffers_are_read_as_bytes(self):
+        samples = np.arange(4, dtype=np.int16)
+
+        assert BufferReader(samples).read() == samples.tobytes()
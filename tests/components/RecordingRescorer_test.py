@@ -0,0 +1,84 @@
+import json
+import queue
+from collections import deque
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from components.RecordingRescorer import RecordingRescorer
+from enums.AnalysisProfile import AnalysisProfile
+
+FILTERS = {'track_id': 3, 'org_id': None, 'group_id': None, 'from_date': '2024-01-01', 'to_date': None}
+
+
+class TestRecordingRescorer:
+
+    @pytest.fixture
+    def rescorer(self, tmp_path):
+        with patch('components.RecordingRescorer.StorageRepository'):
+            rescorer = RecordingRescorer(MagicMock(), MagicMock(), FILTERS,
+                                         str(tmp_path / 'checkpoint.json'), max_workers=2)
+        rescorer.recording_repo = MagicMock()
+        rescorer.reader_recording_repo = MagicMock()
+        rescorer.settings_repo = MagicMock()
+        return rescorer
+
+    def test_checkpoint_only_passes_finished_prefix(self, rescorer):
+        checkpoint = rescorer.load_checkpoint()
+        in_order = deque([1, 2, 3])
+        finished = {1: True, 3: True}
+        batch = [(1, 10.0, 8, ''), (3, 20.0, 6, '')]
+
+        rescorer.flush(batch, checkpoint, in_order, finished)
+
+        rescorer.recording_repo.update_scores_and_analyses.assert_called_once()
+        assert checkpoint['last_id'] == 1
+        assert checkpoint['scored'] == 2
+        assert list(in_order) == [2, 3]
+        assert batch == []
+
+    def test_resumes_from_checkpoint_with_same_filters(self, rescorer):
+        checkpoint = rescorer.load_checkpoint()
+        checkpoint['last_id'] = 42
+        rescorer.save_checkpoint(checkpoint)
+
+        assert rescorer.load_checkpoint()['last_id'] == 42
+
+    def test_ignores_checkpoint_of_other_filters(self, rescorer):
+        with open(rescorer.checkpoint_path, 'w') as f:
+            json.dump({'filters': {**FILTERS, 'track_id': 4}, 'last_id': 42, 'scored': 1, 'failed': []}, f)
+
+        assert rescorer.load_checkpoint()['last_id'] == 0
+
+    def test_prefetch_pages_through_recordings(self, rescorer):
+        rescorer.reader_recording_repo.get_recordings_for_rescoring.side_effect = [
+            [{'id': 1, 'blob_name': 'a.m4a', 'org_id': 1}, {'id': 2, 'blob_name': 'b.m4a', 'org_id': 1}],
+            [{'id': 5, 'blob_name': 'c.m4a', 'org_id': 2}],
+            []
+        ]
+        rescorer.storage_repo.download_blob_by_name.side_effect = [b'a', Exception("Not found"), b'c']
+        rescorer.settings_repo.get_setting.side_effect = ['Fast', None]
+        prefetch_queue = queue.Queue(maxsize=10)
+
+        rescorer.prefetch(0, prefetch_queue)
+
+        items = [prefetch_queue.get() for _ in range(4)]
+        assert [(item[0]['id'], item[1], item[2]) for item in items[:3]] == [
+            (1, b'a', AnalysisProfile.FAST), (2, None, AnalysisProfile.FAST), (5, b'c', AnalysisProfile.STANDARD)]
+        assert items[3] is None
+        after_ids = [c[0][0] for c in rescorer.reader_recording_repo.get_recordings_for_rescoring.call_args_list]
+        assert after_ids == [0, 2, 5]
+
+    def test_prefetch_prefers_the_analysis_proxy(self, rescorer):
+        rescorer.reader_recording_repo.get_recordings_for_rescoring.side_effect = [
+            [{'id': 1, 'blob_name': 'a.m4a', 'analysis_blob_name': 'a.analysis.flac', 'org_id': 1},
+             {'id': 2, 'blob_name': 'b.m4a', 'analysis_blob_name': None, 'org_id': 1}],
+            []
+        ]
+        rescorer.storage_repo.download_blob_by_name.return_value = b'data'
+        rescorer.profile = AnalysisProfile.STANDARD
+
+        rescorer.prefetch(0, queue.Queue(maxsize=10))
+
+        downloaded = [c[0][0] for c in rescorer.storage_repo.download_blob_by_name.call_args_list]
+        assert downloaded == ['a.analysis.flac', 'b.m4a']
@@ -0,0 +1,75 @@
+import time
+from unittest.mock import MagicMock, patch
+
+from components.RecordingUploader import RecordingUploader
+from enums.ScoringStatus import ScoringStatus
+
+
+class TestRecordingUploader:
+
+    def test_pending_recordings_have_no_finished_score(self):
+        recording_repo = MagicMock()
+        recording_repo.get_score_and_status.return_value = {'score': None,
+                                                            'scoring_status': ScoringStatus.PROCESSING.value}
+
+        assert RecordingUploader.get_finished_score(recording_repo, 7) is None
+
+    def test_scored_recording_is_displayed(self):
+        display_score = MagicMock()
+        state = {'deadline': time.time() + 60,
+                 'result': {'score': 84, 'scoring_status': ScoringStatus.COMPLETED.value}}
+
+        with patch('components.RecordingUploader.st') as st:
+            RecordingUploader.display_scoring_state(state, display_score)
+
+        display_score.assert_called_once_with(84)
+        st.info.assert_not_called()
+
+    def test_pending_recording_after_the_deadline(self):
+        display_score = MagicMock()
+        state = {'deadline': time.time() - 1, 'result': None}
+
+        with patch('components.RecordingUploader.st') as st:
+            RecordingUploader.display_scoring_state(state, display_score)
+
+        display_score.assert_not_called()
+        assert "still being scored" in st.info.call_args[0][0]
+
+    @staticmethod
+    def patch_streamlit(session_state):
+        st = patch('components.RecordingUploader.st').start()
+        st.session_state = session_state
+        st.fragment.side_effect = lambda run_every: (lambda poll: poll)
+        return st
+
+    def test_new_upload_is_polled_until_it_is_scored(self):
+        uploader = RecordingUploader(*[MagicMock()] * 8)
+        session_state = {}
+        with patch.object(RecordingUploader, 'get_finished_score', return_value=None), \
+                patch('components.RecordingUploader.ConnectionPool'):
+            st = self.patch_streamlit(session_state)
+            try:
+                uploader.show_score('track_3', 7, MagicMock())
+            finally:
+                patch.stopall()
+
+        st.fragment.assert_called_once_with(run_every=2)
+        st.rerun.assert_not_called()
+        assert session_state['scoring_track_3']['recording_id'] == 7
+
+    def test_score_stops_the_polling_and_is_shown_once(self):
+        uploader = RecordingUploader(*[MagicMock()] * 8)
+        display_score = MagicMock()
+        session_state = {'scoring_track_3': {'recording_id': 7, 'deadline': time.time() + 60,
+                                             'result': {'score': 84,
+                                                        'scoring_status': ScoringStatus.COMPLETED.value}}}
+        st = self.patch_streamlit(session_state)
+        try:
+            uploader.show_score('track_3', None, display_score)
+            uploader.show_score('track_3', None, display_score)
+        finally:
+            patch.stopall()
+
+        st.fragment.assert_not_called()
+        display_score.assert_called_once_with(84)
+        assert session_state == {}
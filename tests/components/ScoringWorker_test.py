@@ -0,0 +1,69 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+
+from components.ScoringWorker import ScoringWorker
+
+
+class BrokenExecutor:
+    """Stands in for a process pool whose process died, every job it was given fails."""
+    instances = 0
+
+    def __init__(self, *args, **kwargs):
+        BrokenExecutor.instances += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def submit(self, fn, job):
+        future = Future()
+        future.set_exception(BrokenProcessPool("A process in the pool was terminated abruptly"))
+        return future
+
+
+class TestScoringWorker:
+
+    def test_broken_pool_fails_its_jobs_and_is_replaced(self):
+        worker = ScoringWorker(max_workers=2, poll_interval=0)
+        worker.database_manager = MagicMock()
+        worker.scoring_job_repo = MagicMock()
+        jobs = [{'id': 1, 'recording_id': 10, 'attempts': 0}, {'id': 2, 'recording_id': 11, 'attempts': 2}]
+        worker.scoring_job_repo.claim_jobs.side_effect = [jobs, []]
+        BrokenExecutor.instances = 0
+
+        with patch('components.ScoringWorker.ProcessPoolExecutor', BrokenExecutor):
+            worker._run_pool()
+
+        assert BrokenExecutor.instances == 1
+        failed = [c[0][0]['id'] for c in worker.scoring_job_repo.fail_job.call_args_list]
+        assert sorted(failed) == [1, 2]
+        worker.scoring_job_repo.complete_job.assert_not_called()
+
+    def test_requeue_passes_the_attempt_cap(self):
+        worker = ScoringWorker(max_workers=1, poll_interval=0, max_attempts=4)
+        worker.database_manager = MagicMock()
+        worker.scoring_job_repo = MagicMock()
+        worker.scoring_job_repo.claim_jobs.side_effect = lambda limit: worker.stop() or []
+
+        with patch('components.ScoringWorker.ProcessPoolExecutor', BrokenExecutor):
+            worker._run_pool()
+
+        worker.scoring_job_repo.requeue_stale_jobs.assert_called_once_with(15, 4)
+
+    def test_not_started_in_app_processes_next_to_a_dedicated_worker(self, monkeypatch):
+        monkeypatch.setenv('SCORING_WORKER_IN_PROCESS', '0')
+
+        assert ScoringWorker.ensure_started() is None
+
+    def test_started_in_the_app_process_by_default(self, monkeypatch):
+        monkeypatch.delenv('SCORING_WORKER_IN_PROCESS', raising=False)
+        monkeypatch.setattr(ScoringWorker, '_instance', None)
+
+        with patch('components.ScoringWorker.threading.Thread') as thread:
+            worker = ScoringWorker.ensure_started()
+
+        assert worker is not None
+        thread.return_value.start.assert_called_once()
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from components.TrackFeatureStore import TrackFeatureStore
+from enums.AnalysisProfile import AnalysisProfile
+
+
+class TestTrackFeatureStore:
+
+    @pytest.fixture
+    def track(self):
+        return {
+            'id': 7,
+            'track_hash': 'abc123',
+            'track_path': 'https://storage.googleapis.com/melodymaster/1/2/tracks/track.m4a',
+            'track_ref_path': 'https://storage.googleapis.com/melodymaster/1/2/tracks/ref.m4a',
+            'offset': 120
+        }
+
+    @pytest.fixture
+    def storage_repo(self):
+        mock_storage_repo = MagicMock()
+        mock_storage_repo.get_blob_name.return_value = '1/2/tracks/track.m4a'
+        return mock_storage_repo
+
+    @pytest.fixture
+    def feature_store(self, track, storage_repo, tmp_path):
+        track_repo = MagicMock()
+        track_repo.get_track_by_id.return_value = track
+        return TrackFeatureStore(track_repo, storage_repo, str(tmp_path))
+
+    def test_serialize_round_trip(self):
+        chroma = np.random.rand(12, 40).astype(np.float32)
+        mfcc = np.random.rand(20, 40)
+
+        loaded_chroma, loaded_mfcc, offset = TrackFeatureStore.deserialize(
+            TrackFeatureStore.serialize(chroma, mfcc, 42.5))
+
+        assert np.array_equal(loaded_chroma, chroma)
+        assert np.array_equal(loaded_mfcc, mfcc)
+        assert offset == 42.5
+
+    def test_features_blob_is_stored_next_to_track(self, feature_store):
+        blob_name = feature_store.get_features_blob_name('url', 'abc123')
+
+        assert blob_name == '1/2/tracks/features/abc123.npz'
+        assert feature_store.get_features_blob_name('url', 'abc123', AnalysisProfile.FAST) == \
+            '1/2/tracks/features/abc123-fast.npz'
+
+    def test_load_prefers_local_copy(self, feature_store, storage_repo, track):
+        chroma = np.ones((12, 5))
+        mfcc = np.zeros((20, 5))
+        feature_store.save(track['track_hash'], track['track_path'], chroma, mfcc)
+        storage_repo.reset_mock()
+
+        loaded_chroma, _ = feature_store.load(track['id'])
+
+        assert np.array_equal(loaded_chroma, chroma)
+        storage_repo.download_blob_by_name.assert_not_called()
+
+    def test_load_downloads_and_caches_remote_features(self, feature_store, storage_repo, track):
+        chroma = np.ones((12, 5))
+        mfcc = np.zeros((20, 5))
+        storage_repo.download_blob_by_name.return_value = TrackFeatureStore.serialize(chroma, mfcc)
+
+        feature_store.load(track['id'])
+        feature_store.load(track['id'])
+
+        storage_repo.download_blob_by_name.assert_called_once_with('1/2/tracks/features/abc123.npz')
+
+    def test_load_computes_missing_features(self, feature_store, storage_repo, track):
+        chroma = np.ones((12, 5))
+        mfcc = np.zeros((20, 5))
+        storage_repo.download_blob_by_name.side_effect = Exception("Not found")
+
+        with patch.object(TrackFeatureStore, 'compute', return_value=(chroma, mfcc)) as mock_compute:
+            loaded_chroma, _ = feature_store.load(track['id'])
+
+        mock_compute.assert_called_once_with(track['track_path'], AnalysisProfile.STANDARD)
+        storage_repo.upload_blob.assert_called_once()
+        assert np.array_equal(loaded_chroma, chroma)
+
+    def test_standard_offset_comes_from_track(self, feature_store, storage_repo, track):
+        assert feature_store.get_offset(track) == 120
+        storage_repo.download_blob_by_name.assert_not_called()
+
+    def test_other_profiles_calibrate_offset_against_reference_track(self, feature_store, storage_repo, track):
+        chroma = np.random.default_rng(0).random((12, 50))
+        ref_chroma = np.random.default_rng(1).random((12, 50))
+        storage_repo.download_blob_by_name.side_effect = Exception("Not found")
+
+        with patch.object(TrackFeatureStore, 'compute',
+                          side_effect=[(chroma, chroma), (ref_chroma, ref_chroma)]) as mock_compute:
+            offset = feature_store.get_offset(track, AnalysisProfile.FAST)
+            # The calibration is persisted with the features
+            assert feature_store.get_offset(track, AnalysisProfile.FAST) == pytest.approx(offset)
+
+        assert mock_compute.call_count == 2
+        mock_compute.assert_called_with(track['track_ref_path'], AnalysisProfile.FAST)
+        assert offset > 0
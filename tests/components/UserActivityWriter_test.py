@@ -0,0 +1,131 @@
+import json
+import threading
+from unittest.mock import MagicMock
+
+import pymysql
+import pytest
+
+from components.UserActivityWriter import UserActivityWriter
+
+
+def activity(user_id):
+    return (user_id, 'session', 'Log In', '{}', '2024-01-01 10:00:00')
+
+
+class TestUserActivityWriter:
+
+    @pytest.fixture
+    def connection(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def connect(self, connection):
+        connect = MagicMock()
+        connect.available = True
+
+        def open_connection():
+            if not connect.available:
+                raise ConnectionError("Can't connect to MySQL server")
+            return connection
+
+        connect.side_effect = open_connection
+        return connect
+
+    @pytest.fixture
+    def writer(self, connect, tmp_path):
+        return UserActivityWriter(connect, batch_size=3, flush_interval=60,
+                                  spool_path=str(tmp_path / 'activities.spool.jsonl'))
+
+    @staticmethod
+    def inserted(connection):
+        return [row for c in connection.cursor.return_value.executemany.call_args_list for row in c[0][1]]
+
+    def test_enqueue_does_not_touch_the_database(self, writer, connect):
+        writer.enqueue(activity(1))
+
+        connect.assert_not_called()
+        assert writer.get_stats()['pending'] == 1
+
+    def test_flush_writes_one_multi_row_insert(self, writer, connection):
+        for user_id in (1, 2):
+            writer.enqueue(activity(user_id))
+
+        writer.flush()
+
+        connection.cursor.return_value.executemany.assert_called_once()
+        assert self.inserted(connection) == [activity(1), activity(2)]
+        assert writer.get_stats() == {'pending': 0, 'written': 2, 'spooled': 0, 'dead_lettered': 0}
+
+    def test_flushes_reuse_the_writer_connection(self, writer, connect, connection):
+        for user_id in (1, 2):
+            writer.enqueue(activity(user_id))
+            writer.flush()
+
+        connect.assert_called_once()
+        connection.ping.assert_called_once_with(reconnect=False)
+
+    def test_background_thread_flushes_a_full_batch(self, writer, connection):
+        written = threading.Event()
+        connection.commit.side_effect = lambda: written.set()
+        writer.start()
+        try:
+            for user_id in (1, 2, 3):
+                writer.enqueue(activity(user_id))
+
+            assert written.wait(5)
+        finally:
+            writer.stop()
+        assert self.inserted(connection) == [activity(1), activity(2), activity(3)]
+
+    def test_activities_are_spooled_while_the_database_is_down(self, writer, connect, connection):
+        connect.available = False
+        writer.enqueue(activity(1))
+        writer.flush()
+
+        with open(writer.spool_path) as f:
+            assert [tuple(json.loads(line)) for line in f] == [activity(1)]
+
+        connect.available = True
+        writer.enqueue(activity(2))
+        writer.flush()
+
+        assert self.inserted(connection) == [activity(1), activity(2)]
+        assert not writer.has_spooled_activities()
+
+    def test_rejected_spooled_activity_is_dead_lettered(self, writer, connection):
+        writer.spool([activity(1), activity(2)])
+        foreign_key_error = pymysql.err.IntegrityError(1452, "Cannot add or update a child row")
+        connection.cursor.return_value.executemany.side_effect = [foreign_key_error, foreign_key_error, None, None]
+
+        writer.enqueue(activity(3))
+        writer.flush()
+
+        assert self.inserted(connection)[-2:] == [activity(2), activity(3)]
+        assert not writer.has_spooled_activities()
+        with open(writer.dead_letter_path) as f:
+            assert [tuple(json.loads(line)) for line in f] == [activity(1)]
+        assert writer.get_stats()['dead_lettered'] == 1
+
+    def test_corrupt_spool_line_is_dead_lettered(self, writer, connection):
+        writer.spool([activity(1)])
+        with open(writer.spool_path, 'a') as f:
+            f.write('[2, "session", "Log\n')
+
+        writer.flush()
+
+        assert self.inserted(connection) == [activity(1)]
+        assert not writer.has_spooled_activities()
+        assert writer.get_stats()['dead_lettered'] == 1
+
+    def test_spool_is_kept_when_the_connection_drops_during_the_replay(self, writer, connection):
+        writer.spool([activity(1), activity(2)])
+        connection.cursor.return_value.executemany.side_effect = [
+            pymysql.err.DataError(1406, "Data too long"), None,
+            pymysql.err.OperationalError(2013, "Lost connection to MySQL server")]
+
+        writer.enqueue(activity(3))
+        writer.flush()
+
+        with open(writer.spool_path) as f:
+            assert [tuple(json.loads(line)) for line in f] == [activity(2), activity(3)]
+        assert not writer.get_stats()['dead_lettered']
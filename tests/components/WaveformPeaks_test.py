@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from components.WaveformPeaks import WaveformPeaks
+
+
+@pytest.fixture
+def audio():
+    sr = 22050
+    t = np.arange(10 * sr) / sr
+    # A tone that fades in, so the peaks grow along the recording
+    return (np.sin(2 * np.pi * 220 * t) * t / 10).astype(np.float32), sr
+
+
+class TestWaveformPeaks:
+
+    def test_levels_hold_min_and_max_per_window(self, audio):
+        y, sr = audio
+        peaks = WaveformPeaks.from_audio(y, sr)
+
+        (fine_size, fine), (coarse_size, coarse) = peaks.levels
+        assert (fine_size, coarse_size) == WaveformPeaks.SAMPLES_PER_PEAK
+        assert len(fine) == -(-len(y) // fine_size)
+        assert len(coarse) == -(-len(y) // coarse_size)
+        assert fine.dtype == coarse.dtype == np.int8
+        window = y[5 * fine_size:6 * fine_size]
+        assert tuple(fine[5]) == (np.round(window.min() * 127), np.round(window.max() * 127))
+        # Coarse windows are reduced from the fine ones
+        assert tuple(coarse[1]) == (fine[8:16, 0].min(), fine[8:16, 1].max())
+
+    def test_round_trips_through_bytes(self, audio):
+        peaks = WaveformPeaks.from_audio(*audio)
+
+        data = peaks.to_bytes()
+        restored = WaveformPeaks.from_bytes(data)
+
+        assert restored.sample_rate == peaks.sample_rate
+        for (size, level), (restored_size, restored_level) in zip(peaks.levels, restored.levels):
+            assert size == restored_size
+            np.testing.assert_array_equal(level, restored_level)
+        assert restored.duration == pytest.approx(10, abs=0.05)
+
+    def test_is_compact(self, audio):
+        data = WaveformPeaks.from_audio(*audio).to_bytes()
+
+        # Two int8 values per window of each level, plus the headers
+        windows = [-(-10 * 22050 // size) for size in WaveformPeaks.SAMPLES_PER_PEAK]
+        assert len(data) == WaveformPeaks.HEADER.size + 2 * WaveformPeaks.LEVEL_HEADER.size + 2 * sum(windows)
+
+    def test_rejects_unknown_data(self):
+        with pytest.raises(ValueError):
+            WaveformPeaks.from_bytes(b'RIFF' + bytes(20))
+
+    def test_picks_the_coarsest_level_that_fills_the_columns(self, audio):
+        peaks = WaveformPeaks.from_audio(*audio)
+        fine, coarse = peaks.levels[0][1], peaks.levels[1][1]
+
+        assert peaks.get_level(len(coarse)) is coarse
+        assert peaks.get_level(len(coarse) + 1) is fine
+        assert peaks.get_level(len(fine) + 1) is fine
@@ -0,0 +1,46 @@
+import re
+
+import numpy as np
+
+from components.WaveformPeaks import WaveformPeaks
+from components.WaveformRenderer import WaveformRenderer
+
+
+def peaks_of(y, sr=22050):
+    return WaveformPeaks.from_audio(np.asarray(y, dtype=np.float32), sr)
+
+
+def segments(svg):
+    return [(int(x), float(top), float(bottom))
+            for x, top, bottom in re.findall(r"M(\d+)\.5 ([\d.]+)V([\d.]+)", svg)]
+
+
+class TestWaveformRenderer:
+
+    def test_draws_one_line_per_column(self):
+        svg = WaveformRenderer(width=120, height=40).to_svg(peaks_of(np.ones(30 * 22050) * 0.5))
+
+        assert svg.startswith('<svg') and svg.endswith('</svg>')
+        lines = segments(svg)
+        assert [x for x, _, _ in lines] == list(range(120))
+
+    def test_line_heights_follow_the_peaks(self):
+        sr = 22050
+        y = np.concatenate([np.zeros(10 * sr), np.sin(np.arange(10 * sr) * 0.1)])
+        svg = WaveformRenderer(width=100, height=40).to_svg(peaks_of(y))
+
+        lines = segments(svg)
+        quiet_top, quiet_bottom = lines[10][1:]
+        loud_top, loud_bottom = lines[90][1:]
+        # Silence is a one pixel line through the middle, full scale spans the height
+        assert quiet_bottom - quiet_top == 1
+        assert loud_top == 0.0 and loud_bottom == 40.0
+
+    def test_short_recordings_use_fewer_columns(self):
+        svg = WaveformRenderer(width=240).to_svg(peaks_of(np.ones(22050)))
+
+        assert "viewBox='0 0 22 40'" in svg
+        assert len(segments(svg)) == 22
+
+    def test_empty_recording_draws_nothing(self):
+        assert WaveformRenderer().to_svg(peaks_of([])) == ''
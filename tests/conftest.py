@@ -0,0 +1,11 @@
+import pytest
+
+from repositories.Tracer import Tracer
+
+
+@pytest.fixture(autouse=True)
+def disable_analysis_timings():
+    # Spans would otherwise be written to the analysis_timings table
+    Tracer.configure(None)
+    yield
+    Tracer._instance = None
@@ -0,0 +1,36 @@
+import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from dashboards.AnalysisTimingsDashboard import AnalysisTimingsDashboard
+
+
+class TestAnalysisTimingsDashboard:
+
+    def test_stage_summary_is_ordered_by_p95(self):
+        summary = AnalysisTimingsDashboard.get_stage_summary([
+            {'stage': 'decode', 'count': 3, 'p50_ms': 20.0, 'p95_ms': 30.0, 'total_ms': 70.0,
+             'mean_bytes': Decimal('2048')},
+            {'stage': 'score', 'count': 1, 'p50_ms': 500.0, 'p95_ms': 500.0, 'total_ms': 500.0,
+             'mean_bytes': None},
+        ])
+
+        assert summary.index.tolist() == ['score', 'decode']
+        assert summary.loc['decode', 'total_s'] == 0.1
+        assert summary.loc['decode', 'mean_kb'] == 2.0
+
+    def test_only_the_aggregates_of_the_selected_stage_are_read(self):
+        repo = MagicMock()
+        repo.get_stage_summary.return_value = [
+            {'stage': 'decode', 'count': 1, 'p50_ms': 20.0, 'p95_ms': 20.0, 'total_ms': 20.0, 'mean_bytes': None}]
+        repo.get_daily_percentiles.return_value = [
+            {'date': datetime.date(2024, 3, 1), 'p50_ms': 20.0, 'p95_ms': 20.0}]
+
+        with patch('dashboards.AnalysisTimingsDashboard.st') as st:
+            st.selectbox.side_effect = [7, 'decode']
+            AnalysisTimingsDashboard(repo).build()
+
+        repo.get_stage_summary.assert_called_once_with(7)
+        repo.get_daily_percentiles.assert_called_once_with('decode', 7)
+        daily = st.line_chart.call_args[0][0]
+        assert daily.columns.tolist() == ['p50 (ms)', 'p95 (ms)']
@@ -0,0 +1,104 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from repositories.ConnectionPool import ConnectionPool
+from repositories.Tracer import Tracer
+
+
+@pytest.fixture(autouse=True)
+def tracer():
+    Tracer.configure(None)
+
+
+@pytest.fixture
+def connect():
+    return MagicMock(side_effect=lambda: MagicMock())
+
+
+class TestConnectionPool:
+
+    def test_checked_in_connection_is_reused(self, connect):
+        pool = ConnectionPool(connect, max_size=2)
+
+        connection = pool.checkout()
+        pool.checkin(connection)
+
+        assert pool.checkout() is connection
+        connect.assert_called_once()
+        connection.rollback.assert_called_once()
+
+    def test_never_opens_more_than_max_size(self, connect):
+        pool = ConnectionPool(connect, max_size=2, timeout=0.05)
+
+        pool.checkout()
+        pool.checkout()
+        with pytest.raises(TimeoutError):
+            pool.checkout()
+
+        assert connect.call_count == 2
+        assert pool.get_stats()['timeouts'] == 1
+
+    def test_waits_for_a_checkin(self, connect):
+        pool = ConnectionPool(connect, max_size=1, timeout=5)
+        connection = pool.checkout()
+        threading.Timer(0.05, pool.checkin, (connection,)).start()
+
+        assert pool.checkout() is connection
+
+        stats = pool.get_stats()
+        assert stats['waits'] == 1
+        assert stats['max_wait_ms'] >= 40
+
+    def test_idle_connection_failing_its_ping_is_replaced(self, connect):
+        pool = ConnectionPool(connect, max_size=1, ping_after=0)
+        stale = pool.checkout()
+        pool.checkin(stale)
+        stale.ping.side_effect = Exception("MySQL server has gone away")
+
+        connection = pool.checkout()
+
+        assert connection is not stale
+        stale.close.assert_called_once()
+        assert pool.get_stats()['size'] == 1
+
+    def test_recently_used_connection_is_not_pinged(self, connect):
+        pool = ConnectionPool(connect, ping_after=60)
+        connection = pool.checkout()
+        pool.checkin(connection)
+
+        pool.checkout()
+
+        connection.ping.assert_not_called()
+
+    def test_old_connections_are_recycled(self, connect):
+        pool = ConnectionPool(connect, max_lifetime=0.01)
+        connection = pool.checkout()
+        time.sleep(0.02)
+        pool.checkin(connection)
+
+        assert pool.checkout() is not connection
+        connection.close.assert_called_once()
+        assert pool.get_stats()['recycled'] == 1
+
+    def test_failed_connect_frees_its_slot(self, connect):
+        pool = ConnectionPool(connect, max_size=1, timeout=0.05)
+        connect.side_effect = [Exception("Connection refused"), MagicMock()]
+
+        with pytest.raises(Exception):
+            pool.checkout()
+
+        assert pool.checkout() is not None
+        assert pool.get_stats()['size'] == 1
+
+    def test_context_manager_checks_in(self, connect):
+        pool = ConnectionPool(connect)
+
+        with pool.connection() as connection:
+            assert pool.get_stats()['in_use'] == 1
+
+        assert pool.get_stats()['in_use'] == 0
+        assert pool.get_stats()['idle'] == 1
+        assert pool.checkout() is connection
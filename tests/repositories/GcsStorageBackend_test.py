@@ -0,0 +1,61 @@
+import base64
+import hashlib
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from repositories.GcsStorageBackend import GcsStorageBackend
+
+
+class TestGcsStorageBackend:
+
+    @pytest.fixture
+    def backend(self):
+        with patch('repositories.GcsStorageBackend.StorageClientFactory.get_client'):
+            return GcsStorageBackend('melodymaster')
+
+    @staticmethod
+    def get_blob(backend):
+        blob = backend.bucket.blob.return_value
+        blob.chunk_size = None
+        uploaded = {}
+        blob.upload_from_file.side_effect = lambda reader, **kwargs: uploaded.update(data=reader.read(), **kwargs)
+        return blob, uploaded
+
+    def test_put_streams_from_the_buffer_with_md5(self, backend):
+        blob, uploaded = self.get_blob(backend)
+
+        backend.put('1/recordings/1-2.m4a', memoryview(b'recording'))
+
+        assert uploaded['data'] == b'recording'
+        assert uploaded['size'] == 9
+        assert uploaded['content_type'] == 'audio/mp4'
+        assert blob.md5_hash == base64.b64encode(hashlib.md5(b'recording').digest()).decode()
+        assert blob.chunk_size is None
+
+    def test_large_put_is_resumable(self, backend, monkeypatch):
+        monkeypatch.setattr(GcsStorageBackend, 'RESUMABLE_UPLOAD_THRESHOLD', 4)
+        blob, uploaded = self.get_blob(backend)
+
+        backend.put('1/features/abc.npz', b'features')
+
+        assert blob.chunk_size == GcsStorageBackend.RESUMABLE_CHUNK_SIZE
+        assert uploaded['content_type'] == 'application/octet-stream'
+
+    def test_get_to_file_streams_the_generation(self, backend):
+        file = MagicMock()
+
+        backend.get_to_file('track.m4a', file, 42)
+
+        backend.bucket.blob.assert_called_with('track.m4a', generation=42)
+        backend.bucket.blob.return_value.download_to_file.assert_called_once_with(file)
+
+    def test_signed_urls_are_v4(self, backend):
+        backend.signed_url('track.m4a', 3600)
+
+        assert backend.bucket.blob.return_value.generate_signed_url.call_args.kwargs['version'] == 'v4'
+
+    def test_stat_of_missing_blob_is_none(self, backend):
+        backend.bucket.get_blob.return_value = None
+
+        assert backend.stat('missing.m4a') is None
@@ -0,0 +1,71 @@
+import io
+
+import pytest
+from google.api_core.exceptions import NotFound
+
+from repositories.InMemoryStorageBackend import InMemoryStorageBackend
+from repositories.LocalStorageBackend import LocalStorageBackend
+from repositories.StorageBackend import SigningNotSupported
+
+
+class TestLocalAndInMemoryStorageBackends:
+
+    @pytest.fixture(params=['local', 'memory'])
+    def backend(self, request, tmp_path):
+        InMemoryStorageBackend.clear()
+        if request.param == 'local':
+            return LocalStorageBackend('melodymaster', str(tmp_path))
+        return InMemoryStorageBackend('melodymaster')
+
+    def test_put_and_get(self, backend):
+        stat = backend.put('1/recordings/1-2.m4a', memoryview(b'recording'))
+
+        assert stat.size == 9
+        assert stat.content_type == 'audio/mp4'
+        assert backend.get('1/recordings/1-2.m4a') == b'recording'
+        assert backend.get('1/recordings/1-2.m4a', stat.generation) == b'recording'
+        assert backend.get_range('1/recordings/1-2.m4a', 0, 3) == b'reco'
+        assert backend.stat('1/recordings/1-2.m4a') == stat
+
+    def test_overwrite_changes_the_generation(self, backend):
+        first = backend.put('track.m4a', b'old')
+        second = backend.put('track.m4a', b'new track')
+
+        assert first.generation != second.generation
+        with pytest.raises(NotFound):
+            backend.get('track.m4a', first.generation)
+
+    def test_list_by_prefix(self, backend):
+        backend.put('badges/', b'')
+        backend.put('badges/b.png', b'b')
+        backend.put('badges/a.png', b'a')
+        backend.put('avatars/a.png', b'a')
+
+        # Folder placeholders are listed by GCS and the in-memory backend, not by local storage
+        names = [stat.name for stat in backend.list('badges/') if not stat.name.endswith('/')]
+        assert names == ['badges/a.png', 'badges/b.png']
+
+    def test_delete(self, backend):
+        backend.put('track.m4a', b'track')
+        backend.delete('track.m4a')
+
+        assert backend.stat('track.m4a') is None
+        with pytest.raises(NotFound):
+            backend.get('track.m4a')
+        with pytest.raises(NotFound):
+            backend.delete('track.m4a')
+
+    def test_get_to_file(self, backend, tmp_path):
+        stat = backend.put('track.m4a', b'track')
+
+        with open(tmp_path / 'track.m4a', 'wb') as f:
+            backend.get_to_file('track.m4a', f, stat.generation)
+
+        assert (tmp_path / 'track.m4a').read_bytes() == b'track'
+        with pytest.raises(NotFound):
+            backend.get_to_file('missing.m4a', io.BytesIO())
+
+    def test_urls_cannot_be_signed(self, backend):
+        assert not backend.supports_signing
+        with pytest.raises(SigningNotSupported):
+            backend.signed_url('track.m4a', 3600)
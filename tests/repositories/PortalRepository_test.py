@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, call
 import pytz
 from datetime import datetime
 
+from enums.TimeFrame import TimeFrame
 from repositories.PortalRepository import PortalRepository
 
 
@@ -205,3 +206,44 @@ class TestPortalRepository:
         ]
         assert result == expected_result
         assert mock_cursor.execute.call_args[0][1] == (user_id,)
+
+    def test_fetch_teams_dashboard_data_is_one_columnar_query(self, portal_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.fetchall.return_value = [
+            (5, 1, 'Asha', 'Owl', 3, 4, 12.5, 310, 95, 40, 2),
+            (5, 2, 'Ravi', None, 0, 0, 0, 0, 0, 0, 0),
+            (6, 3, 'Mei', 'Fox', 1, 1, 2.0, 70, 10, 10, 0),
+        ]
+
+        columns = portal_repo.fetch_teams_dashboard_data([5, 6], TimeFrame.CURRENT_WEEK)
+
+        mock_cursor.execute.assert_called_once()
+        assert mock_cursor.execute.call_args[0][1].count((5, 6)) == 3
+        assert columns['group_id'] == [5, 5, 6]
+        assert columns['teammate'] == ['Asha', 'Ravi', 'Mei']
+        assert columns['practice_minutes'] == [95, 0, 10]
+        assert PortalRepository.get_dashboard_rows(columns, 6) == [{
+            'user_id': 3, 'teammate': 'Mei', 'avatar': 'Fox', 'unique_tracks': 1, 'recordings': 1,
+            'recording_minutes': 2.0, 'score': 70, 'practice_minutes': 10, 'max_daily_practice_minutes': 10,
+            'badges_earned': 0}]
+        assert len(PortalRepository.get_dashboard_rows(columns)) == 3
+
+    def test_fetch_teams_dashboard_data_without_groups(self, portal_repo, mock_connection):
+        columns = portal_repo.fetch_teams_dashboard_data([], TimeFrame.CURRENT_WEEK)
+
+        mock_connection.cursor.assert_not_called()
+        assert columns['user_id'] == []
+        assert PortalRepository.get_dashboard_rows(columns) == []
+
+    def test_get_groups_stats_fetches_once(self, portal_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.fetchall.return_value = [
+            (5, 1, 'Asha', 'Owl', 3, 4, 12.5, 310, 95, 40, 2),
+            (6, 3, 'Mei', 'Fox', 1, 1, 2.0, 70, 10, 10, 0),
+        ]
+
+        stats = portal_repo.get_groups_stats([5, 6], TimeFrame.PREVIOUS_WEEK)
+
+        mock_cursor.execute.assert_called_once()
+        assert {winner['student_name'] for winner in stats[5]} == {'Asha'}
+        assert {winner['student_name'] for winner in stats[6]} == {'Mei'}
@@ -0,0 +1,75 @@
+import ast
+
+import pymysql
+import pytest
+from unittest.mock import MagicMock
+
+from repositories.QueryPlanChecker import QueryPlanChecker
+
+
+class TestQueryPlanChecker:
+
+    @pytest.fixture
+    def repositories_dir(self, tmp_path):
+        (tmp_path / 'ThingRepository.py').write_text('''
+class ThingRepository:
+    def get_things(self, user_id, limit):
+        query = """SELECT * FROM things WHERE user_id = %s ORDER BY id LIMIT %s;"""
+
+    def get_filtered(self, conditions):
+        query = f"""SELECT * FROM things WHERE {' AND '.join(conditions)}"""
+
+    def add_thing(self, name):
+        query = "INSERT INTO things (name) VALUES (%s)"
+''')
+        return tmp_path
+
+    def test_collects_literal_queries_and_skips_f_strings(self, repositories_dir):
+        queries = QueryPlanChecker.collect_queries(str(repositories_dir))
+
+        assert queries == [
+            ('ThingRepository.get_things', "SELECT * FROM things WHERE user_id = %s ORDER BY id LIMIT %s;"),
+            ('ThingRepository.get_filtered', None)]
+
+    def test_only_string_literals_have_a_string(self):
+        module = ast.parse("query = 'SELECT 1'\nlimit = 10\nf'SELECT {limit}'")
+
+        assert QueryPlanChecker.get_string(module.body[0].value) == 'SELECT 1'
+        assert QueryPlanChecker.get_string(module.body[1].value) is None
+        assert QueryPlanChecker.get_string(module.body[2].value) is None
+        assert QueryPlanChecker.get_string(module.body[2].value.values[0]) == 'SELECT '
+
+    def test_placeholders_are_bound_to_constants(self):
+        query = "SELECT * FROM t WHERE a = %s AND b IN %s AND c LIKE '%%x' LIMIT %s OFFSET %s"
+
+        assert QueryPlanChecker.bind_placeholders(query) == \
+            "SELECT * FROM t WHERE a = '1' AND b IN ('1') AND c LIKE '%x' LIMIT 1 OFFSET 0"
+
+    def test_flags_full_scans_of_large_tables(self, repositories_dir):
+        connection = MagicMock()
+        connection.cursor.return_value.fetchall.return_value = [
+            {'table': 'things', 'type': 'ALL', 'rows': 50000},
+            {'table': 'settings', 'type': 'ALL', 'rows': 12},
+            {'table': 'users', 'type': 'ref', 'rows': 3}]
+
+        full_scans, errors, skipped = QueryPlanChecker(connection, str(repositories_dir)).check()
+
+        assert [(scan['location'], scan['table']) for scan in full_scans] == [('ThingRepository.get_things', 'things')]
+        assert errors == []
+        assert skipped == ['ThingRepository.get_filtered']
+        explained = connection.cursor.return_value.execute.call_args[0][0]
+        assert explained == "EXPLAIN SELECT * FROM things WHERE user_id = '1' ORDER BY id LIMIT 1"
+
+    def test_rejected_queries_are_reported(self, repositories_dir):
+        connection = MagicMock()
+        connection.cursor.return_value.execute.side_effect = pymysql.err.ProgrammingError(1064, "Syntax")
+
+        full_scans, errors, _ = QueryPlanChecker(connection, str(repositories_dir)).check()
+
+        assert full_scans == []
+        assert [error['location'] for error in errors] == ['ThingRepository.get_things']
+
+    def test_finds_the_repository_queries(self):
+        locations = {location for location, _ in QueryPlanChecker.collect_queries()}
+
+        assert {'RecordingRepository.get_recording_by_id', 'PortalRepository.get_notifications'} <= locations
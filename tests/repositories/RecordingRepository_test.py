@@ -0,0 +1,28 @@
+from unittest.mock import MagicMock
+
+from enums.ScoringStatus import ScoringStatus
+from repositories.RecordingRepository import RecordingRepository
+
+
+class TestRecordingRepository:
+
+    def test_update_scores_and_analyses_is_one_statement(self):
+        mock_connection = MagicMock()
+        mock_cursor = mock_connection.cursor.return_value
+
+        RecordingRepository(mock_connection).update_scores_and_analyses(
+            [(10, 120, 80, 'Good'), (11, 300, 40, 'Off notes')])
+
+        update_query, params = mock_cursor.execute.call_args[0]
+        assert update_query.lstrip().startswith("UPDATE recordings")
+        assert update_query.count('%s') == len(params)
+        assert params == [10, 80, 11, 40, 10, 120, 11, 300, 10, 'Good', 11, 'Off notes',
+                          ScoringStatus.COMPLETED.value, (10, 11)]
+        mock_connection.commit.assert_called_once()
+
+    def test_update_scores_and_analyses_without_results(self):
+        mock_connection = MagicMock()
+
+        RecordingRepository(mock_connection).update_scores_and_analyses([])
+
+        mock_connection.cursor.assert_not_called()
@@ -0,0 +1,96 @@
+import pymysql
+import pytest
+from unittest.mock import MagicMock
+
+from repositories.SchemaMigrator import Migration, SchemaMigrator
+
+
+def write(directory, file_name, sql):
+    (directory / file_name).write_text(sql)
+
+
+class TestSchemaMigrator:
+
+    @pytest.fixture
+    def migrations_dir(self, tmp_path):
+        write(tmp_path, '0002_add_index.sql', "-- Lists\nCREATE INDEX idx ON t (a, b);\n")
+        write(tmp_path, '0001_create_t.sql', "CREATE TABLE t (\n    a INT,\n    b INT\n);\nINSERT INTO t VALUES (1, 2);\n")
+        write(tmp_path, 'README.md', "Not a migration")
+        return tmp_path
+
+    @pytest.fixture
+    def mock_connection(self):
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.fetchone.return_value = (1,)
+        cursor.fetchall.return_value = []
+        return connection
+
+    def executed(self, mock_connection):
+        return [c[0][0] for c in mock_connection.cursor.return_value.execute.call_args_list]
+
+    def test_migrations_are_read_in_version_order(self, migrations_dir, mock_connection):
+        migrations = SchemaMigrator(mock_connection, str(migrations_dir)).get_migrations()
+
+        assert [(migration.version, migration.name) for migration in migrations] == [
+            (1, 'create_t'), (2, 'add_index')]
+
+    def test_statements_are_split_without_comments(self):
+        migration = Migration(1, 'create_t', "-- Comment; not a statement\nCREATE TABLE t (a INT);\n\nDROP TABLE u;")
+
+        assert migration.get_statements() == ["CREATE TABLE t (a INT)", "DROP TABLE u"]
+
+    def test_pending_migrations_are_applied_and_recorded(self, migrations_dir, mock_connection):
+        applied = SchemaMigrator(mock_connection, str(migrations_dir)).migrate()
+
+        assert [migration.version for migration in applied] == [1, 2]
+        statements = [statement for statement in self.executed(mock_connection)
+                      if not statement.lstrip().startswith(('SELECT', 'CREATE TABLE IF NOT EXISTS'))]
+        assert statements[0].startswith("CREATE TABLE t")
+        assert statements[1] == "INSERT INTO t VALUES (1, 2)"
+        assert statements[2].startswith("INSERT INTO schema_migrations")
+        assert statements[3] == "CREATE INDEX idx ON t (a, b)"
+        assert "RELEASE_LOCK" in self.executed(mock_connection)[-1]
+
+    def test_applied_migrations_are_skipped(self, migrations_dir, mock_connection):
+        migrator = SchemaMigrator(mock_connection, str(migrations_dir))
+        first = migrator.get_migrations()[0]
+        mock_connection.cursor.return_value.fetchall.return_value = [
+            {'version': 1, 'checksum': first.checksum}]
+
+        assert [migration.version for migration in migrator.migrate()] == [2]
+
+    def test_changed_applied_migration_is_rejected(self, migrations_dir, mock_connection):
+        mock_connection.cursor.return_value.fetchall.return_value = [{'version': 1, 'checksum': 'other'}]
+
+        with pytest.raises(ValueError):
+            SchemaMigrator(mock_connection, str(migrations_dir)).migrate()
+
+    def test_dry_run_applies_nothing(self, migrations_dir, mock_connection):
+        pending = SchemaMigrator(mock_connection, str(migrations_dir)).migrate(dry_run=True)
+
+        assert len(pending) == 2
+        assert not any(statement.startswith(("CREATE TABLE t", "INSERT"))
+                       for statement in self.executed(mock_connection))
+
+    def test_failed_statement_names_the_migration(self, migrations_dir, mock_connection):
+        def execute(statement, params=None):
+            if statement.startswith("CREATE INDEX"):
+                raise pymysql.err.OperationalError(1061, "Duplicate key name 'idx'")
+        mock_connection.cursor.return_value.execute.side_effect = execute
+
+        with pytest.raises(RuntimeError, match="0002_add_index"):
+            SchemaMigrator(mock_connection, str(migrations_dir)).migrate()
+        assert "RELEASE_LOCK" in self.executed(mock_connection)[-1]
+
+    def test_lock_held_elsewhere(self, migrations_dir, mock_connection):
+        mock_connection.cursor.return_value.fetchone.return_value = (0,)
+
+        with pytest.raises(TimeoutError):
+            SchemaMigrator(mock_connection, str(migrations_dir)).migrate()
+
+    def test_repository_migrations_are_valid(self, mock_connection):
+        migrations = SchemaMigrator(mock_connection).get_migrations()
+
+        assert [migration.version for migration in migrations] == list(range(1, len(migrations) + 1))
+        assert all(migration.get_statements() for migration in migrations)
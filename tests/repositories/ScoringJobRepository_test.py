@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import MagicMock
+
+from enums.ScoringStatus import ScoringStatus
+from repositories.ScoringJobRepository import ScoringJobRepository
+
+
+class TestScoringJobRepository:
+
+    @pytest.fixture
+    def mock_connection(self):
+        mock_conn = MagicMock()
+        yield mock_conn
+        mock_conn.reset_mock()
+
+    @pytest.fixture
+    def scoring_job_repo(self, mock_connection):
+        return ScoringJobRepository(mock_connection)
+
+    def test_enqueue(self, scoring_job_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.lastrowid = 5
+
+        job_id = scoring_job_repo.enqueue(10, 3)
+
+        assert job_id == 5
+        assert mock_cursor.execute.call_args_list[0][0][1] == (10, 3, 'Standard', ScoringStatus.QUEUED.value)
+        mock_connection.commit.assert_called_once()
+
+    def test_claim_jobs_marks_jobs_processing(self, scoring_job_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.fetchall.return_value = [
+            {'id': 1, 'recording_id': 10, 'track_id': 3, 'attempts': 0},
+            {'id': 2, 'recording_id': 11, 'track_id': 3, 'attempts': 1}
+        ]
+
+        jobs = scoring_job_repo.claim_jobs(4)
+
+        assert [job['id'] for job in jobs] == [1, 2]
+        assert "SKIP LOCKED" in mock_cursor.execute.call_args_list[0][0][0]
+        assert mock_cursor.execute.call_args_list[1][0][1] == [ScoringStatus.PROCESSING.value, 1, 2]
+        assert mock_cursor.execute.call_args_list[2][0][1] == [ScoringStatus.PROCESSING.value, 10, 11]
+        mock_connection.commit.assert_called_once()
+
+    def test_claim_jobs_with_empty_queue(self, scoring_job_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.fetchall.return_value = []
+
+        assert scoring_job_repo.claim_jobs(4) == []
+        mock_cursor.execute.assert_called_once()
+        mock_connection.commit.assert_called_once()
+
+    @pytest.mark.parametrize("attempts, expected_status", [
+        (0, ScoringStatus.QUEUED), (1, ScoringStatus.QUEUED), (2, ScoringStatus.FAILED)])
+    def test_fail_job_retries_until_max_attempts(self, scoring_job_repo, mock_connection,
+                                                 attempts, expected_status):
+        mock_cursor = mock_connection.cursor.return_value
+        job = {'id': 1, 'recording_id': 10, 'attempts': attempts}
+
+        scoring_job_repo.fail_job(job, "error", max_attempts=3)
+
+        assert mock_cursor.execute.call_args_list[0][0][1] == (expected_status.value, "error", 1)
+        assert mock_cursor.execute.call_args_list[1][0][1] == (expected_status.value, 10)
+
+    def test_requeue_stale_jobs_fails_them_at_max_attempts(self, scoring_job_repo, mock_connection):
+        mock_cursor = mock_connection.cursor.return_value
+        mock_cursor.rowcount = 2
+
+        assert scoring_job_repo.requeue_stale_jobs(15, max_attempts=3) == 2
+
+        query, params = mock_cursor.execute.call_args[0]
+        assert "j.attempts >= %s" in query and "r.scoring_status" in query
+        assert params[:3] == (3, ScoringStatus.FAILED.value, ScoringStatus.QUEUED.value)
+        assert params[-2:] == (ScoringStatus.PROCESSING.value, 15)
+        mock_connection.commit.assert_called_once()
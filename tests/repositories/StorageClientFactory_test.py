@@ -0,0 +1,54 @@
+import json
+import os
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from repositories.StorageClientFactory import StorageClientFactory
+
+
+class TestStorageClientFactory:
+
+    @pytest.fixture(autouse=True)
+    def reset_client(self):
+        StorageClientFactory._client = None
+        yield
+        StorageClientFactory._client = None
+
+    def test_client_is_created_once_for_all_threads(self):
+        created = []
+
+        def create_client():
+            created.append(MagicMock())
+            return created[-1]
+
+        with patch.object(StorageClientFactory, 'create_client', side_effect=create_client):
+            clients = []
+            threads = [threading.Thread(target=lambda: clients.append(StorageClientFactory.get_client()))
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(created) == 1
+        assert all(client is created[0] for client in clients)
+
+    def test_client_uses_a_pooled_session_without_a_credentials_file(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        info = {'type': 'service_account', 'project_id': 'melodymaster'}
+        credentials = MagicMock()
+        with patch.dict(os.environ, {'GOOGLE_APP_CRED': json.dumps(info)}), \
+                patch('repositories.StorageClientFactory.google.auth.load_credentials_from_dict',
+                      return_value=(credentials, 'melodymaster')) as load_credentials, \
+                patch('repositories.StorageClientFactory.storage.Client') as client:
+            StorageClientFactory.get_client()
+
+        assert load_credentials.call_args.args[0] == info
+        kwargs = client.call_args.kwargs
+        assert kwargs['project'] == 'melodymaster'
+        assert kwargs['credentials'] is credentials
+        adapter = kwargs['_http'].get_adapter('https://storage.googleapis.com')
+        assert adapter._pool_maxsize == StorageClientFactory.POOL_SIZE
+        assert os.listdir(tmp_path) == []
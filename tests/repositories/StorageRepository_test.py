@@ -0,0 +1,236 @@
+import os
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.api_core.exceptions import NotFound
+
+from components.BlobCache import BlobCache
+from repositories.GcsStorageBackend import GcsStorageBackend
+from repositories.InMemoryStorageBackend import InMemoryStorageBackend
+from repositories.LocalStorageBackend import LocalStorageBackend
+from repositories.StorageRepository import StorageRepository
+
+
+@pytest.fixture(autouse=True)
+def clear_generations():
+    StorageRepository._generations.clear()
+    yield
+    StorageRepository._generations.clear()
+
+
+@pytest.fixture
+def memory_storage_repo(tmp_path):
+    InMemoryStorageBackend.clear()
+    yield StorageRepository('melodymaster', BlobCache(str(tmp_path / 'cache'), max_bytes=1024),
+                            InMemoryStorageBackend('melodymaster'))
+    InMemoryStorageBackend.clear()
+
+
+class TestStorageRepository:
+
+    def test_upload_and_download(self, memory_storage_repo):
+        url = memory_storage_repo.upload_blob(memoryview(b'recording'), '1/recordings/1-2.m4a')
+
+        assert memory_storage_repo.get_blob_name(url) == '1/recordings/1-2.m4a'
+        assert memory_storage_repo.download_blob_by_url(url) == b'recording'
+        assert memory_storage_repo.download_blob_range('1/recordings/1-2.m4a', 2, 4) == b'cor'
+
+    def test_gcs_urls_are_parsed(self, memory_storage_repo):
+        assert memory_storage_repo.get_blob_name(
+            'https://storage.googleapis.com/melodymaster/1/2/tracks/my%20track.m4a') == '1/2/tracks/my track.m4a'
+
+    def test_delete_file(self, memory_storage_repo):
+        url = memory_storage_repo.upload_blob(b'track', '1/2/tracks/track.m4a')
+
+        assert memory_storage_repo.delete_file(url)
+        with pytest.raises(NotFound):
+            memory_storage_repo.download_blob_by_url(url)
+        assert not memory_storage_repo.delete_file(url)
+
+    def test_download_blob_to_file(self, memory_storage_repo, tmp_path):
+        memory_storage_repo.upload_blob(b'png', 'badges/First Note.png')
+        generation = memory_storage_repo.list_blobs('badges/')[0].generation
+
+        memory_storage_repo.download_blob_to_file('badges/First Note.png', str(tmp_path / 'badge.png'), generation)
+
+        assert (tmp_path / 'badge.png').read_bytes() == b'png'
+
+    def test_failed_download_to_file_leaves_no_temp_file(self, memory_storage_repo, tmp_path):
+        assets = tmp_path / 'assets'
+        assets.mkdir()
+        (assets / 'badge.png').write_bytes(b'old')
+
+        with pytest.raises(NotFound):
+            memory_storage_repo.download_blob_to_file('badges/Missing.png', str(assets / 'badge.png'))
+
+        assert os.listdir(assets) == ['badge.png']
+        assert (assets / 'badge.png').read_bytes() == b'old'
+
+    @pytest.mark.parametrize('backend', ['gcs', 'local', 'local:{tmp_path}', 'memory'])
+    def test_backend_is_chosen_by_env(self, backend, tmp_path):
+        expected = {'gcs': GcsStorageBackend, 'memory': InMemoryStorageBackend}.get(backend, LocalStorageBackend)
+        with patch.dict(os.environ, {'STORAGE_BACKEND': backend.format(tmp_path=tmp_path)}), \
+                patch('repositories.GcsStorageBackend.StorageClientFactory.get_client'):
+            assert isinstance(StorageRepository.create_backend('melodymaster'), expected)
+
+
+class TestStorageRepositoryBlobCache:
+
+    @pytest.fixture
+    def backend(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def storage_repo(self, backend, tmp_path):
+        return StorageRepository('melodymaster', BlobCache(str(tmp_path), max_bytes=1024), backend)
+
+    @staticmethod
+    def set_blob(backend, generation, data):
+        backend.stat.return_value = MagicMock(generation=generation)
+        backend.get.return_value = data
+
+    def test_repeat_download_is_served_from_the_cache(self, storage_repo, backend):
+        self.set_blob(backend, 1, b'audio')
+
+        assert storage_repo.download_blob_by_name('1/2/tracks/track.m4a') == b'audio'
+        assert storage_repo.download_blob_by_url(
+            'https://storage.googleapis.com/melodymaster/1/2/tracks/track.m4a') == b'audio'
+        backend.get.assert_called_once_with('1/2/tracks/track.m4a', 1)
+        backend.stat.assert_called_once()
+
+    def test_overwritten_blob_is_downloaded_again_after_the_ttl(self, storage_repo, backend):
+        self.set_blob(backend, 1, b'old')
+        with patch('repositories.StorageRepository.time.time', return_value=1000):
+            storage_repo.download_blob_by_name('1/2/tracks/track.m4a')
+        self.set_blob(backend, 2, b'new')
+
+        with patch('repositories.StorageRepository.time.time', return_value=1000 + 30):
+            assert storage_repo.download_blob_by_name('1/2/tracks/track.m4a') == b'old'
+        with patch('repositories.StorageRepository.time.time', return_value=1000 + 60):
+            assert storage_repo.download_blob_by_name('1/2/tracks/track.m4a') == b'new'
+
+    def test_known_generation_is_not_looked_up(self, storage_repo, backend):
+        self.set_blob(backend, 3, b'audio')
+
+        assert storage_repo.download_blob_by_name('1/2/tracks/track.m4a', 3) == b'audio'
+        backend.stat.assert_not_called()
+
+    def test_generation_overwritten_before_the_download_is_looked_up_again(self, storage_repo, backend):
+        self.set_blob(backend, 1, b'old')
+        storage_repo.get_generation('1/2/tracks/track.m4a')
+        self.set_blob(backend, 2, b'new')
+
+        def get(name, generation):
+            if generation != 2:
+                raise NotFound(f"Generation {generation} of blob {name} not found")
+            return b'new'
+
+        backend.get.side_effect = get
+
+        assert storage_repo.download_blob_by_name('1/2/tracks/track.m4a') == b'new'
+        assert backend.stat.call_count == 2
+
+    def test_uploaded_blob_is_cached(self, storage_repo, backend):
+        backend.put.return_value = MagicMock(generation=7)
+        storage_repo.upload_blob(b'recording', '1/recordings/1-2.m4a')
+        backend.stat.return_value = MagicMock(generation=7)
+
+        assert storage_repo.download_blob_by_name('1/recordings/1-2.m4a') == b'recording'
+        backend.get.assert_not_called()
+
+
+class TestStorageRepositoryPrefetch:
+
+    def test_prefetch_downloads_concurrently(self, memory_storage_repo):
+        # Every download waits for the others, so this only finishes if they run at the same time
+        barrier = threading.Barrier(3, timeout=5)
+
+        def download(blob_name):
+            barrier.wait()
+            return blob_name.encode()
+
+        with patch.object(memory_storage_repo, 'download_blob_by_name', side_effect=download):
+            blobs = memory_storage_repo.prefetch(['a.m4a', 'b.m4a', 'c.m4a', 'a.m4a', None])
+
+        assert blobs == {'a.m4a': b'a.m4a', 'b.m4a': b'b.m4a', 'c.m4a': b'c.m4a'}
+
+    def test_failed_blobs_are_left_out(self, memory_storage_repo):
+        memory_storage_repo.upload_blob(b'audio', 'track.m4a')
+
+        assert memory_storage_repo.prefetch(['track.m4a', 'missing.m4a']) == {'track.m4a': b'audio'}
+
+    def test_prefetch_by_url_is_keyed_by_url(self, memory_storage_repo):
+        memory_storage_repo.upload_blob(b'audio', '1/2/tracks/track.m4a')
+        url = 'https://storage.googleapis.com/melodymaster/1/2/tracks/track.m4a'
+
+        assert memory_storage_repo.prefetch_by_url([url, None]) == {url: b'audio'}
+
+
+class TestStorageRepositorySignedUrls:
+
+    @pytest.fixture
+    def backend(self):
+        StorageRepository._signed_urls.clear()
+        yield MagicMock()
+        StorageRepository._signed_urls.clear()
+
+    @pytest.fixture
+    def storage_repo(self, backend, tmp_path):
+        return StorageRepository('melodymaster', BlobCache(str(tmp_path), max_bytes=1024), backend)
+
+    def test_signed_url_is_reused_until_shortly_before_expiry(self, storage_repo, backend):
+        backend.signed_url.side_effect = ['https://signed/1', 'https://signed/2']
+
+        with patch('repositories.StorageRepository.time.time', return_value=1000):
+            assert storage_repo.get_signed_url('track.m4a') == 'https://signed/1'
+        with patch('repositories.StorageRepository.time.time', return_value=1000 + 3000):
+            assert storage_repo.get_signed_url('track.m4a') == 'https://signed/1'
+        with patch('repositories.StorageRepository.time.time', return_value=1000 + 3400):
+            assert storage_repo.get_signed_url('track.m4a') == 'https://signed/2'
+
+    def test_stale_signed_urls_are_pruned(self, storage_repo, backend):
+        backend.signed_url.side_effect = lambda name, seconds: f'https://signed/{name}'
+
+        with patch('repositories.StorageRepository.time.time', return_value=1000):
+            storage_repo.get_signed_url('a.m4a')
+        with patch('repositories.StorageRepository.time.time', return_value=1000 + 3400):
+            storage_repo.get_signed_url('b.m4a')
+
+        assert list(StorageRepository._signed_urls) == [('melodymaster', 'b.m4a')]
+
+    def test_signed_urls_are_bounded(self, storage_repo, backend):
+        backend.signed_url.side_effect = lambda name, seconds: f'https://signed/{name}'
+
+        with patch.object(StorageRepository, 'SIGNED_URL_CACHE_SIZE', 2):
+            for name in ['a.m4a', 'b.m4a', 'c.m4a']:
+                storage_repo.get_signed_url(name)
+
+        assert list(StorageRepository._signed_urls) == [('melodymaster', 'b.m4a'), ('melodymaster', 'c.m4a')]
+
+    def test_audio_sources_are_signed_urls(self, storage_repo, backend):
+        backend.signed_url.return_value = 'https://signed/track'
+        url = 'https://storage.googleapis.com/melodymaster/1/2/tracks/track.m4a'
+
+        assert storage_repo.get_audio_sources_by_url([url]) == {url: 'https://signed/track'}
+        backend.get.assert_not_called()
+
+    def test_audio_sources_fall_back_to_bytes_when_signing_fails(self, storage_repo, backend):
+        backend.signed_url.side_effect = AttributeError("you need a private key to sign credentials")
+
+        with patch.object(storage_repo, 'download_blob_by_name', return_value=b'audio'):
+            assert storage_repo.get_audio_sources(['a.m4a', 'b.m4a']) == {'a.m4a': b'audio', 'b.m4a': b'audio'}
+            assert storage_repo.get_audio_sources(['a.m4a']) == {'a.m4a': b'audio'}
+        backend.signed_url.assert_called_once()
+
+    def test_local_backends_play_from_bytes(self, memory_storage_repo):
+        memory_storage_repo.upload_blob(b'audio', 'track.m4a')
+
+        assert memory_storage_repo.get_audio_sources(['track.m4a']) == {'track.m4a': b'audio'}
+
+    def test_unsigned_audio_is_left_out_without_prefetch(self, memory_storage_repo):
+        memory_storage_repo.upload_blob(b'audio', 'track.m4a')
+
+        with patch.object(memory_storage_repo, 'download_blob_by_name') as download:
+            assert memory_storage_repo.get_audio_sources(['track.m4a'], prefetch=False) == {}
+        download.assert_not_called()
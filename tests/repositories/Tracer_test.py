@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from repositories.Tracer import DatabaseTimingSink, JsonlTimingSink, Tracer
+
+
+class TestTracer:
+
+    @pytest.fixture
+    def sink(self):
+        return MagicMock()
+
+    def test_nested_spans_share_trace_and_flush_once(self, sink):
+        Tracer.configure(sink)
+
+        with Tracer.span('recording.upload', 100):
+            with Tracer.span('storage.upload') as span:
+                span.add_bytes(40)
+                span.add_bytes(60)
+            with Tracer.span('db.add_recording'):
+                pass
+            sink.add_timings.assert_not_called()
+
+        sink.add_timings.assert_called_once()
+        spans = sink.add_timings.call_args[0][0]
+        assert [span.stage for span in spans] == ['storage.upload', 'db.add_recording', 'recording.upload']
+        assert len({span.trace_id for span in spans}) == 1
+        assert [span.parent_stage for span in spans] == ['recording.upload', 'recording.upload', None]
+        assert spans[0].bytes == 100
+        assert all(span.duration_ms >= 0 for span in spans)
+
+    def test_span_is_recorded_when_stage_raises(self, sink):
+        Tracer.configure(sink)
+
+        with pytest.raises(ValueError):
+            with Tracer.span('audio.decode'):
+                raise ValueError("Corrupt file")
+
+        assert sink.add_timings.call_args[0][0][0].stage == 'audio.decode'
+
+    def test_recorded_durations_join_the_open_trace(self, sink):
+        Tracer.configure(sink)
+
+        with Tracer.span('recording.upload'):
+            Tracer.record('db.pool_wait', 12.5)
+        Tracer.record('db.pool_wait', 3.0)
+
+        first, second = [c[0][0] for c in sink.add_timings.call_args_list]
+        assert [(span.stage, span.parent_stage) for span in first] == [
+            ('db.pool_wait', 'recording.upload'), ('recording.upload', None)]
+        assert first[0].trace_id == first[1].trace_id
+        assert [(span.stage, span.duration_ms, span.parent_stage) for span in second] == [('db.pool_wait', 3.0, None)]
+
+    def test_sink_errors_are_swallowed(self, sink):
+        sink.add_timings.side_effect = Exception("Table missing")
+        Tracer.configure(sink)
+
+        with Tracer.span('audio.dtw'):
+            pass
+
+    def test_disabled_tracer(self):
+        Tracer.configure(None)
+
+        with Tracer.span('audio.dtw') as span:
+            span.add_bytes(10)
+
+    def test_jsonl_sink(self, tmp_path):
+        path = tmp_path / 'timings.jsonl'
+        Tracer.configure(JsonlTimingSink(str(path)))
+
+        with Tracer.span('recording.score'):
+            with Tracer.span('storage.download', 2048):
+                pass
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line['stage'] for line in lines] == ['storage.download', 'recording.score']
+        assert lines[0]['bytes'] == 2048
+
+
+class TestDatabaseTimingSink:
+
+    def test_full_queue_drops_batches_without_blocking(self):
+        sink = DatabaseTimingSink(max_pending=1)
+        # Not started, so nothing drains the queue
+        sink.thread = MagicMock()
+
+        sink.add_timings(['span'] * 2)
+        sink.add_timings(['span'] * 3)
+
+        assert sink.queue.qsize() == 1
+        assert sink.dropped == 3
+
+    def test_failed_write_drops_the_batch_and_reconnects_later(self, monkeypatch):
+        sink = DatabaseTimingSink()
+        monkeypatch.setattr(DatabaseTimingSink, 'RETRY_SECONDS', 0)
+
+        with patch('repositories.Tracer.DatabaseManager.connect', side_effect=Exception("Unreachable")):
+            sink.write(['span'] * 4)
+
+        assert sink.dropped == 4
+        assert sink.analysis_timing_repo is None
+
+    def test_sink_is_off_by_default(self, monkeypatch):
+        monkeypatch.delenv('ANALYSIS_TIMINGS_SINK', raising=False)
+
+        assert Tracer.get_sink_from_env() is None
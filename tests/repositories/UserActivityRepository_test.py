@@ -0,0 +1,40 @@
+import json
+
+import pytest
+from unittest.mock import MagicMock
+
+from enums.ActivityType import ActivityType
+from repositories.UserActivityRepository import UserActivityRepository
+
+
+class TestUserActivityRepository:
+
+    @pytest.fixture
+    def mock_connection(self):
+        return MagicMock()
+
+    def test_log_activity_is_buffered_by_the_writer(self, mock_connection):
+        writer = MagicMock()
+        user_activity_repo = UserActivityRepository(mock_connection, writer)
+
+        user_activity_repo.log_activity(7, 'session', ActivityType.LOG_IN, {'track_name': 'Track'})
+
+        mock_connection.cursor.assert_not_called()
+        user_id, session_id, activity_type, additional_params, timestamp = writer.enqueue.call_args[0][0]
+        assert (user_id, session_id, activity_type) == (7, 'session', ActivityType.LOG_IN.value)
+        assert json.loads(additional_params) == {'track_name': 'Track', 'session_id': 'session'}
+        assert len(timestamp) == len('2024-01-01 10:00:00')
+
+    def test_log_activity_without_writer_inserts_directly(self, mock_connection):
+        UserActivityRepository(mock_connection).log_activity(7, 'session', ActivityType.LOG_IN)
+
+        mock_connection.cursor.return_value.executemany.assert_called_once()
+        mock_connection.commit.assert_called_once()
+
+    def test_reads_flush_the_writer_first(self, mock_connection):
+        writer = MagicMock()
+        mock_connection.cursor.return_value.fetchall.return_value = []
+
+        UserActivityRepository(mock_connection, writer).get_user_activities(7)
+
+        writer.flush.assert_called_once()
@@ -0,0 +1,83 @@
+import pytest
+from unittest.mock import MagicMock
+
+from repositories.RecordingRepository import RecordingRepository
+from repositories.UserDailyStatsRepository import UserDailyStatsRepository
+from repositories.UserSessionRepository import UserSessionRepository
+
+
+class TestUserDailyStatsRepository:
+
+    @pytest.fixture
+    def mock_connection(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def user_daily_stats_repo(self, mock_connection):
+        return UserDailyStatsRepository(mock_connection)
+
+    def test_upsert_adds_to_the_existing_totals(self):
+        query = UserDailyStatsRepository.get_upsert_query(('recordings', 'recording_seconds'), "SELECT 1")
+
+        assert "INSERT INTO user_daily_stats (user_id, date, recordings, recording_seconds)" in query
+        assert "recordings = recordings + VALUES(recordings)" in query
+        assert "recording_seconds = recording_seconds + VALUES(recording_seconds)" in query
+
+    def test_add_recording_leaves_the_commit_to_the_caller(self, user_daily_stats_repo, mock_connection):
+        user_daily_stats_repo.add_recording(7, '2024-03-01 10:00:00', None)
+
+        mock_connection.cursor.return_value.execute.assert_called_once()
+        assert mock_connection.cursor.return_value.execute.call_args[0][1] == (7, '2024-03-01 10:00:00', 0)
+        mock_connection.commit.assert_not_called()
+
+    def test_add_recording_scores_adds_the_score_changes(self, user_daily_stats_repo, mock_connection):
+        user_daily_stats_repo.add_recording_scores([(11, 80), (12, None)])
+
+        mock_connection.cursor.return_value.execute.assert_called_once()
+        query, params = mock_connection.cursor.return_value.execute.call_args[0]
+        assert "SUM(COALESCE(s.score, 0) - COALESCE(r.score, 0))" in query
+        assert "SELECT %s AS id, %s AS score UNION ALL SELECT %s, %s" in query
+        assert query.count('%s') == len(params)
+        assert params == [11, 80, 12, None]
+        mock_connection.commit.assert_not_called()
+
+    def test_add_recording_scores_without_scores(self, user_daily_stats_repo, mock_connection):
+        user_daily_stats_repo.add_recording_scores([])
+
+        mock_connection.cursor.assert_not_called()
+
+    def test_rebuild_replaces_the_range(self, user_daily_stats_repo, mock_connection):
+        mock_connection.cursor.return_value.rowcount = 3
+
+        assert user_daily_stats_repo.rebuild(7, '2024-03-01', '2024-03-31') == 3
+
+        (delete_query, delete_params), (insert_query, insert_params) = [
+            c[0] for c in mock_connection.cursor.return_value.execute.call_args_list]
+        assert delete_query.startswith("DELETE FROM user_daily_stats")
+        assert delete_params == (7, '2024-03-01', '2024-03-31')
+        assert insert_query.count("UNION ALL") == 3
+        assert insert_params == (7, '2024-03-01', '2024-03-31') * 4
+        mock_connection.commit.assert_called_once()
+
+    def test_rebuild_rolls_back_on_error(self, user_daily_stats_repo, mock_connection):
+        mock_connection.cursor.return_value.execute.side_effect = [None, RuntimeError("Lock wait timeout")]
+
+        with pytest.raises(RuntimeError):
+            user_daily_stats_repo.rebuild()
+
+        mock_connection.rollback.assert_called_once()
+        mock_connection.commit.assert_not_called()
+
+    def test_write_paths_update_the_rollup_in_their_transaction(self, mock_connection):
+        RecordingRepository(mock_connection).add_recording(7, 3, 'blob', 'url', '2024-03-01 10:00:00', 42, 'hash')
+
+        names = [name for name, _, _ in mock_connection.mock_calls if name in ('cursor().execute', 'commit')]
+        assert names == ['cursor().execute', 'cursor().execute', 'commit']
+        assert "user_daily_stats" in mock_connection.cursor.return_value.execute.call_args_list[1][0][0]
+
+    def test_session_time_is_added_before_the_update(self, mock_connection):
+        UserSessionRepository(mock_connection).update_last_activity_time('session-7')
+
+        first_query = mock_connection.cursor.return_value.execute.call_args_list[0][0][0]
+        assert "INSERT INTO user_daily_stats" in first_query
+        assert "CURRENT_TIMESTAMP" in first_query